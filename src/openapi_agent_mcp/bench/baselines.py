@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from ..openapi.deref import DerefResult, _resolve_local_ref, schema_contains_ref
+from ..openapi.index import Operation
+
+
+def linear_search(
+    operations: Iterable[Operation], query: str, match: dict[str, bool], method: str | None
+) -> list[str]:
+    """
+    The original search: a case-insensitive substring scan over every operation's enabled
+    fields, operationIds in spec order. Reference output and speed baseline for `SearchIndex`.
+    """
+    q = query.strip().lower()
+    out: list[str] = []
+    for op in operations:
+        if method and op.method != method.upper():
+            continue
+        fields: list[str] = []
+        if match.get("operationId", True):
+            fields.append(op.operationId)
+        if match.get("path", True):
+            fields.append(op.path)
+        if match.get("tag", True):
+            fields.extend(op.tags)
+        if match.get("summary", True):
+            fields.append(op.summary or "")
+        if match.get("description", True):
+            fields.append(op.description or "")
+        if not q or any(q in f.lower() for f in fields):
+            out.append(op.operationId)
+    return out
+
+
+def recursive_deref(schema: Any, *, spec: dict[str, Any], max_depth: int, max_nodes: int) -> DerefResult:
+    """
+    The original recursive walker: copies every node and allocates a DerefResult per node.
+    Reference output and speed baseline for `deref_schema`.
+    """
+    budget = {"count": 0}
+
+    def walk(value: Any, depth: int, ref_stack: tuple[str, ...]) -> DerefResult:
+        budget["count"] += 1
+        if budget["count"] > max_nodes or depth > max_depth:
+            return DerefResult(schema=value, kept_ref=schema_contains_ref(value))
+        if isinstance(value, list):
+            items = [walk(item, depth + 1, ref_stack) for item in value]
+            return DerefResult(schema=[r.schema for r in items], kept_ref=any(r.kept_ref for r in items))
+        if isinstance(value, dict):
+            if "$ref" in value and isinstance(value.get("$ref"), str):
+                ref = value["$ref"]
+                if ref in ref_stack:
+                    return DerefResult(schema={"$ref": ref}, kept_ref=True)
+                resolved = walk(_resolve_local_ref(spec, ref), depth + 1, ref_stack + (ref,))
+                if not isinstance(resolved.schema, dict):
+                    return resolved
+                merged = dict(resolved.schema)
+                kept = resolved.kept_ref
+                for k, v in value.items():
+                    if k != "$ref":
+                        sub = walk(v, depth + 1, ref_stack)
+                        merged[k] = sub.schema
+                        kept = kept or sub.kept_ref
+                return DerefResult(schema=merged, kept_ref=kept)
+            items_by_key = {k: walk(v, depth + 1, ref_stack) for k, v in value.items()}
+            return DerefResult(
+                schema={k: r.schema for k, r in items_by_key.items()},
+                kept_ref=any(r.kept_ref for r in items_by_key.values()),
+            )
+        return DerefResult(schema=value, kept_ref=False)
+
+    return walk(schema, 0, ())
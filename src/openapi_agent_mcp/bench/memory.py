@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import gc
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+MODES = ("eager", "lazy")
+LOOKUPS = 10
+
+_STATUS = Path("/proc/self/status")
+_SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def supported() -> bool:
+    return _STATUS.exists()
+
+
+def _status_kb(field: str) -> int:
+    for line in _STATUS.read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def _measure(path: Path, mode: str) -> dict[str, int]:
+    """
+    RSS growth (KiB) from loading `path` and building `LOOKUPS` request schemas, in this
+    process: `steady` once garbage is collected, `peak` from the high-water mark (VmHWM).
+    """
+    from ..openapi.cache import read_json
+    from ..openapi.index import build_index
+    from ..openapi.lazy import load_lazy_spec
+    from ..tools.get_request_schema import build_request_schema
+
+    gc.collect()
+    before = _status_kb("VmRSS")
+    spec = load_lazy_spec(path) if mode == "lazy" else read_json(path)
+    index = build_index(spec)
+    step = max(len(index.operations) // LOOKUPS, 1)
+    for op in index.operations[::step][:LOOKUPS]:
+        build_request_schema(
+            spec=spec, meta={}, index=index, operationId=op.operationId, deref_max_depth=20, deref_max_nodes=20000
+        )
+    gc.collect()
+    return {"steady": _status_kb("VmRSS") - before, "peak": max(_status_kb("VmHWM") - before, 0)}
+
+
+def rss_growth_kb(path: Path) -> dict[str, dict[str, int]]:
+    """
+    Steady and peak RSS growth per spec loading mode, each measured in a fresh interpreter so one mode's
+    allocations cannot hide the other's. Linux only (reads /proc).
+    """
+    env = {**os.environ, "PYTHONHASHSEED": "0"}
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(_SRC_DIR), env.get("PYTHONPATH", "")) if p)
+    out: dict[str, dict[str, int]] = {}
+    for mode in MODES:
+        proc = subprocess.run(
+            [sys.executable, "-m", "openapi_agent_mcp.bench.memory", str(path), mode],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        out[mode] = json.loads(proc.stdout)
+    return out
+
+
+if __name__ == "__main__":
+    print(json.dumps(_measure(Path(sys.argv[1]), sys.argv[2])))
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from ..openapi.cache import ensure_dir, read_json, write_json_atomic
+from ..openapi.deref import DerefCache, deref_schema
+from ..openapi.index import OperationIndex, build_index, search_operations
+from ..openapi.lookup import lookup_operation
+from ..openapi.snapshot import read_snapshot, write_snapshot
+from ..tools.get_request_schema import build_request_schema
+from ..tools.get_response_schema import build_response_schema
+from . import memory
+from .baselines import linear_search, recursive_deref
+from .synthetic import make_spec
+
+FORMAT = "openapi-agent-mcp-bench/1"
+
+SEARCH_QUERIES = ("user", "create order", "tag:invoice", "path:/api/v1/", "id:list_ OR id:delete_", "nomatch")
+_MATCH_ALL = {"tag": True, "operationId": True, "path": True, "summary": True, "description": True}
+
+
+@dataclass(frozen=True)
+class SpecParams:
+    """Arguments of `make_spec` for one benchmark run."""
+
+    operations: int = 2000
+    components: int = 200
+    depth: int = 3
+    fan_out: int = 2
+    cycle_density: float = 0.05
+    seed: int = 0
+
+
+@dataclass
+class _Fixture:
+    raw: bytes
+    spec: dict[str, Any]
+    index: OperationIndex
+    sample: list[str]
+    deref_max_depth: int
+    deref_max_nodes: int
+    # Per-benchmark resources (temp dirs, ...), released by `run_suite` once it is timed.
+    resources: ExitStack = field(default_factory=ExitStack)
+
+
+def _sample_ids(index: OperationIndex, size: int) -> list[str]:
+    """Up to `size` operationIds spread evenly over the spec."""
+    ids = [op.operationId for op in index.operations]
+    if size <= 0 or len(ids) <= size:
+        return ids
+    step = len(ids) / size
+    return [ids[int(i * step)] for i in range(size)]
+
+
+def _time_per_item(fn: Callable[[], int], repeat: int) -> list[float]:
+    """Run `fn` `repeat` times; each run returns how many items it processed. Milliseconds per item."""
+    out: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        items = fn()
+        out.append((time.perf_counter() - started) * 1000 / max(items, 1))
+    return out
+
+
+def _summarize(times: Sequence[float], items: int) -> dict[str, Any]:
+    return {
+        "unit": "ms",
+        "items": items,
+        "repeat": len(times),
+        "min": round(min(times), 6),
+        "median": round(statistics.median(times), 6),
+        "mean": round(statistics.fmean(times), 6),
+        "max": round(max(times), 6),
+    }
+
+
+def _bench_parse(f: _Fixture) -> tuple[Callable[[], int], int]:
+    def run() -> int:
+        json.loads(f.raw)
+        return 1
+
+    return run, 1
+
+
+def _bench_index(f: _Fixture) -> tuple[Callable[[], int], int]:
+    def run() -> int:
+        build_index(f.spec)
+        return 1
+
+    return run, 1
+
+
+def _cold_start_dir(f: _Fixture) -> Path:
+    """A cache dir holding the raw spec and a snapshot of it, as a restarted server finds it."""
+    cache_dir = Path(f.resources.enter_context(tempfile.TemporaryDirectory(prefix="openapi-bench-")))
+    (cache_dir / "openapi.json").write_bytes(f.raw)
+    write_snapshot(cache_dir, sha256="bench", spec=f.spec, index=build_index(f.spec))
+    return cache_dir
+
+
+def _bench_cold_start_json(f: _Fixture) -> tuple[Callable[[], int], int]:
+    cache_dir = _cold_start_dir(f)
+
+    def run() -> int:
+        index = build_index(read_json(cache_dir / "openapi.json"))
+        index.search.materialize()
+        return 1
+
+    return run, 1
+
+
+def _bench_cold_start_snapshot(f: _Fixture) -> tuple[Callable[[], int], int]:
+    cache_dir = _cold_start_dir(f)
+
+    def run() -> int:
+        if read_snapshot(cache_dir, "bench") is None:
+            raise RuntimeError("benchmark snapshot could not be read")
+        return 1
+
+    return run, 1
+
+
+def _bench_search(f: _Fixture) -> tuple[Callable[[], int], int]:
+    def run() -> int:
+        for query in SEARCH_QUERIES:
+            search_operations(
+                operations=f.index.operations,
+                query=query,
+                match=_MATCH_ALL,
+                method=None,
+                limit=50,
+                search_index=f.index.search,
+            )
+        return len(SEARCH_QUERIES)
+
+    return run, len(SEARCH_QUERIES)
+
+
+def _bench_search_linear(f: _Fixture) -> tuple[Callable[[], int], int]:
+    def run() -> int:
+        for query in SEARCH_QUERIES:
+            linear_search(f.index.operations, query, _MATCH_ALL, None)
+        return len(SEARCH_QUERIES)
+
+    return run, len(SEARCH_QUERIES)
+
+
+def _bench_lookup(f: _Fixture) -> tuple[Callable[[], int], int]:
+    def run() -> int:
+        for op_id in f.sample:
+            lookup_operation(f.index, op_id)
+        return len(f.sample)
+
+    return run, len(f.sample)
+
+
+def _responses(f: _Fixture) -> list[Any]:
+    return [lookup_operation(f.index, op_id)[2].get("responses") for op_id in f.sample]
+
+
+def _bench_deref_plain(f: _Fixture) -> tuple[Callable[[], int], int]:
+    roots = _responses(f)
+
+    def run() -> int:
+        for root in roots:
+            deref_schema(root, spec=f.spec, max_depth=f.deref_max_depth, max_nodes=f.deref_max_nodes)
+        return len(roots)
+
+    return run, len(roots)
+
+
+def _bench_deref_recursive(f: _Fixture) -> tuple[Callable[[], int], int]:
+    roots = _responses(f)
+
+    def run() -> int:
+        for root in roots:
+            recursive_deref(root, spec=f.spec, max_depth=f.deref_max_depth, max_nodes=f.deref_max_nodes)
+        return len(roots)
+
+    return run, len(roots)
+
+
+def _bench_deref_cached(f: _Fixture) -> tuple[Callable[[], int], int]:
+    roots = _responses(f)
+
+    def run() -> int:
+        # A fresh cache per run: the figure includes warming it over the sample.
+        cache = DerefCache()
+        for root in roots:
+            deref_schema(
+                root,
+                spec=f.spec,
+                max_depth=f.deref_max_depth,
+                max_nodes=f.deref_max_nodes,
+                cache=cache,
+                spec_hash="bench",
+                graph=f.index.refs,
+            )
+        return len(roots)
+
+    return run, len(roots)
+
+
+def _tool_bench(build: Callable[..., dict[str, Any]]) -> Callable[[_Fixture], tuple[Callable[[], int], int]]:
+    def bench(f: _Fixture) -> tuple[Callable[[], int], int]:
+        meta = {"sha256": "bench"}
+
+        def run() -> int:
+            cache = DerefCache()
+            for op_id in f.sample:
+                build(
+                    spec=f.spec,
+                    meta=meta,
+                    index=f.index,
+                    operationId=op_id,
+                    deref_max_depth=f.deref_max_depth,
+                    deref_max_nodes=f.deref_max_nodes,
+                    deref_cache=cache,
+                )
+            return len(f.sample)
+
+        return run, len(f.sample)
+
+    return bench
+
+
+BENCHMARKS: dict[str, Callable[[_Fixture], tuple[Callable[[], int], int]]] = {
+    "parse": _bench_parse,
+    "index.build": _bench_index,
+    "cold_start.json": _bench_cold_start_json,
+    "cold_start.snapshot": _bench_cold_start_snapshot,
+    "search": _bench_search,
+    "search.linear": _bench_search_linear,
+    "lookup": _bench_lookup,
+    "deref.plain": _bench_deref_plain,
+    "deref.recursive": _bench_deref_recursive,
+    "deref.cached": _bench_deref_cached,
+    "tool.request": _tool_bench(build_request_schema),
+    "tool.response": _tool_bench(build_response_schema),
+}
+
+
+def run_suite(
+    params: SpecParams = SpecParams(),
+    *,
+    repeat: int = 5,
+    sample: int = 200,
+    only: Sequence[str] | None = None,
+    deref_max_depth: int = 20,
+    deref_max_nodes: int = 20_000,
+    measure_memory: bool = False,
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Generate a synthetic spec from `params` and time every benchmark (or those whose name
+    starts with one of `only`). Each result is milliseconds per item (a parse, a search
+    query, a lookup, one operation's deref or tool call) over `repeat` runs. With
+    `measure_memory` (Linux), the report also has the steady and peak RSS growth of eager vs lazy loading.
+    """
+    spec = make_spec(
+        params.operations,
+        params.components,
+        depth=params.depth,
+        fan_out=params.fan_out,
+        cycle_density=params.cycle_density,
+        seed=params.seed,
+    )
+    raw = json.dumps(spec).encode("utf-8")
+    index = build_index(spec)
+    fixture = _Fixture(
+        raw=raw,
+        spec=spec,
+        index=index,
+        sample=_sample_ids(index, sample),
+        deref_max_depth=deref_max_depth,
+        deref_max_nodes=deref_max_nodes,
+    )
+
+    results: dict[str, Any] = {}
+    for name, bench in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        with fixture.resources:
+            run, items = bench(fixture)
+            run()  # warm-up
+            results[name] = _summarize(_time_per_item(run, repeat), items)
+        if progress is not None:
+            progress(name, results[name])
+
+    report: dict[str, Any] = {
+        "format": FORMAT,
+        "generatedAt": int(time.time()),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "spec": {**asdict(params), "bytes": len(raw), "paths": len(spec["paths"])},
+        "deref": {"maxDepth": deref_max_depth, "maxNodes": deref_max_nodes},
+        "results": results,
+    }
+    if measure_memory and memory.supported():
+        with tempfile.TemporaryDirectory(prefix="openapi-bench-") as tmp:
+            path = Path(tmp) / "openapi.json"
+            path.write_bytes(raw)
+            report["memory"] = {"unit": "KiB", "lookups": memory.LOOKUPS, "rssGrowth": memory.rss_growth_kb(path)}
+    return report
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """Median-to-median ratio (current / baseline) of every benchmark present in both runs."""
+    rows: list[dict[str, Any]] = []
+    base_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or not base.get("median"):
+            continue
+        rows.append(
+            {
+                "name": name,
+                "baseline": base["median"],
+                "current": result["median"],
+                "ratio": round(result["median"] / base["median"], 3),
+            }
+        )
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = SpecParams()
+    p = argparse.ArgumentParser(prog="openapi-agent-mcp-bench", description="Micro-benchmarks on a synthetic spec")
+    p.add_argument("--operations", type=int, default=defaults.operations, help=f"Operations (default: {defaults.operations})")
+    p.add_argument("--components", type=int, default=defaults.components, help=f"Component schemas (default: {defaults.components})")
+    p.add_argument("--depth", type=int, default=defaults.depth, help=f"Inline nesting depth per component (default: {defaults.depth})")
+    p.add_argument("--fan-out", type=int, default=defaults.fan_out, help=f"Refs to other components per component (default: {defaults.fan_out})")
+    p.add_argument("--cycle-density", type=float, default=defaults.cycle_density, help=f"Fraction of components closing a ref cycle (default: {defaults.cycle_density})")
+    p.add_argument("--seed", type=int, default=defaults.seed, help=f"Generator seed (default: {defaults.seed})")
+    p.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    p.add_argument("--sample", type=int, default=200, help="Operations used by lookup/deref/tool benchmarks (default: 200)")
+    p.add_argument("--only", nargs="+", default=None, help="Run only benchmarks whose name starts with one of these")
+    p.add_argument("--deref-max-depth", type=int, default=20, help="Max deref depth (default: 20)")
+    p.add_argument("--deref-max-nodes", type=int, default=20000, help="Max deref nodes (default: 20000)")
+    p.add_argument("--memory", action="store_true", help="Also measure steady and peak RSS growth of eager vs lazy spec loading (Linux)")
+    p.add_argument("--out", help="Write the JSON results here instead of stdout")
+    p.add_argument("--compare", help="Baseline results file; print median ratios against it")
+    p.add_argument("--max-ratio", type=float, default=None, help="With --compare, exit 1 if any ratio exceeds this")
+    return p
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    params = SpecParams(
+        operations=args.operations,
+        components=args.components,
+        depth=args.depth,
+        fan_out=args.fan_out,
+        cycle_density=args.cycle_density,
+        seed=args.seed,
+    )
+
+    def progress(name: str, result: dict[str, Any]) -> None:
+        sys.stderr.write(f"[bench] {name}: median={result['median']:.4f}ms min={result['min']:.4f}ms ({result['items']} items)\n")
+
+    report = run_suite(
+        params,
+        repeat=args.repeat,
+        sample=args.sample,
+        only=args.only,
+        deref_max_depth=args.deref_max_depth,
+        deref_max_nodes=args.deref_max_nodes,
+        measure_memory=args.memory,
+        progress=progress,
+    )
+    if "memory" in report:
+        growth = " ".join(
+            f"{mode}={kb['steady']}KiB (peak {kb['peak']}KiB)" for mode, kb in report["memory"]["rssGrowth"].items()
+        )
+        sys.stderr.write(f"[bench] RSS growth: {growth}\n")
+
+    if args.out:
+        out_path = Path(args.out)
+        ensure_dir(out_path.parent)
+        write_json_atomic(out_path, report)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    rc = 0
+    if args.compare:
+        baseline = read_json(Path(args.compare))
+        for row in compare_results(baseline, report):
+            flag = ""
+            if args.max_ratio is not None and row["ratio"] > args.max_ratio:
+                flag, rc = " REGRESSION", 1
+            sys.stderr.write(
+                f"[bench] {row['name']}: {row['baseline']:.4f}ms -> {row['current']:.4f}ms (x{row['ratio']}){flag}\n"
+            )
+    raise SystemExit(rc)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+_RESOURCES = ["user", "order", "invoice", "purchaseRequisition", "warehouse", "supplier", "payment", "shipment"]
+_ACTIONS = [("get", "get"), ("post", "create"), ("put", "update"), ("delete", "delete"), ("get", "list")]
+
+
+def _nested_details(levels: int) -> dict[str, Any]:
+    """An inline object nested `levels` deep (no `$ref`s)."""
+    node: dict[str, Any] = {"type": "object", "properties": {"value": {"type": "string"}}}
+    for _ in range(levels - 1):
+        node = {"type": "object", "properties": {"value": {"type": "string"}, "details": node}}
+    return node
+
+
+def make_spec(
+    n_operations: int,
+    n_components: int = 50,
+    *,
+    depth: int = 1,
+    fan_out: int = 1,
+    cycle_density: float = 0.0,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Deterministic FastAPI-shaped spec with `n_operations` operations.
+
+    Component `ModelN` references `Model(N-1)` as `parent`. `depth` > 1 adds an inline
+    `details` object nested that many levels; `fan_out` > 1 adds that many minus one
+    `linkK` refs to earlier models (acyclic); `cycle_density` is the fraction of models
+    that also reference a later model, closing a cycle through the `parent` chain.
+    Random choices come from `seed`, so equal arguments give equal specs.
+    """
+    rng = random.Random(seed)
+    schemas: dict[str, Any] = {
+        "HTTPValidationError": {
+            "type": "object",
+            "properties": {"detail": {"type": "array", "items": {"$ref": "#/components/schemas/ValidationError"}}},
+        },
+        "ValidationError": {
+            "type": "object",
+            "required": ["loc", "msg", "type"],
+            "properties": {
+                "loc": {"type": "array", "items": {"anyOf": [{"type": "string"}, {"type": "integer"}]}},
+                "msg": {"type": "string"},
+                "type": {"type": "string"},
+            },
+        },
+    }
+    for c in range(n_components):
+        props: dict[str, Any] = {"id": {"type": "integer"}, "name": {"type": "string"}}
+        if depth > 1:
+            props["details"] = _nested_details(depth - 1)
+        if c > 0:
+            props["parent"] = {"$ref": f"#/components/schemas/Model{c - 1}"}
+            for k in range(1, fan_out):
+                props[f"link{k}"] = {"$ref": f"#/components/schemas/Model{rng.randrange(c)}"}
+        if cycle_density > 0 and c < n_components - 1 and rng.random() < cycle_density:
+            target = rng.randrange(c + 1, n_components)
+            props["related"] = {"type": "array", "items": {"$ref": f"#/components/schemas/Model{target}"}}
+        schemas[f"Model{c}"] = {"type": "object", "required": ["id"], "properties": props}
+
+    paths: dict[str, Any] = {}
+    for i in range(n_operations):
+        resource = _RESOURCES[i % len(_RESOURCES)]
+        method, action = _ACTIONS[(i // len(_RESOURCES)) % len(_ACTIONS)]
+        group = i // (len(_RESOURCES) * len(_ACTIONS))
+        path = f"/api/v{group}/{resource}/{{item_id}}/{action}"
+        model = f"#/components/schemas/Model{i % max(n_components, 1)}" if n_components else None
+        op: dict[str, Any] = {
+            "operationId": f"{action}_{resource}_v{group}_{i}",
+            "tags": [resource, f"group-{group}"],
+            "summary": f"{action.title()} {resource} #{i}",
+            "description": f"Operation {i} to {action} a {resource} in group {group}.",
+            "parameters": [
+                {"name": "item_id", "in": "path", "required": True, "schema": {"type": "integer"}},
+                {"name": "verbose", "in": "query", "required": False, "schema": {"type": "boolean"}},
+            ],
+            "responses": {
+                "200": {
+                    "description": "Successful Response",
+                    "content": {"application/json": {"schema": {"$ref": model} if model else {"type": "object"}}},
+                },
+                "422": {
+                    "description": "Validation Error",
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}}},
+                },
+            },
+        }
+        if method in {"post", "put"} and model:
+            op["requestBody"] = {"required": True, "content": {"application/json": {"schema": {"$ref": model}}}}
+        paths.setdefault(path, {})[method] = op
+
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
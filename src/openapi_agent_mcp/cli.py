@@ -1,25 +1,64 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
+import os
 import sys
 import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 from typing import Any
 
-from .openapi.cache import ensure_dir, write_json_atomic
+from . import daemon
+from .config import DEFAULT_SERVICE
+from .errors import ToolError, error_response
+from .metrics import PROFILER
+from .openapi.cache import ensure_dir, open_temp_file, replace_atomic, write_json_atomic
+from .openapi.lookup import operation_cost
 from .openapi.store import OpenAPIStore
+from .tools.dump_all import dump_all_schemas
+from .tools.export_index import iter_index_records, write_ndjson
 from .tools.get_request_schema import get_request_schema
 from .tools.get_response_schema import get_response_schema
+from .tools.get_schemas import get_schemas
+from .tools.projection import DEFAULT_MAX_BYTES, DEFAULT_MAX_FIELDS
+from .tools.result_cache import ResultCache
 from .tools.search_operations import search_operations
+from .tools.stats import collect_stats
+
+
+def _store_key(args: argparse.Namespace) -> dict[str, Any]:
+    """The global options that shape the store; a daemon only serves commands that agree on all of them."""
+    return {
+        "base_url": args.base_url,
+        "cache_dir": str(Path(args.cache_dir).resolve()),
+        "cache_ttl_seconds": int(args.cache_ttl_seconds),
+        "timeout_seconds": float(args.timeout_seconds),
+        "revalidate": not args.no_revalidate,
+        "disk_snapshot": not args.no_disk_snapshot,
+        "lazy_spec": bool(args.lazy_spec),
+    }
+
+
+def _daemon_socket(args: argparse.Namespace) -> Path:
+    return daemon.socket_path(Path(args.cache_dir), _store_key(args))
 
 
 def _store_from_args(args: argparse.Namespace) -> OpenAPIStore:
+    # Inside the daemon, commands share its warm store.
+    store = getattr(args, "store", None)
+    if store is not None:
+        return store
     return OpenAPIStore(
         base_url=args.base_url,
         cache_dir=Path(args.cache_dir),
         cache_ttl_seconds=int(args.cache_ttl_seconds),
         timeout_seconds=float(args.timeout_seconds),
+        revalidate=not args.no_revalidate,
+        disk_snapshot=not args.no_disk_snapshot,
+        lazy_spec=args.lazy_spec,
     )
 
 
@@ -35,14 +74,45 @@ def cmd_fetch(args: argparse.Namespace) -> int:
     return 0
 
 
+def _index_records(args: argparse.Namespace, store: OpenAPIStore):
+    spec, meta, index = store.load_index()
+    records = iter_index_records(
+        spec=spec,
+        meta=meta,
+        index=index,
+        with_schemas=args.with_schemas,
+        deref_max_depth=int(args.deref_max_depth),
+        deref_max_nodes=int(args.deref_max_nodes),
+        deref_cache=store.deref_cache,
+        prune_components=not args.no_prune_components,
+    )
+    return meta, records
+
+
 def cmd_index(args: argparse.Namespace) -> int:
     store = _store_from_args(args)
-    _spec, meta = store.load()
-    operations = search_operations(store=store, query="", match=None, method=None, limit=10_000)
+    meta, records = _index_records(args, store)
+
+    if args.format == "ndjson":
+        if not args.out:
+            write_ndjson(records, sys.stdout)
+            return 0
+        out_path = Path(args.out)
+        ensure_dir(out_path.parent)
+        raw, tmp_path = open_temp_file(out_path)
+        try:
+            with io.TextIOWrapper(raw, encoding="utf-8") as f:
+                write_ndjson(records, f)
+            replace_atomic(tmp_path, out_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return 0
+
     payload = {
         "generated_at": int(time.time()),
         "source": {"baseUrl": args.base_url, "url": meta.get("url"), "sha256": meta.get("sha256")},
-        "operations": operations if isinstance(operations, list) else [],
+        "operations": list(records),
     }
 
     if args.out:
@@ -63,10 +133,31 @@ def cmd_search(args: argparse.Namespace) -> int:
         method=args.method,
         limit=int(args.limit),
     )
-    _print_json(result)
+    if args.format == "ndjson" and isinstance(result, list):
+        write_ndjson(result, sys.stdout)
+    else:
+        _print_json(result)
     return 0
 
 
+def _projection_args(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "pointer": args.pointer,
+        "required_only": args.required_only,
+        "mode": "skeleton" if args.skeleton else "full",
+        "max_fields": int(args.max_fields),
+        "max_bytes": int(args.max_bytes),
+    }
+
+
+def _add_projection_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--pointer", default=None, help="Return only this JSON-pointer subtree of the result (e.g. /body/schema/properties/lines)")
+    p.add_argument("--required-only", action="store_true", help="Drop object properties that are not required")
+    p.add_argument("--skeleton", action="store_true", help="Return field paths and types instead of expanded schemas")
+    p.add_argument("--max-fields", default=str(DEFAULT_MAX_FIELDS), help=f"Skeleton field cap (default: {DEFAULT_MAX_FIELDS})")
+    p.add_argument("--max-bytes", default=str(DEFAULT_MAX_BYTES), help=f"Skeleton size cap in bytes (default: {DEFAULT_MAX_BYTES})")
+
+
 def cmd_schema_request(args: argparse.Namespace) -> int:
     store = _store_from_args(args)
     result = get_request_schema(
@@ -74,6 +165,9 @@ def cmd_schema_request(args: argparse.Namespace) -> int:
         operationId=args.operation_id,
         deref_max_depth=int(args.deref_max_depth),
         deref_max_nodes=int(args.deref_max_nodes),
+        result_cache=getattr(args, "result_cache", None),
+        prune_components=not args.no_prune_components,
+        **_projection_args(args),
     )
     _print_json(result)
     return 0
@@ -86,19 +180,202 @@ def cmd_schema_response(args: argparse.Namespace) -> int:
         operationId=args.operation_id,
         deref_max_depth=int(args.deref_max_depth),
         deref_max_nodes=int(args.deref_max_nodes),
+        result_cache=getattr(args, "result_cache", None),
+        prune_components=not args.no_prune_components,
+        status_codes=args.status_code,
+        **_projection_args(args),
+    )
+    _print_json(result)
+    return 0
+
+
+def cmd_schema_batch(args: argparse.Namespace) -> int:
+    store = _store_from_args(args)
+    result = get_schemas(
+        store=store,
+        operationIds=args.operation_id,
+        deref_max_depth=int(args.deref_max_depth),
+        deref_max_nodes=int(args.deref_max_nodes),
+        result_cache=getattr(args, "result_cache", None),
+        prune_components=not args.no_prune_components,
+    )
+    _print_json(result)
+    return 0
+
+
+def cmd_schema_dump_all(args: argparse.Namespace) -> int:
+    # Finish the background snapshot write before the pool competes with it for CPU and memory.
+    spec, meta, index = store.load_index()
+    # No background writer may be mid-flight when the pool forks.
+    store.flush_disk_snapshot()
+    started = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        sys.stderr.write(f"[dump-all] {done}/{total} operations ({time.perf_counter() - started:.1f}s)\n")
+
+    summary = dump_all_schemas(
+        spec=spec,
+        meta=meta,
+        index=index,
+        deref_max_depth=int(args.deref_max_depth),
+        deref_max_nodes=int(args.deref_max_nodes),
+        prune_components=not args.no_prune_components,
+        out_dir=Path(args.out_dir) if args.out_dir else None,
+        out=Path(args.out) if args.out else None,
+        workers=int(args.workers) if args.workers else None,
+        progress=None if args.quiet else progress,
     )
+    _print_json(summary)
+    return 0
+
+
+def cmd_schema_cost(args: argparse.Namespace) -> int:
+    store = _store_from_args(args)
+    try:
+        result = operation_cost(store.snapshot().index, args.operation_id)
+    except ToolError as e:
+        result = error_response(e.code, e.message, e.details)
     _print_json(result)
     return 0
 
 
+def cmd_stats(args: argparse.Namespace) -> int:
+    store = _store_from_args(args)
+    store.load_index()
+    if args.operation_id:
+        get_schemas(
+            store=store,
+            operationIds=args.operation_id,
+            deref_max_depth=int(args.deref_max_depth),
+            deref_max_nodes=int(args.deref_max_nodes),
+            prune_components=not args.no_prune_components,
+        )
+    cache = getattr(args, "result_cache", None)
+    _print_json(collect_stats([(DEFAULT_SERVICE, store)], {DEFAULT_SERVICE: cache} if cache is not None else None))
+    return 0
+
+
+def _run_for_client(
+    argv: list[str], cwd: str, *, key: dict[str, Any], store: OpenAPIStore, result_cache: ResultCache
+) -> dict[str, Any]:
+    """
+    Run one forwarded command against the warm store, capturing its output. The client's
+    `--profile-slow-ms` applies to this command only.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    previous_cwd = os.getcwd()
+    profiler_settings = (PROFILER.directory, PROFILER.threshold_ms)
+    rc: Any = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            args = build_parser().parse_args(argv)
+            if _store_key(args) != key or _runs_locally(args):
+                return {"error": "command not served by this daemon"}
+            args.store, args.result_cache = store, result_cache
+            if float(args.profile_slow_ms) > 0:
+                PROFILER.configure(Path(key["cache_dir"]) / "profiles", float(args.profile_slow_ms))
+            os.chdir(cwd)
+            rc = args.func(args)
+        except SystemExit as e:
+            rc = e.code
+        except Exception:
+            traceback.print_exc()
+            rc = 1
+        finally:
+            os.chdir(previous_cwd)
+            PROFILER.configure(*profiler_settings)
+    if not isinstance(rc, int):
+        rc = 0 if rc is None else 1
+    return {"rc": rc, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    path = _daemon_socket(args)
+    if args.stop or args.status:
+        reply = daemon.request(path, {"op": "stop" if args.stop else "status"})
+        if reply is None:
+            sys.stderr.write(f"[daemon] not running ({path})\n")
+            return 1
+        _print_json({k: v for k, v in reply.items() if k != "v"})
+        return 0
+    if not daemon.supported():
+        sys.stderr.write("[daemon] Unix domain sockets are not available on this platform\n")
+        return 1
+
+    key = _store_key(args)
+    args.cache_dir = key["cache_dir"]
+    store = _store_from_args(args)
+    result_cache = ResultCache()
+    store.add_listener(result_cache.invalidate)
+    _spec, meta, _index = store.load_index()
+    started = time.time()
+    served = 0
+
+    def handle(message: dict[str, Any]) -> dict[str, Any]:
+        nonlocal served
+        if message.get("op") == "status":
+            return {
+                "pid": os.getpid(),
+                "socket": str(path),
+                "startedAt": int(started),
+                "served": served,
+                "store": key,
+                **collect_stats([(DEFAULT_SERVICE, store)], {DEFAULT_SERVICE: result_cache}),
+            }
+        if message.get("op") != "run" or not isinstance(message.get("argv"), list):
+            return {"error": "unsupported message"}
+        served += 1
+        return _run_for_client(
+            [str(a) for a in message["argv"]],
+            str(message.get("cwd") or os.getcwd()),
+            key=key,
+            store=store,
+            result_cache=result_cache,
+        )
+
+    def ready() -> None:
+        sys.stderr.write(f"[daemon] {meta.get('sha256')} ready on {path} (pid {os.getpid()})\n")
+        sys.stderr.flush()
+
+    try:
+        daemon.serve(path, handle, idle_timeout_seconds=float(args.idle_timeout_seconds), ready=ready)
+    except RuntimeError as e:
+        sys.stderr.write(f"[daemon] {e}\n")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    sys.stderr.write(f"[daemon] stopped after {served} commands\n")
+    return 0
+
+
+# dump-all runs a process pool of its own; the daemon does not run itself.
+_LOCAL_COMMANDS = {cmd_schema_dump_all, cmd_daemon}
+
+
+def _runs_locally(args: argparse.Namespace) -> bool:
+    """
+    Commands the daemon must not serve: `_LOCAL_COMMANDS`, and `index --format ndjson` to
+    stdout, which streams records that a forwarded reply would have to hold in memory.
+    """
+    if args.func in _LOCAL_COMMANDS:
+        return True
+    return args.func is cmd_index and args.format == "ndjson" and not args.out
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="openapi-agent-mcp")
     p.add_argument("--base-url", required=True, help="Service base URL (e.g. http://localhost:8000)")
     p.add_argument("--cache-dir", default=".cache", help="Cache directory (default: .cache)")
     p.add_argument("--cache-ttl-seconds", default="0", help="Optional TTL to skip refetching (default: 0)")
     p.add_argument("--timeout-seconds", default="10", help="HTTP timeout seconds (default: 10)")
+    p.add_argument("--no-revalidate", action="store_true", help="Disable ETag/Last-Modified conditional GET")
+    p.add_argument("--no-disk-snapshot", action="store_true", help="Do not read/write the binary spec+index snapshot")
+    p.add_argument("--lazy-spec", action="store_true", help="Memory-map the cached spec and parse only the entries used")
+    p.add_argument("--no-prune-components", action="store_true", help="Return all components instead of only referenced ones")
     p.add_argument("--deref-max-depth", default="20", help="Max deref depth (default: 20)")
     p.add_argument("--deref-max-nodes", default="20000", help="Max deref nodes (default: 20000)")
+    p.add_argument("--no-daemon", action="store_true", help="Always run in this process, even if a daemon is running")
+    p.add_argument("--profile-slow-ms", default="0", help="Write a cProfile dump under <cache-dir>/profiles for schema/search calls slower than this (default: off)")
 
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -107,12 +384,15 @@ def build_parser() -> argparse.ArgumentParser:
 
     index = sub.add_parser("index", help="Build operation index and write to file/stdout")
     index.add_argument("--out", help="Output file path (e.g. .cache/index.json)")
+    index.add_argument("--format", choices=["json", "ndjson"], default="json", help="json document or one operation per line (default: json)")
+    index.add_argument("--with-schemas", action="store_true", help="Include dereferenced request/response schemas per operation")
     index.set_defaults(func=cmd_index)
 
     search = sub.add_parser("search", help="Search operations")
-    search.add_argument("--query", default="", help="Search query (substring match)")
+    search.add_argument("--query", default="", help='Search query: terms are AND-ed, OR separates alternatives, tag:/path:/id:/method: prefixes, "quoted phrases"')
     search.add_argument("--method", default=None, help="HTTP method filter (GET/POST/...)")
     search.add_argument("--limit", default="50", help="Max results (default: 50)")
+    search.add_argument("--format", choices=["json", "ndjson"], default="json", help="json array or one result per line (default: json)")
     search.set_defaults(func=cmd_search)
 
     schema = sub.add_parser("schema", help="Print request/response schema for an operationId")
@@ -120,18 +400,67 @@ def build_parser() -> argparse.ArgumentParser:
 
     req = schema_sub.add_parser("request", help="Get request schema by operationId")
     req.add_argument("--operation-id", required=True)
+    _add_projection_arguments(req)
     req.set_defaults(func=cmd_schema_request)
 
     resp = schema_sub.add_parser("response", help="Get response schema by operationId")
     resp.add_argument("--operation-id", required=True)
+    resp.add_argument("--status-code", nargs="+", default=None, help="Only these status codes (200, 2XX, default)")
+    _add_projection_arguments(resp)
     resp.set_defaults(func=cmd_schema_response)
 
+    batch = schema_sub.add_parser("batch", help="Get request and response schemas for several operationIds")
+    batch.add_argument("--operation-id", required=True, nargs="+")
+    batch.set_defaults(func=cmd_schema_batch)
+
+    dump = schema_sub.add_parser("dump-all", help="Write request/response schemas for every operation, in parallel")
+    dump_out = dump.add_mutually_exclusive_group(required=True)
+    dump_out.add_argument("--out-dir", help="Directory for one <operationId>.json per operation plus manifest.json")
+    dump_out.add_argument("--out", help="Single NDJSON file with one operation per line")
+    dump.add_argument("--workers", default=None, help="Worker processes (default: CPU count)")
+    dump.add_argument("--quiet", action="store_true", help="No progress output on stderr")
+    dump.set_defaults(func=cmd_schema_dump_all)
+
+    cost = schema_sub.add_parser("cost", help="Show deref node/depth cost of an operation's schemas")
+    cost.add_argument("--operation-id", required=True)
+    cost.set_defaults(func=cmd_schema_cost)
+
+    stats = sub.add_parser("stats", help="Load the spec and print metrics and cache statistics")
+    stats.add_argument("--operation-id", nargs="*", default=[], help="Build schemas for these operationIds first")
+    stats.set_defaults(func=cmd_stats)
+
+    serve = sub.add_parser("daemon", help="Keep a warm store behind a Unix socket; other commands use it while it runs")
+    serve.add_argument("--idle-timeout-seconds", default="0", help="Exit after this long without commands (default: 0, never)")
+    serve_ctl = serve.add_mutually_exclusive_group()
+    serve_ctl.add_argument("--stop", action="store_true", help="Stop the daemon for these options")
+    serve_ctl.add_argument("--status", action="store_true", help="Print the running daemon's status and cache stats")
+    serve.set_defaults(func=cmd_daemon)
+
     return p
 
 
+def _run_in_daemon(args: argparse.Namespace, argv: list[str]) -> int | None:
+    """Forward the command to a running daemon; None if there is none to serve it."""
+    if args.no_daemon or _runs_locally(args):
+        return None
+    reply = daemon.request(
+        _daemon_socket(args), {"op": "run", "argv": argv, "cwd": os.getcwd()}, timeout=daemon.RUN_TIMEOUT_SECONDS
+    )
+    if reply is None or "error" in reply:
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return int(reply.get("rc", 1))
+
+
 def main(argv: list[str] | None = None) -> None:
     parser = build_parser()
+    argv = list(sys.argv[1:] if argv is None else argv)
     args = parser.parse_args(argv)
-    rc = args.func(args)
+    rc = _run_in_daemon(args, argv)
+    if rc is None:
+        if float(args.profile_slow_ms) > 0:
+            PROFILER.configure(Path(args.cache_dir) / "profiles", float(args.profile_slow_ms))
+        rc = args.func(args)
     raise SystemExit(rc)
 
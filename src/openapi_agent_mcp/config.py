@@ -1,9 +1,60 @@
 from __future__ import annotations
 
+import json
 import os
+import re
 from dataclasses import dataclass
 from pathlib import Path
 
+DEFAULT_SERVICE = "default"
+
+_SERVICE_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _check_service_name(name: str) -> str:
+    if not _SERVICE_NAME_RE.match(name) or name in {".", ".."}:
+        raise ValueError(f"Invalid service name: {name!r} (use letters, digits, '_', '-', '.')")
+    return name
+
+
+def parse_services(raw: str) -> dict[str, str]:
+    """Parse `name=url,name2=url2` (commas or newlines) into a name -> base URL mapping."""
+    services: dict[str, str] = {}
+    for item in re.split(r"[,\n]", raw):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if not sep or not url.strip():
+            raise ValueError(f"Invalid service entry (expected name=url): {item!r}")
+        services[_check_service_name(name.strip())] = url.strip()
+    return services
+
+
+def load_services_file(path: Path) -> dict[str, str]:
+    """
+    Read services from JSON: `{"services": {"hr": "http://..."}}`, where a value may also be
+    an object with a `base_url` key. A bare top-level mapping is accepted too.
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    entries = data.get("services", data) if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        raise ValueError(f"Services file must contain an object of services: {path}")
+    services: dict[str, str] = {}
+    for name, value in entries.items():
+        url = value.get("base_url") if isinstance(value, dict) else value
+        if not isinstance(url, str) or not url.strip():
+            raise ValueError(f"Service {name!r} in {path} has no base_url")
+        services[_check_service_name(str(name))] = url.strip()
+    return services
+
 
 @dataclass(frozen=True)
 class Config:
@@ -13,18 +64,57 @@ class Config:
     request_timeout_seconds: float = 10.0
     deref_max_depth: int = 20
     deref_max_nodes: int = 20_000
+    revalidate: bool = True
+    refresh_interval_seconds: float = 0.0
+    deref_cache_size: int = 2048
+    result_cache_max_bytes: int = 32 * 1024 * 1024
+    result_cache_persist: bool = False
+    disk_snapshot: bool = True
+    lazy_spec: bool = False
+    prune_components: bool = True
+    profile_slow_ms: float = 0.0
+    services: tuple[tuple[str, str], ...] = ()
+
+    def service_cache_dir(self, name: str) -> Path:
+        """
+        `cache_dir` itself for the legacy `default` service, else `cache_dir/services/<name>`,
+        which cannot collide with the default service's files or the `profiles`/`daemon` dirs.
+        """
+        return self.cache_dir if name == DEFAULT_SERVICE else self.cache_dir / "services" / name
+
+    def service_urls(self) -> dict[str, str]:
+        """Named services to serve; a lone OPENAPI_BASE_URL is exposed as `default`."""
+        out: dict[str, str] = {}
+        if self.base_url:
+            out[DEFAULT_SERVICE] = self.base_url
+        out.update(dict(self.services))
+        return out
 
     @staticmethod
     def from_env() -> "Config":
         base_url = os.environ.get("OPENAPI_BASE_URL", "").strip()
-        if not base_url:
-            raise ValueError("Missing required env var: OPENAPI_BASE_URL")
+        services: dict[str, str] = {}
+        services_file = os.environ.get("OPENAPI_SERVICES_FILE", "").strip()
+        if services_file:
+            services.update(load_services_file(Path(services_file)))
+        services.update(parse_services(os.environ.get("OPENAPI_SERVICES", "")))
+        if not base_url and not services:
+            raise ValueError("Missing required env var: OPENAPI_BASE_URL (or OPENAPI_SERVICES / OPENAPI_SERVICES_FILE)")
 
         cache_dir = Path(os.environ.get("OPENAPI_CACHE_DIR", ".cache"))
         cache_ttl_seconds = int(os.environ.get("OPENAPI_CACHE_TTL_SECONDS", "0"))
         request_timeout_seconds = float(os.environ.get("OPENAPI_REQUEST_TIMEOUT_SECONDS", "10"))
         deref_max_depth = int(os.environ.get("OPENAPI_DEREF_MAX_DEPTH", "20"))
         deref_max_nodes = int(os.environ.get("OPENAPI_DEREF_MAX_NODES", "20000"))
+        revalidate = _env_bool("OPENAPI_REVALIDATE", True)
+        refresh_interval_seconds = float(os.environ.get("OPENAPI_REFRESH_INTERVAL_SECONDS", "0"))
+        deref_cache_size = int(os.environ.get("OPENAPI_DEREF_CACHE_SIZE", "2048"))
+        result_cache_max_bytes = int(os.environ.get("OPENAPI_RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        result_cache_persist = _env_bool("OPENAPI_RESULT_CACHE_PERSIST", False)
+        disk_snapshot = _env_bool("OPENAPI_DISK_SNAPSHOT", True)
+        lazy_spec = _env_bool("OPENAPI_LAZY_SPEC", False)
+        prune_components = _env_bool("OPENAPI_PRUNE_COMPONENTS", True)
+        profile_slow_ms = float(os.environ.get("OPENAPI_PROFILE_SLOW_MS", "0"))
 
         return Config(
             base_url=base_url,
@@ -33,5 +123,15 @@ class Config:
             request_timeout_seconds=request_timeout_seconds,
             deref_max_depth=deref_max_depth,
             deref_max_nodes=deref_max_nodes,
+            revalidate=revalidate,
+            refresh_interval_seconds=refresh_interval_seconds,
+            deref_cache_size=deref_cache_size,
+            result_cache_max_bytes=result_cache_max_bytes,
+            result_cache_persist=result_cache_persist,
+            disk_snapshot=disk_snapshot,
+            lazy_spec=lazy_spec,
+            prune_components=prune_components,
+            profile_slow_ms=profile_slow_ms,
+            services=tuple(services.items()),
         )
 
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+PROTOCOL_VERSION = 1
+CONNECT_TIMEOUT_SECONDS = 1.0
+# How long the daemon waits for a client to send its request line.
+READ_TIMEOUT_SECONDS = 5.0
+# Default wait for a reply; control messages (ping/status/stop) answer immediately.
+REPLY_TIMEOUT_SECONDS = 10.0
+# Wait for a forwarded command, after which the client gives up and runs it in-process.
+RUN_TIMEOUT_SECONDS = 600.0
+_ACCEPT_POLL_SECONDS = 0.25
+
+# sockaddr_un.sun_path is 104-108 bytes depending on the platform.
+_MAX_SOCKET_PATH = 100
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def socket_path(cache_dir: Path, key: dict[str, Any]) -> Path:
+    """
+    Where the daemon for these store settings listens: `<cache_dir>/daemon/<hash>.sock`,
+    or `<tempdir>/openapi-agent-mcp-<uid>/<hash>.sock` when that would be too long for a
+    Unix socket. Either directory is created private to the user (see `_private_dir`).
+    """
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    path = cache_dir.resolve() / "daemon" / f"{digest}.sock"
+    if len(str(path)) <= _MAX_SOCKET_PATH:
+        return path
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"openapi-agent-mcp-{uid}" / f"{digest}.sock"
+
+
+def _owned(st: os.stat_result) -> bool:
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _trusted(path: Path) -> bool:
+    """
+    A socket this user created: owned by us, no group/other permissions, in a directory that
+    is ours and not writable by anyone else. Anything else might be another user's listener.
+    """
+    try:
+        st = os.lstat(path)
+        parent = os.stat(path.parent)
+    except OSError:
+        return False
+    return (
+        stat.S_ISSOCK(st.st_mode)
+        and _owned(st)
+        and not st.st_mode & 0o077
+        and _owned(parent)
+        and not parent.st_mode & 0o022
+    )
+
+
+def _private_dir(path: Path) -> None:
+    """Create `path` with mode 0700; refuse an existing one another user owns or can write to."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.stat(path)
+    if not _owned(st) or st.st_mode & 0o022:
+        raise RuntimeError(f"refusing to use {path}: not owned by this user or writable by others")
+
+
+def _read_line(conn: socket.socket) -> bytes:
+    chunks: list[bytes] = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def _send(conn: socket.socket, message: dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+
+def request(
+    path: Path, message: dict[str, Any], *, timeout: float | None = REPLY_TIMEOUT_SECONDS
+) -> dict[str, Any] | None:
+    """
+    Send one message to the daemon at `path` and wait up to `timeout` seconds (None: no
+    limit) for its reply. None when no trusted daemon is listening there, it does not answer
+    in time or it speaks another protocol version, so callers can run in-process.
+    """
+    if not supported() or not _trusted(path):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(CONNECT_TIMEOUT_SECONDS)
+        conn.connect(str(path))
+        conn.settimeout(timeout)
+        _send(conn, {"v": PROTOCOL_VERSION, **message})
+        raw = _read_line(conn)
+    except OSError:
+        return None
+    finally:
+        conn.close()
+    try:
+        reply = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(reply, dict) or reply.get("v") != PROTOCOL_VERSION:
+        return None
+    return reply
+
+
+def _bind(path: Path) -> socket.socket:
+    _private_dir(path.parent)
+    if path.exists() or path.is_symlink():
+        if request(path, {"op": "ping"}) is not None:
+            raise RuntimeError(f"a daemon is already listening on {path}")
+        path.unlink()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(str(path))
+        os.chmod(path, 0o600)
+        sock.listen(16)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def serve(
+    path: Path,
+    handle: Callable[[dict[str, Any]], dict[str, Any]],
+    *,
+    idle_timeout_seconds: float = 0.0,
+    ready: Callable[[], None] | None = None,
+) -> int:
+    """
+    Answer newline-delimited JSON messages on a Unix socket at `path` until a `stop` message
+    arrives or nothing came in for `idle_timeout_seconds` (0: never). Each connection gets
+    its own thread and `READ_TIMEOUT_SECONDS` to send its message, so a stalled client holds
+    up nobody else; `ping` and `stop` are answered here, everything else is passed to
+    `handle` one message at a time. Returns the number of messages served.
+    """
+    sock = _bind(path)
+    stopping = threading.Event()
+    dispatch = threading.Lock()
+    state_lock = threading.Lock()
+    served = 0
+    last_seen = time.monotonic()
+    workers: list[threading.Thread] = []
+
+    def serve_connection(conn: socket.socket) -> None:
+        nonlocal served, last_seen
+        with conn:
+            conn.settimeout(READ_TIMEOUT_SECONDS)
+            try:
+                message = json.loads(_read_line(conn))
+            except (OSError, ValueError):
+                message = None
+            if not isinstance(message, dict) or message.get("v") != PROTOCOL_VERSION:
+                reply: dict[str, Any] = {"error": "unsupported message"}
+            elif message.get("op") == "ping":
+                reply = {"pid": os.getpid()}
+            elif message.get("op") == "stop":
+                reply = {"stopped": True}
+                stopping.set()
+            else:
+                with dispatch:
+                    reply = handle(message)
+            with state_lock:
+                served += 1
+                last_seen = time.monotonic()
+            try:
+                conn.settimeout(READ_TIMEOUT_SECONDS)
+                _send(conn, {"v": PROTOCOL_VERSION, **reply})
+            except OSError:
+                pass
+
+    sock.settimeout(_ACCEPT_POLL_SECONDS)
+    if ready is not None:
+        ready()
+    try:
+        while not stopping.is_set():
+            try:
+                conn, _addr = sock.accept()
+            except socket.timeout:
+                with state_lock:
+                    idle = time.monotonic() - last_seen
+                if idle_timeout_seconds > 0 and idle >= idle_timeout_seconds and not any(w.is_alive() for w in workers):
+                    break
+                continue
+            with state_lock:
+                last_seen = time.monotonic()
+            worker = threading.Thread(target=serve_connection, args=(conn,), name="openapi-daemon-conn", daemon=True)
+            worker.start()
+            workers = [w for w in workers if w.is_alive()] + [worker]
+    finally:
+        sock.close()
+        path.unlink(missing_ok=True)
+        for worker in workers:
+            worker.join()
+    return served
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import itertools
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# cProfile hooks are process-wide: at most one SlowCallProfiler.run profiles at a time.
+_PROFILE_LOCK = threading.Lock()
+
+LATENCY_BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+COUNT_BUCKETS: tuple[float, ...] = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are reported as the upper bound of their bucket."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": [
+                {"le": bound, "count": n} for bound, n in zip(self.bounds + (float("inf"),), self.counts) if n
+            ],
+        }
+
+
+class Metrics:
+    """
+    Process-wide counters and histograms (tool latency, fetch outcomes and bytes, index
+    build time, deref node counts and budget hits). Thread-safe; names are dotted strings.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[str, int] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(bounds)
+            histogram.observe(value)
+
+    def observe_since(self, name: str, started: float) -> float:
+        """Record the milliseconds elapsed since `started` (a `time.perf_counter()` value)."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.observe(name, elapsed_ms)
+        return elapsed_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+METRICS = Metrics()
+
+
+class SlowCallProfiler:
+    """
+    Opt-in cProfile capture: calls run through `run` are profiled and, when they take at
+    least `threshold_ms`, their stats are dumped as `<directory>/<time>-<name>-<ms>ms-<pid>-<n>.prof`
+    (open with `python -m pstats`). Only one profiler can be active per process (enforced
+    since Python 3.12), so calls made while another one is being profiled, including nested
+    calls, run unprofiled.
+    """
+
+    def __init__(self) -> None:
+        self.directory: Path | None = None
+        self.threshold_ms = 0.0
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.threshold_ms > 0
+
+    def configure(self, directory: Path | None, threshold_ms: float) -> None:
+        self.directory = directory
+        self.threshold_ms = float(threshold_ms)
+
+    def run(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if not self.enabled or not _PROFILE_LOCK.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Some other profiler or tracer (e.g. coverage) owns the process-wide hook.
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if elapsed_ms >= self.threshold_ms:
+                    self._dump(profile, name, elapsed_ms)
+        finally:
+            _PROFILE_LOCK.release()
+
+    def _dump(self, profile: cProfile.Profile, name: str, elapsed_ms: float) -> None:
+        directory = self.directory
+        if directory is None:
+            return
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = directory / f"{stamp}-{name}-{int(elapsed_ms)}ms-{os.getpid()}-{next(self._seq)}.prof"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(path))
+        except OSError:
+            return
+        METRICS.incr("profile.captured")
+
+
+PROFILER = SlowCallProfiler()
+
+
+def _record_call(name: str, started: float, result: Any) -> None:
+    METRICS.observe_since(f"tool.{name}", started)
+    if isinstance(result, dict) and "error" in result:
+        METRICS.incr(f"tool.{name}.errors")
+
+
+def timed_tool(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Record the latency (`tool.<name>`) and error responses (`tool.<name>.errors`) of a tool entry point."""
+
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def run_async(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                _record_call(name, started, result)
+                return result
+
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            _record_call(name, started, result)
+            return result
+
+        return run
+
+    return wrap
+
+
+def profiled(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Run a (synchronous) function under `PROFILER`, so slow calls leave a profile behind."""
+
+    def wrap(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def run(*args: Any, **kwargs: Any) -> T:
+            return PROFILER.run(name, fn, *args, **kwargs)
+
+        return run
+
+    return wrap
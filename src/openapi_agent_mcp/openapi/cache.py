@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 
 def ensure_dir(path: Path) -> None:
@@ -29,3 +30,12 @@ def write_bytes_atomic(path: Path, data: bytes) -> None:
         f.write(data)
     os.replace(tmp_path, path)
 
+
+def open_temp_file(path: Path) -> tuple[BinaryIO, Path]:
+    """A binary temp file next to `path`, for streaming writes later moved in with `replace_atomic`."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".part")
+    return os.fdopen(fd, "wb"), Path(tmp_name)
+
+
+def replace_atomic(tmp_path: Path, path: Path) -> None:
+    os.replace(tmp_path, path)
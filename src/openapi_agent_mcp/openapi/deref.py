@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Mapping
+
+from ..metrics import COUNT_BUCKETS, METRICS
+from .lru import LRUCache
+from .refgraph import RefGraph, plain_component_key
 
 
 @dataclass(frozen=True)
@@ -10,6 +14,50 @@ class DerefResult:
     kept_ref: bool
 
 
+@dataclass(frozen=True)
+class _Expansion:
+    schema: Any
+    nodes: int
+    depth: int
+
+
+class DerefCache:
+    """
+    Memoized `$ref` target expansions keyed by (spec sha256, ref, max_depth, max_nodes).
+
+    Only expansions that were fully walked (no budget cut) and kept no `$ref` are stored,
+    together with the node count and relative depth they consumed. Such an expansion is
+    independent of where the ref appears, so replaying it while charging the same budget
+    yields exactly what a fresh walk would. Cached schemas are shared between results and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self._lru: LRUCache[tuple[str, str, int, int], _Expansion] = LRUCache(max_entries)
+
+    def get(self, key: tuple[str, str, int, int]) -> _Expansion | None:
+        return self._lru.get(key)
+
+    def put(self, key: tuple[str, str, int, int], value: _Expansion) -> None:
+        self._lru.put(key, value)
+
+    def carry_over(self, previous_sha256: str, sha256: str, keep: Callable[[str], bool]) -> int:
+        """Re-key entries of `previous_sha256` whose ref passes `keep` to `sha256`; drop all others."""
+
+        def rename(key: tuple[str, str, int, int]) -> tuple[str, str, int, int] | None:
+            if key[0] != previous_sha256 or not keep(key[1]):
+                return None
+            return (sha256, *key[1:])
+
+        return self._lru.rekey(rename)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._lru.stats()
+
+
 def schema_contains_ref(schema: Any) -> bool:
     if isinstance(schema, dict):
         if "$ref" in schema:
@@ -26,65 +74,289 @@ def _resolve_local_ref(spec: dict[str, Any], ref: str) -> Any:
     parts = ref[2:].split("/")
     current: Any = spec
     for part in parts:
-        if not isinstance(current, dict) or part not in current:
+        if not isinstance(current, Mapping) or part not in current:
             raise KeyError(f"Unresolvable ref: {ref}")
         current = current[part]
     return current
 
 
+_LEAF = (1, 0)
+_UNKNOWN = object()
+_DONE = object()
+
+
+def _shape(value: Any, shapes: dict[int, tuple[int, int] | None]) -> tuple[int, int] | None:
+    """
+    (node count, height) of a value without any `$ref` key below it, None if it has one.
+
+    Computed iteratively for the whole subtree and memoized per container in `shapes`
+    (keyed by id, so it is only valid while the measured values are alive).
+    """
+    if not isinstance(value, (dict, list)):
+        return _LEAF
+    known = shapes.get(id(value), _UNKNOWN)
+    if known is not _UNKNOWN:
+        return known
+    stack: list[tuple[Any, bool]] = [(value, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if isinstance(node, dict) and "$ref" in node:
+            shapes[id(node)] = None
+            continue
+        children = node.values() if isinstance(node, dict) else node
+        if not children_done:
+            stack.append((node, True))
+            for child in children:
+                if isinstance(child, (dict, list)) and id(child) not in shapes:
+                    stack.append((child, False))
+            continue
+        size, height = 1, 0
+        for child in children:
+            sub = shapes[id(child)] if isinstance(child, (dict, list)) else _LEAF
+            if sub is None:
+                shapes[id(node)] = None
+                break
+            size += sub[0]
+            if sub[1] >= height:
+                height = sub[1] + 1
+        else:
+            shapes[id(node)] = (size, height)
+    return shapes[id(value)]
+
+
+def _copy_json(value: Any) -> Any:
+    if not isinstance(value, (dict, list)):
+        return value
+    root: Any = {} if isinstance(value, dict) else []
+    stack = [(value, root)]
+    while stack:
+        src, dst = stack.pop()
+        for key, item in src.items() if isinstance(src, dict) else enumerate(src):
+            if isinstance(item, (dict, list)):
+                copied: Any = {} if isinstance(item, dict) else []
+                stack.append((item, copied))
+                item = copied
+            if isinstance(dst, dict):
+                dst[key] = item
+            else:
+                dst.append(item)
+    return root
+
+
+def _record(count: int, cuts: int, kept: bool) -> None:
+    METRICS.incr("deref.calls")
+    METRICS.observe("deref.nodes", count, COUNT_BUCKETS)
+    if cuts:
+        METRICS.incr("deref.budget_hits")
+    if kept:
+        METRICS.incr("deref.kept_ref")
+
+
+def _required_view(value: dict[str, Any]) -> dict[str, Any]:
+    """`value` with `properties` narrowed to the names in its `required` list."""
+    properties = value.get("properties")
+    if not isinstance(properties, dict):
+        return value
+    required = value.get("required")
+    names = set(required) if isinstance(required, list) else set()
+    return {**value, "properties": {k: v for k, v in properties.items() if k in names}}
+
+
+_LIST, _DICT, _REF = 0, 1, 2
+
+# Where a value sits, as far as `required_only` cares: a schema, a `properties` map, or anything else.
+_OTHER, _SCHEMA, _SCHEMA_MAP = 0, 1, 2
+_SCHEMA_KEYS = {
+    "properties": _SCHEMA_MAP,
+    "items": _SCHEMA,
+    "additionalProperties": _SCHEMA,
+    "allOf": _SCHEMA,
+    "anyOf": _SCHEMA,
+    "oneOf": _SCHEMA,
+    "not": _SCHEMA,
+}
+
+
+class _Frame:
+    """An open container (or `$ref` expansion) on the explicit deref stack."""
+
+    __slots__ = ("kind", "src", "items", "out", "key", "depth", "pos", "kept", "skip_ref", "ref", "track", "marks")
+
+    def __init__(self, kind: int, src: Any, depth: int, pos: int = _OTHER) -> None:
+        self.kind = kind
+        self.src = src
+        self.depth = depth
+        self.pos = pos
+        self.kept = False
+        self.skip_ref = False
+        if kind == _LIST:
+            self.items: Any = iter(src)
+            self.out: Any = []
+        elif kind == _DICT:
+            self.items = iter(src.items())
+            self.out = {}
+
+    def child_position(self) -> int:
+        """Position of the child being visited: schema lists (`allOf`, tuple `items`) hold schemas."""
+        if self.pos == _SCHEMA:
+            return _SCHEMA if self.kind == _LIST else _SCHEMA_KEYS.get(self.key, _OTHER)
+        return _SCHEMA if self.pos == _SCHEMA_MAP and self.kind != _LIST else _OTHER
+
+
 def deref_schema(
     schema: Any,
     *,
     spec: dict[str, Any],
     max_depth: int,
     max_nodes: int,
+    cache: DerefCache | None = None,
+    spec_hash: str | None = None,
+    graph: RefGraph | None = None,
+    share: bool = True,
+    required_only: bool = False,
 ) -> DerefResult:
-    node_budget = {"count": 0}
-
-    def walk(value: Any, *, depth: int, ref_stack: tuple[str, ...]) -> DerefResult:
-        node_budget["count"] += 1
-        if node_budget["count"] > max_nodes or depth > max_depth:
-            return DerefResult(schema=value, kept_ref=schema_contains_ref(value))
-
-        if isinstance(value, list):
-            kept = False
-            out: list[Any] = []
-            for item in value:
-                res = walk(item, depth=depth + 1, ref_stack=ref_stack)
-                kept = kept or res.kept_ref
-                out.append(res.schema)
-            return DerefResult(schema=out, kept_ref=kept)
-
-        if isinstance(value, dict):
-            if "$ref" in value and isinstance(value.get("$ref"), str):
-                ref = value["$ref"]
-                if ref in ref_stack:
-                    return DerefResult(schema={"$ref": ref}, kept_ref=True)
-
-                target = _resolve_local_ref(spec, ref)
-                resolved = walk(target, depth=depth + 1, ref_stack=ref_stack + (ref,))
-                if not isinstance(resolved.schema, dict):
-                    return DerefResult(schema=resolved.schema, kept_ref=resolved.kept_ref)
-
-                merged: dict[str, Any] = dict(resolved.schema)
-                kept = resolved.kept_ref
-                for k, v in value.items():
-                    if k == "$ref":
-                        continue
-                    sub = walk(v, depth=depth + 1, ref_stack=ref_stack)
-                    merged[k] = sub.schema
-                    kept = kept or sub.kept_ref
-                return DerefResult(schema=merged, kept_ref=kept)
+    """
+    Inline local `$ref`s up to `max_depth`/`max_nodes`; refs on a cycle are kept as-is.
+
+    Walks with an explicit stack, so depth is bounded by `max_depth` rather than the
+    recursion limit. Subtrees without any `$ref` that fit the remaining budget are not
+    copied: the result shares them with `spec` (and with `cache`), so it must be treated
+    as read-only unless `share=False`, which returns a private deep copy.
 
-            kept = False
-            out: dict[str, Any] = {}
-            for k, v in value.items():
-                res = walk(v, depth=depth + 1, ref_stack=ref_stack)
-                kept = kept or res.kept_ref
-                out[k] = res.schema
-            return DerefResult(schema=out, kept_ref=kept)
+    With the snapshot's `graph`, a ref to a ref-free component that fits the budget is
+    shared in O(1), and refs to acyclic components skip cycle bookkeeping. Output is
+    identical either way.
 
-        return DerefResult(schema=value, kept_ref=False)
+    `required_only` drops every property not listed in its schema's `required` while
+    walking. Schemas are the root, `properties` values and `items`/`additionalProperties`/
+    `allOf`/`anyOf`/`oneOf`/`not` members (a `$ref` target counts as whatever the ref
+    replaces); other objects, e.g. examples, are left alone. Such output is never shared with or stored in `cache`/`graph`.
+    """
+    use_cache = cache is not None and bool(spec_hash) and not required_only
+    if required_only:
+        graph = None
+    shapes: dict[int, tuple[int, int] | None] = {}
+    active: set[str] = set()
+    stack: list[_Frame] = []
+    count = cuts = deepest = 0
+    out: Any = None
+    kept = False
+
+    value: Any = schema
+    depth = 0
+    # Only tracked for `required_only`: a `$ref` target takes the position of the ref.
+    position = _SCHEMA
+    while True:
+        # Visit `value`: either finish it into (out, kept) or open a frame and visit its first child.
+        fresh = False
+        count += 1
+        if depth > deepest:
+            deepest = depth
+        if count > max_nodes or depth > max_depth:
+            cuts += 1
+            out, kept = value, _shape(value, shapes) is None
+        elif isinstance(value, (dict, list)):
+            ref = value.get("$ref") if isinstance(value, dict) else None
+            if isinstance(ref, str):
+                if ref in active:
+                    out, kept = {"$ref": ref}, True
+                else:
+                    target_depth = depth + 1
+                    key = (str(spec_hash), ref, max_depth, max_nodes)
+                    hit = cache.get(key) if use_cache else None
+                    component = plain_component_key(ref) if graph is not None else None
+                    sized = graph.ref_expansion(ref) if component is not None else None
+                    frame = _Frame(_REF, value, depth, position)
+                    if (
+                        hit is not None
+                        and count + hit.nodes <= max_nodes
+                        and target_depth + hit.depth <= max_depth
+                    ):
+                        count += hit.nodes
+                        deepest = max(deepest, target_depth + hit.depth)
+                        out, kept = hit.schema, False
+                        frame.track = None
+                    elif (
+                        sized is not None
+                        and not graph.contains_ref(component)
+                        and count + sized[1].nodes <= max_nodes
+                        and target_depth + sized[1].depth <= max_depth
+                    ):
+                        count += sized[1].nodes
+                        deepest = max(deepest, target_depth + sized[1].depth)
+                        out, kept = sized[0], False
+                        frame.track = None
+                        if use_cache:
+                            cache.put(key, _Expansion(out, sized[1].nodes, sized[1].depth))
+                    else:
+                        # A ref into an acyclic component can never be reached again while it is expanding.
+                        frame.track = component is None or graph.is_cyclic(component)
+                        frame.ref = key
+                        frame.marks = (count, cuts, deepest)
+                        value = _resolve_local_ref(spec, ref)
+                        if frame.track:
+                            active.add(ref)
+                        stack.append(frame)
+                        depth = deepest = target_depth
+                        continue
+                    stack.append(frame)
+            else:
+                if required_only and position == _SCHEMA and isinstance(value, dict):
+                    value = _required_view(value)
+                shape = None if required_only else _shape(value, shapes)
+                if shape is not None and count + shape[0] - 1 <= max_nodes and depth + shape[1] <= max_depth:
+                    count += shape[0] - 1
+                    if depth + shape[1] > deepest:
+                        deepest = depth + shape[1]
+                    out, kept = value, False
+                else:
+                    stack.append(_Frame(_DICT if isinstance(value, dict) else _LIST, value, depth, position))
+                    fresh = True
+        else:
+            out, kept = value, False
 
-    return walk(schema, depth=0, ref_stack=())
+        # Hand (out, kept) up the stack until some frame has another child to visit.
+        while stack:
+            frame = stack[-1]
+            if fresh:
+                fresh = False
+            elif frame.kind == _REF:
+                stack.pop()
+                if frame.track is not None:
+                    if frame.track:
+                        active.discard(frame.ref[1])
+                    count_before, cuts_before, outer_deepest = frame.marks
+                    if use_cache and not kept and cuts == cuts_before:
+                        cache.put(frame.ref, _Expansion(out, count - count_before, deepest - frame.depth - 1))
+                    deepest = max(outer_deepest, deepest)
+                if not isinstance(out, dict) or len(frame.src) == 1:
+                    continue
+                # Sibling keys of the `$ref` are walked and merged over the resolved target.
+                frame.kind, frame.items, frame.out, frame.kept = _DICT, iter(frame.src.items()), dict(out), kept
+                frame.skip_ref = True
+                stack.append(frame)
+            elif frame.kind == _LIST:
+                frame.out.append(out)
+                frame.kept = frame.kept or kept
+            else:
+                frame.out[frame.key] = out
+                frame.kept = frame.kept or kept
 
+            child: Any = _DONE
+            if frame.kind == _LIST:
+                child = next(frame.items, _DONE)
+            else:
+                for k, item in frame.items:
+                    if not (frame.skip_ref and k == "$ref"):
+                        frame.key, child = k, item
+                        break
+            if child is not _DONE:
+                value, depth = child, frame.depth + 1
+                if required_only:
+                    position = frame.child_position()
+                break
+            stack.pop()
+            out, kept = frame.out, frame.kept
+        else:
+            _record(count, cuts, kept)
+            return DerefResult(schema=out if share else _copy_json(out), kept_ref=kept)
@@ -1,64 +1,329 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import time
+import urllib.error
 import urllib.request
+import zlib
 from pathlib import Path
 from typing import Any
 
-from .cache import ensure_dir, read_json, write_bytes_atomic, write_json_atomic
+from ..metrics import METRICS
+from .cache import ensure_dir, open_temp_file, read_json, replace_atomic, write_json_atomic
+from .http import AsyncHTTPClient, HTTPStatusError
+from .lazy import load_lazy_spec
+
+_CHUNK_SIZE = 1024 * 64
+
+ACCEPT_ENCODING = "gzip, deflate"
 
 
 def _openapi_url(base_url: str) -> str:
     return base_url.rstrip("/") + "/openapi.json"
 
 
+def _conditional_headers(meta: dict[str, Any] | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if not meta:
+        return headers
+    etag = meta.get("etag")
+    if isinstance(etag, str) and etag:
+        headers["If-None-Match"] = etag
+    last_modified = meta.get("last_modified")
+    if isinstance(last_modified, str) and last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+class _FetchPlan:
+    """Cache decisions shared by the blocking and the asyncio fetch paths."""
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        cache_dir: Path,
+        cache_ttl_seconds: int,
+        revalidate: bool,
+        lazy: bool,
+        previous_spec: dict[str, Any] | None,
+        previous_meta: dict[str, Any] | None,
+    ) -> None:
+        ensure_dir(cache_dir)
+        self.spec_path = cache_dir / "openapi.json"
+        self.meta_path = cache_dir / "openapi.meta.json"
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.lazy = lazy
+        self.previous_spec = previous_spec
+        self.previous_meta = previous_meta
+        self.has_previous = previous_spec is not None and previous_meta is not None
+        self.url = _openapi_url(base_url)
+
+        self.validator_meta: dict[str, Any] | None = None
+        if revalidate:
+            if self.has_previous:
+                self.validator_meta = previous_meta
+            elif self.spec_path.exists() and self.meta_path.exists():
+                self.validator_meta = read_json(self.meta_path)
+        self.validators = _conditional_headers(self.validator_meta)
+        self.headers = {"Accept-Encoding": ACCEPT_ENCODING, **self.validators}
+
+    def read_spec(self, path: Path, *, validate: bool = False) -> Any:
+        return load_lazy_spec(path, validate=validate) if self.lazy else read_json(path)
+
+    def previous_within_ttl(self) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        if self.cache_ttl_seconds <= 0 or not self.has_previous:
+            return None
+        fetched_at = int(self.previous_meta.get("fetched_at", 0))
+        if fetched_at and (int(time.time()) - fetched_at) < self.cache_ttl_seconds:
+            return self.previous_spec, self.previous_meta
+        return None
+
+    def disk_within_ttl(self) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        if self.cache_ttl_seconds <= 0 or not (self.spec_path.exists() and self.meta_path.exists()):
+            return None
+        meta = read_json(self.meta_path)
+        fetched_at = int(meta.get("fetched_at", 0))
+        if fetched_at and (int(time.time()) - fetched_at) < self.cache_ttl_seconds:
+            return self.read_spec(self.spec_path), meta
+        return None
+
+    def accepts_not_modified(self) -> bool:
+        return bool(self.validators) and self.validator_meta is not None
+
+    def not_modified(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        assert self.validator_meta is not None
+        meta = dict(self.validator_meta)
+        meta["fetched_at"] = int(time.time())
+        self.persist_refreshed_meta(self.validator_meta, meta)
+        if self.previous_spec is not None and self.validator_meta is self.previous_meta:
+            return self.previous_spec, meta
+        return self.read_spec(self.spec_path), meta
+
+    def persist_refreshed_meta(self, old: dict[str, Any], new: dict[str, Any]) -> None:
+        """
+        Rewrite the meta of an unchanged spec only when a restart would otherwise see stale
+        data: `fetched_at` drives the TTL, or the validators changed. With TTL 0 and the same
+        validators nothing touches disk.
+        """
+        validators_changed = any(old.get(k) != new.get(k) for k in ("etag", "last_modified"))
+        if self.cache_ttl_seconds > 0 or validators_changed:
+            write_json_atomic(self.meta_path, new)
+
+    def download(self, content_encoding: str | None) -> "_SpecDownload":
+        return _SpecDownload(self, content_encoding)
+
+
+def _observe(outcome: str, started: float, transfer_bytes: int = 0) -> None:
+    """Count the outcome (`fetch.ttl`, `fetch.304`, `fetch.200`) and record its duration and bytes received."""
+    METRICS.incr(f"fetch.{outcome}")
+    METRICS.observe_since("fetch", started)
+    if transfer_bytes:
+        METRICS.incr("fetch.bytes", transfer_bytes)
+
+
+def _decompressor(content_encoding: str | None) -> Any:
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return None
+    if encoding in {"gzip", "x-gzip", "deflate"}:
+        # MAX_WBITS | 32 auto-detects the gzip or zlib header.
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+class _SpecDownload:
+    """
+    Streams a 200 body to a temp file next to the cache, then reuses, or parses and
+    caches, the spec it describes.
+
+    Compressed bodies are decoded chunk by chunk; the sha256 and `size_bytes` always
+    describe the decoded JSON, so they do not depend on the transfer encoding.
+    """
+
+    def __init__(self, plan: _FetchPlan, content_encoding: str | None) -> None:
+        self.plan = plan
+        self.hasher = hashlib.sha256()
+        self.size_bytes = 0
+        self.transfer_bytes = 0
+        self.content_encoding = content_encoding
+        self._decoder = _decompressor(content_encoding)
+        self._file, self._tmp_path = open_temp_file(plan.spec_path)
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self.hasher.update(data)
+            self._file.write(data)
+            self.size_bytes += len(data)
+
+    def feed(self, chunk: bytes) -> None:
+        self.transfer_bytes += len(chunk)
+        self._write(self._decoder.decompress(chunk) if self._decoder is not None else chunk)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def finish(self, *, etag: str | None, last_modified: str | None) -> tuple[dict[str, Any], dict[str, Any]]:
+        try:
+            return self._finish(etag=etag, last_modified=last_modified)
+        finally:
+            self.abort()
+
+    def _finish(self, *, etag: str | None, last_modified: str | None) -> tuple[dict[str, Any], dict[str, Any]]:
+        plan = self.plan
+        if self._decoder is not None:
+            self._write(self._decoder.flush())
+            if not self._decoder.eof:
+                raise ValueError(f"Truncated {self.content_encoding} body from {plan.url}")
+        self._file.close()
+
+        sha256 = self.hasher.hexdigest()
+        meta: dict[str, Any] = {"sha256": sha256, "fetched_at": int(time.time()), "size_bytes": self.size_bytes, "url": plan.url}
+        if self._decoder is not None:
+            meta["content_encoding"] = self.content_encoding
+            meta["transfer_bytes"] = self.transfer_bytes
+        if etag:
+            meta["etag"] = etag
+        if last_modified:
+            meta["last_modified"] = last_modified
+
+        if plan.has_previous and plan.previous_meta.get("sha256") == sha256:
+            plan.persist_refreshed_meta(plan.previous_meta, meta)
+            return plan.previous_spec, meta
+
+        # A new body is fully validated before it replaces the cache; cached files were validated then.
+        spec = plan.read_spec(self._tmp_path, validate=True)
+        replace_atomic(self._tmp_path, plan.spec_path)
+        write_json_atomic(plan.meta_path, meta)
+
+        return spec, meta
+
+
 def fetch_openapi_spec(
     *,
     base_url: str,
     cache_dir: Path,
     cache_ttl_seconds: int,
     timeout_seconds: float,
+    revalidate: bool = True,
+    lazy: bool = False,
+    previous_spec: dict[str, Any] | None = None,
+    previous_meta: dict[str, Any] | None = None,
 ) -> tuple[dict[str, Any], dict[str, Any]]:
     """
     Hash-based caching:
     - Always fetch unless TTL is enabled and still valid.
-    - Store raw JSON and metadata (sha256, fetched_at, size_bytes).
+    - Advertise gzip/deflate; compressed bodies are decoded and written to the cache
+      incrementally, never held in memory as a whole.
+    - Store raw JSON and metadata (sha256 and size_bytes of the decoded body, fetched_at,
+      etag, last_modified, plus content_encoding/transfer_bytes when compressed).
+    - With `revalidate`, send If-None-Match/If-Modified-Since from the previous metadata;
+      a 304 reuses `previous_spec` (or the cached file on cold start); the metadata is only
+      rewritten when a TTL is set (new fetched_at).
+    - With `lazy`, the spec is a `LazyJSONObject` over the memory-mapped cache file: only the
+      `paths`/`components` entries that are accessed get parsed and kept.
+    - If the downloaded sha256 matches `previous_meta`, `previous_spec` is returned as-is:
+      no JSON parse and no spec file rewrite; the metadata is only rewritten when a TTL is
+      set or the validators changed.
     """
 
-    ensure_dir(cache_dir)
-    spec_path = cache_dir / "openapi.json"
-    meta_path = cache_dir / "openapi.meta.json"
+    plan = _FetchPlan(
+        base_url=base_url,
+        cache_dir=cache_dir,
+        cache_ttl_seconds=cache_ttl_seconds,
+        revalidate=revalidate,
+        lazy=lazy,
+        previous_spec=previous_spec,
+        previous_meta=previous_meta,
+    )
+    started = time.perf_counter()
+    cached = plan.previous_within_ttl() or plan.disk_within_ttl()
+    if cached is not None:
+        _observe("ttl", started)
+        return cached
 
-    if cache_ttl_seconds > 0 and spec_path.exists() and meta_path.exists():
-        meta = read_json(meta_path)
-        fetched_at = int(meta.get("fetched_at", 0))
-        if fetched_at and (int(time.time()) - fetched_at) < cache_ttl_seconds:
-            return read_json(spec_path), meta
-
-    url = _openapi_url(base_url)
-    req = urllib.request.Request(url, method="GET")
-
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-        hasher = hashlib.sha256()
-        chunks: list[bytes] = []
-        size_bytes = 0
-        while True:
-            chunk = resp.read(1024 * 64)
-            if not chunk:
-                break
-            hasher.update(chunk)
-            chunks.append(chunk)
-            size_bytes += len(chunk)
-
-    raw = b"".join(chunks)
-    sha256 = hasher.hexdigest()
-    fetched_at = int(time.time())
-
-    write_bytes_atomic(spec_path, raw)
-    meta = {"sha256": sha256, "fetched_at": fetched_at, "size_bytes": size_bytes, "url": url}
-    write_json_atomic(meta_path, meta)
-
-    return json.loads(raw.decode("utf-8")), meta
+    req = urllib.request.Request(plan.url, method="GET", headers=plan.headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
+            download = plan.download(resp.headers.get("Content-Encoding"))
+            try:
+                while True:
+                    chunk = resp.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    download.feed(chunk)
+            except BaseException:
+                download.abort()
+                raise
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not plan.accepts_not_modified():
+            raise
+        e.close()
+        result = plan.not_modified()
+        _observe("304", started)
+        return result
+
+    result = download.finish(etag=etag, last_modified=last_modified)
+    _observe("200", started, download.transfer_bytes)
+    return result
+
+
+async def fetch_openapi_spec_async(
+    *,
+    client: AsyncHTTPClient,
+    base_url: str,
+    cache_dir: Path,
+    cache_ttl_seconds: int,
+    timeout_seconds: float,
+    revalidate: bool = True,
+    lazy: bool = False,
+    previous_spec: dict[str, Any] | None = None,
+    previous_meta: dict[str, Any] | None = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    `fetch_openapi_spec` on the event loop: same caching contract, but the request goes
+    through a keep-alive `AsyncHTTPClient` and all disk I/O (cache reads, streaming the body
+    to the temp file, parsing and cache writes) runs in worker threads so the loop keeps
+    serving other calls.
+    """
+
+    plan = await asyncio.to_thread(
+        _FetchPlan,
+        base_url=base_url,
+        cache_dir=cache_dir,
+        cache_ttl_seconds=cache_ttl_seconds,
+        revalidate=revalidate,
+        lazy=lazy,
+        previous_spec=previous_spec,
+        previous_meta=previous_meta,
+    )
+    started = time.perf_counter()
+    cached = plan.previous_within_ttl() or await asyncio.to_thread(plan.disk_within_ttl)
+    if cached is not None:
+        _observe("ttl", started)
+        return cached
+
+    async with client.get(plan.url, headers=plan.headers, timeout=timeout_seconds) as resp:
+        if resp.status == 304 and plan.accepts_not_modified():
+            result = await asyncio.to_thread(plan.not_modified)
+            _observe("304", started)
+            return result
+        if not 200 <= resp.status < 300:
+            raise HTTPStatusError(plan.url, resp.status, resp.reason)
+        download = await asyncio.to_thread(plan.download, resp.headers.get("content-encoding"))
+        try:
+            async for chunk in resp.iter_chunks(_CHUNK_SIZE):
+                await asyncio.to_thread(download.feed, chunk)
+        except BaseException:
+            download.abort()
+            raise
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
 
+    result = await asyncio.to_thread(download.finish, etag=etag, last_modified=last_modified)
+    _observe("200", started, download.transfer_bytes)
+    return result
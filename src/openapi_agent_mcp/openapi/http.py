@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import ssl
+import urllib.request
+from typing import AsyncIterator
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
+
+_MAX_HEADER_LINES = 200
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+# Same limit as urllib's HTTPRedirectHandler.
+MAX_REDIRECTS = 10
+
+# (scheme, host, port, proxy URL or "") of the origin a pooled connection talks to.
+_Key = tuple[str, str, int, str]
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, url: str, status: int, reason: str) -> None:
+        super().__init__(f"HTTP Error {status}: {reason} ({url})")
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:  # pragma: no cover - transport already gone
+            pass
+
+
+class AsyncResponse:
+    def __init__(
+        self,
+        *,
+        client: "AsyncHTTPClient",
+        key: _Key,
+        conn: _Connection,
+        url: str,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        keep_alive: bool,
+        has_body: bool,
+        timeout: float,
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._client = client
+        self._key = key
+        self._conn: _Connection | None = conn
+        self._keep_alive = keep_alive
+        self._has_body = has_body
+        self._timeout = timeout
+        self._consumed = not has_body
+
+    async def iter_chunks(self, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """Yield the body, undoing chunked transfer-encoding; content-encoding is left as-is."""
+        if self._consumed or self._conn is None:
+            return
+        reader = self._conn.reader
+        if "chunked" in self.headers.get("transfer-encoding", "").lower():
+            while True:
+                line = await self._read(reader.readline())
+                size = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                remaining = size
+                while remaining:
+                    data = await self._read(reader.read(min(remaining, chunk_size)))
+                    if not data:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(data)
+                    yield data
+                await self._read(reader.readexactly(2))
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining:
+                data = await self._read(reader.read(min(remaining, chunk_size)))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(data)
+                yield data
+        else:
+            self._keep_alive = False
+            while True:
+                data = await self._read(reader.read(chunk_size))
+                if not data:
+                    break
+                yield data
+        self._consumed = True
+
+    async def _read(self, aw):
+        return await asyncio.wait_for(aw, self._timeout)
+
+    def release(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._consumed and self._keep_alive:
+            self._client._put_idle(self._key, conn)
+        else:
+            conn.close()
+
+
+class _RequestContext:
+    def __init__(self, client: "AsyncHTTPClient", url: str, headers: dict[str, str], timeout: float) -> None:
+        self._client = client
+        self._url = url
+        self._headers = headers
+        self._timeout = timeout
+        self._response: AsyncResponse | None = None
+
+    async def __aenter__(self) -> AsyncResponse:
+        url = self._url
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._client._send("GET", url, self._headers, self._timeout)
+            location = response.headers.get("location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                self._response = response
+                return response
+            response.release()
+            url = urljoin(url, location)
+        raise HTTPStatusError(url, response.status, f"more than {MAX_REDIRECTS} redirects")
+
+    async def __aexit__(self, *exc) -> None:
+        if self._response is not None:
+            self._response.release()
+
+
+class AsyncHTTPClient:
+    """
+    Minimal asyncio HTTP/1.1 client (stdlib only) with per-host keep-alive pooling.
+
+    Only what fetching `/openapi.json` needs: GET, Content-Length and chunked bodies,
+    HTTP and HTTPS, redirects (up to `MAX_REDIRECTS`) and the `http_proxy`/`https_proxy`/
+    `no_proxy` environment variables the way urllib reads them (HTTPS through a CONNECT
+    tunnel). A pooled connection the server has since closed is retried once on a fresh
+    connection. The pool belongs to the event loop that created it.
+    """
+
+    def __init__(self, *, max_idle_per_host: int = 4, user_agent: str = "openapi-agent-mcp") -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.user_agent = user_agent
+        self.connections_opened = 0
+        self.requests = 0
+        self._idle: dict[_Key, list[_Connection]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ssl: ssl.SSLContext | None = None
+
+    def get(self, url: str, *, headers: dict[str, str] | None = None, timeout: float = 10.0) -> _RequestContext:
+        return _RequestContext(self, url, dict(headers or {}), timeout)
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _put_idle(self, key: _Key, conn: _Connection) -> None:
+        if asyncio.get_running_loop() is not self._loop:
+            conn.close()
+            return
+        bucket = self._idle.setdefault(key, [])
+        if len(bucket) >= self.max_idle_per_host:
+            conn.close()
+            return
+        bucket.append(conn)
+
+    def _take_idle(self, key: _Key) -> _Connection | None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Connections from another (possibly closed) loop cannot be reused.
+            self._idle = {}
+            self._loop = loop
+        bucket = self._idle.get(key)
+        while bucket:
+            conn = bucket.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        return self._ssl
+
+    async def _connect(self, key: _Key, timeout: float) -> _Connection:
+        scheme, host, port, proxy = key
+        if proxy:
+            conn = await asyncio.wait_for(self._connect_via_proxy(key), timeout)
+        else:
+            ssl_ctx = self._ssl_context() if scheme == "https" else None
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=ssl_ctx), timeout)
+            conn = _Connection(reader, writer)
+        self.connections_opened += 1
+        return conn
+
+    async def _connect_via_proxy(self, key: _Key) -> _Connection:
+        scheme, host, port, proxy = key
+        parts = _split_proxy(proxy)
+        if parts.scheme.lower() != "http" or not parts.hostname:
+            raise ValueError(f"Unsupported proxy: {proxy}")
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        conn = _Connection(reader, writer)
+        if scheme != "https":
+            return conn
+        try:
+            lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+            auth = _proxy_authorization(proxy)
+            if auth:
+                lines.append(f"Proxy-Authorization: {auth}")
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+            status_line = await reader.readline()
+            for _ in range(_MAX_HEADER_LINES):
+                if (await reader.readline()) in (b"\r\n", b"\n", b""):
+                    break
+            _version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+            code, _, reason = rest.partition(" ")
+            if code != "200":
+                raise HTTPStatusError(f"{scheme}://{host}:{port}", int(code or 0), f"proxy CONNECT failed: {reason}")
+            await writer.start_tls(self._ssl_context(), server_hostname=host)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def _send(self, method: str, url: str, headers: dict[str, str], timeout: float) -> AsyncResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        proxy = _proxy_for(scheme, parts.hostname)
+        key = (scheme, parts.hostname, port, proxy or "")
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+
+        lines: list[str] = []
+        if proxy and scheme == "http":
+            # Plain HTTP goes to the proxy itself, with the absolute URL as the target.
+            lines.append(f"{method} {scheme}://{host_header}{target} HTTP/1.1")
+            auth = _proxy_authorization(proxy)
+            if auth:
+                lines.append(f"Proxy-Authorization: {auth}")
+        else:
+            lines.append(f"{method} {target} HTTP/1.1")
+        lines.extend([f"Host: {host_header}", f"User-Agent: {self.user_agent}"])
+        lines.append("Connection: keep-alive")
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        conn = self._take_idle(key)
+        reused = conn is not None
+        if conn is None:
+            conn = await self._connect(key, timeout)
+        try:
+            return await self._exchange(key, conn, url, request, method, timeout)
+        except (ConnectionError, asyncio.IncompleteReadError, _EmptyResponse):
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        conn = await self._connect(key, timeout)
+        try:
+            return await self._exchange(key, conn, url, request, method, timeout)
+        except BaseException:
+            conn.close()
+            raise
+
+    async def _exchange(
+        self, key: _Key, conn: _Connection, url: str, request: bytes, method: str, timeout: float
+    ) -> AsyncResponse:
+        self.requests += 1
+        conn.writer.write(request)
+        await asyncio.wait_for(conn.writer.drain(), timeout)
+
+        status_line = await asyncio.wait_for(conn.reader.readline(), timeout)
+        if not status_line:
+            raise _EmptyResponse()
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        code, _, reason = rest.partition(" ")
+        status = int(code)
+
+        headers: dict[str, str] = {}
+        for _ in range(_MAX_HEADER_LINES):
+            line = await asyncio.wait_for(conn.reader.readline(), timeout)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = "close" not in connection and (version.upper() == "HTTP/1.1" or "keep-alive" in connection)
+        has_body = method != "HEAD" and status >= 200 and status not in (204, 304)
+        return AsyncResponse(
+            client=self,
+            key=key,
+            conn=conn,
+            url=url,
+            status=status,
+            reason=reason,
+            headers=headers,
+            keep_alive=keep_alive,
+            has_body=has_body,
+            timeout=timeout,
+        )
+
+
+def _proxy_for(scheme: str, host: str) -> str | None:
+    """The proxy urllib would use for `scheme://host` (environment or system settings), if any."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return proxy
+
+
+def _split_proxy(proxy: str) -> SplitResult:
+    return urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+
+def _proxy_authorization(proxy: str) -> str | None:
+    parts = _split_proxy(proxy)
+    if parts.username is None:
+        return None
+    credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+    return "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+
+
+class _EmptyResponse(Exception):
+    """The server closed a (pooled) connection before sending a status line."""
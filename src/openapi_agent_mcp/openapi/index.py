@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator, Mapping
+
+from .lazy import LazyJSONObject
+from .refgraph import ComponentKey, RefGraph
+from .search import SearchIndex, operation_to_dict
 
 
 @dataclass(frozen=True)
@@ -14,18 +18,77 @@ class Operation:
     description: str | None
 
 
+@dataclass(frozen=True)
+class OperationEntry:
+    operation: Operation
+    op: dict[str, Any]
+    path_item: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class OperationIndex:
+    operations: list[Operation]
+    entries: Mapping[str, OperationEntry]
+    duplicates: dict[str, list[dict[str, str]]]
+    search: SearchIndex
+    refs: RefGraph
+
+
 HTTP_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"}
 
 
-def build_operations(spec: dict[str, Any]) -> tuple[list[Operation], dict[str, Operation]]:
+class _LazyEntries(Mapping[str, OperationEntry]):
+    """operationId -> entry for a lazily parsed spec; only the looked-up path item is materialized."""
+
+    def __init__(self, paths: LazyJSONObject, locations: dict[str, tuple[Operation, str]]) -> None:
+        self._paths = paths
+        self._locations = locations
+
+    def __getitem__(self, operation_id: str) -> OperationEntry:
+        operation, method_key = self._locations[operation_id]
+        path_item = self._paths[operation.path]
+        return OperationEntry(operation=operation, op=path_item[method_key], path_item=path_item)
+
+    def __contains__(self, operation_id: object) -> bool:
+        return operation_id in self._locations
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+def build_index(
+    spec: dict[str, Any],
+    *,
+    previous: OperationIndex | None = None,
+    changed_components: frozenset[ComponentKey] | None = None,
+) -> OperationIndex:
+    """Index every operation by operationId, keeping references to the raw op and path item.
+
+    Duplicate operationIds do not abort indexing; every (method, path) sharing an id is
+    recorded in `duplicates` so lookups can report them.
+
+    With a lazily parsed spec each path item is parsed only for the duration of indexing;
+    entries re-read it on lookup.
+
+    `previous` is the index of an earlier version of the spec: search fields whose values
+    did not change are reused, and when `changed_components` is known to be empty the
+    `$ref` graph carries over too.
+    """
     paths = spec.get("paths")
-    if not isinstance(paths, dict):
+    lazy = isinstance(paths, LazyJSONObject)
+    if not lazy and not isinstance(paths, dict):
         raise ValueError("OpenAPI document missing 'paths' or has invalid structure")
 
     operations: list[Operation] = []
-    by_id: dict[str, Operation] = {}
+    entries: dict[str, OperationEntry] = {}
+    locations: dict[str, tuple[Operation, str]] = {}
+    first: dict[str, Operation] = {}
+    duplicates: dict[str, list[dict[str, str]]] = {}
 
-    for path, path_item in paths.items():
+    for path, path_item in paths.iter_parsed() if lazy else paths.items():
         if not isinstance(path_item, dict):
             continue
         for method, op in path_item.items():
@@ -37,8 +100,6 @@ def build_operations(spec: dict[str, Any]) -> tuple[list[Operation], dict[str, O
             op_id = op.get("operationId")
             if not op_id or not isinstance(op_id, str):
                 continue
-            if op_id in by_id:
-                raise ValueError(f"Duplicate operationId: {op_id}")
 
             tags = op.get("tags") if isinstance(op.get("tags"), list) else []
             tags_out = [str(t) for t in tags if isinstance(t, (str, int, float))]
@@ -52,15 +113,31 @@ def build_operations(spec: dict[str, Any]) -> tuple[list[Operation], dict[str, O
                 description=op.get("description") if isinstance(op.get("description"), str) else None,
             )
             operations.append(operation)
-            by_id[op_id] = operation
 
-    return operations, by_id
+            if op_id in first:
+                matches = duplicates.setdefault(op_id, [{"method": first[op_id].method, "path": first[op_id].path}])
+                matches.append({"method": method_up, "path": str(path)})
+                continue
+            first[op_id] = operation
+            if lazy:
+                locations[op_id] = (operation, method)
+            else:
+                entries[op_id] = OperationEntry(operation=operation, op=op, path_item=path_item)
+
+    return OperationIndex(
+        operations=operations,
+        entries=_LazyEntries(paths, locations) if lazy else entries,
+        duplicates=duplicates,
+        search=SearchIndex(operations, previous=previous.search if previous is not None else None),
+        refs=previous.refs.rebind(spec) if previous is not None and changed_components == frozenset() else RefGraph(spec),
+    )
 
 
-def _maybe_match(value: str | None, query: str) -> bool:
-    if not value:
-        return False
-    return query in value.lower()
+def build_operations(spec: dict[str, Any]) -> tuple[list[Operation], dict[str, Operation]]:
+    index = build_index(spec)
+    if index.duplicates:
+        raise ValueError(f"Duplicate operationId: {next(iter(index.duplicates))}")
+    return index.operations, {op_id: entry.operation for op_id, entry in index.entries.items()}
 
 
 def search_operations(
@@ -70,42 +147,8 @@ def search_operations(
     match: dict[str, bool],
     method: str | None,
     limit: int,
+    search_index: SearchIndex | None = None,
 ) -> list[dict[str, Any]]:
-    q = query.strip().lower()
-    method_up = method.upper() if method else None
-    out: list[dict[str, Any]] = []
-
-    for op in operations:
-        if method_up and op.method != method_up:
-            continue
-
-        if q:
-            ok = False
-            if match.get("operationId", True) and _maybe_match(op.operationId, q):
-                ok = True
-            if not ok and match.get("path", True) and _maybe_match(op.path, q):
-                ok = True
-            if not ok and match.get("tag", True) and any(q in t.lower() for t in op.tags):
-                ok = True
-            if not ok and match.get("summary", True) and _maybe_match(op.summary, q):
-                ok = True
-            if not ok and match.get("description", True) and _maybe_match(op.description, q):
-                ok = True
-            if not ok:
-                continue
-
-        out.append(
-            {
-                "operationId": op.operationId,
-                "method": op.method,
-                "path": op.path,
-                "tags": op.tags,
-                "summary": op.summary,
-                "description": op.description,
-            }
-        )
-        if len(out) >= limit:
-            break
-
-    return out
-
+    """Substring search over the enabled fields, most relevant first (spec order for an empty query)."""
+    engine = search_index if search_index is not None else SearchIndex(list(operations))
+    return [operation_to_dict(op) for op in engine.search(query, match=match, method=method, limit=limit)]
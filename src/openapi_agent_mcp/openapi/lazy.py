@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping
+
+# Byte-level scanning: member boundaries are found without decoding or parsing any value.
+_WS = re.compile(rb"[ \t\n\r]*+")
+_STRING = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+# A run of anything but brackets, with strings (which may contain brackets) consumed whole.
+_FLAT = re.compile(rb'(?:[^"{}\[\]]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+', re.DOTALL)
+_SCALAR = re.compile(rb"-?(?:0|[1-9][0-9]*+)(?:\.[0-9]++)?(?:[eE][+-]?[0-9]++)?|true|false|null")
+_CLOSERS = {b"{": b"}", b"[": b"]"}
+_CLOSER_BYTES = {ord(k): ord(v) for k, v in _CLOSERS.items()}
+
+# Top-level members whose entries are parsed on demand; `components` is lazy one level deeper
+# (`components/schemas/<Name>`, `components/parameters/<Name>`, ...).
+_LAZY_MEMBERS = {"paths"}
+_LAZY_SECTIONS = {"components"}
+
+
+class LazyJSONObject(Mapping[str, Any]):
+    """
+    A JSON object whose member values stay as byte ranges of a memory-mapped file until
+    first accessed; each accessed value is parsed once and then kept.
+    """
+
+    def __init__(self, buf: Any) -> None:
+        self._buf = buf
+        self._slots: dict[str, tuple[int, int] | None] = {}
+        self._values: dict[str, Any] = {}
+
+    def _add_slot(self, key: str, start: int, end: int) -> None:
+        self._slots[key] = (start, end)
+        self._values.pop(key, None)
+
+    def _add_value(self, key: str, value: Any) -> None:
+        self._slots[key] = None
+        self._values[key] = value
+
+    def _validate(self) -> None:
+        for key, span in self._slots.items():
+            if span is not None:
+                self._parse(key)
+
+    def _parse(self, key: str) -> Any:
+        span = self._slots[key]
+        assert span is not None
+        return json.loads(self._buf[span[0] : span[1]])
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self._parse(key)  # KeyError for unknown members
+        return self._values.setdefault(key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __repr__(self) -> str:
+        return f"<LazyJSONObject members={len(self._slots)} materialized={len(self._values)}>"
+
+    def raw(self, key: str) -> bytes | None:
+        """The source bytes of member `key`, or None if it was not loaded lazily."""
+        span = self._slots.get(key)
+        return bytes(self._buf[span[0] : span[1]]) if span is not None else None
+
+    def iter_parsed(self) -> Iterator[tuple[str, Any]]:
+        """(key, value) pairs; members not accessed yet are parsed but not kept."""
+        for key in self._slots:
+            if key in self._values:
+                yield key, self._values[key]
+            else:
+                yield key, self._parse(key)
+
+    def to_dict(self) -> dict[str, Any]:
+        """A plain (JSON-serializable) copy; does not materialize members into this object."""
+        return {k: v.to_dict() if isinstance(v, LazyJSONObject) else v for k, v in self.iter_parsed()}
+
+    def stats(self) -> dict[str, int]:
+        nested = [v for v in self._values.values() if isinstance(v, LazyJSONObject)]
+        return {
+            "members": len(self._slots) + sum(v.stats()["members"] for v in nested),
+            "materialized": sum(1 for v in self._values.values() if not isinstance(v, LazyJSONObject))
+            + sum(v.stats()["materialized"] for v in nested),
+        }
+
+
+def plain(value: Any) -> Any:
+    """`value` as plain JSON data, copying lazy objects into dicts."""
+    return value.to_dict() if isinstance(value, LazyJSONObject) else value
+
+
+def _error(buf: Any, pos: int, expected: str) -> ValueError:
+    if pos >= len(buf):
+        return ValueError("Truncated JSON document")
+    return ValueError(f"Expected {expected} at offset {pos}")
+
+
+def _skip_ws(buf: Any, pos: int) -> int:
+    return _WS.match(buf, pos).end()
+
+
+def _skip_value(buf: Any, pos: int) -> int:
+    """End offset of the JSON value at `pos`; checks bracket nesting but parses nothing."""
+    c = buf[pos : pos + 1]
+    if c == b'"':
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise _error(buf, len(buf), "string")
+        return m.end()
+    if c not in _CLOSERS:
+        m = _SCALAR.match(buf, pos)
+        if m is None:
+            raise _error(buf, pos, "JSON value")
+        return m.end()
+    flat, size = _FLAT.match, len(buf)
+    closers = [_CLOSER_BYTES[buf[pos]]]
+    pos += 1
+    while closers:
+        pos = flat(buf, pos).end()
+        if pos >= size:
+            raise _error(buf, pos, "closing bracket")
+        b = buf[pos]
+        if b == closers[-1]:
+            closers.pop()
+        elif b in _CLOSER_BYTES:
+            closers.append(_CLOSER_BYTES[b])
+        elif b == 0x22:  # an unterminated string stops `_FLAT` right at its opening quote
+            raise _error(buf, size, "string")
+        else:
+            raise _error(buf, pos, repr(chr(closers[-1])))
+        pos += 1
+    return pos
+
+
+def _walk_object(buf: Any, pos: int, handle: Callable[[str, int], int]) -> int:
+    """Call `handle(key, value_start) -> value_end` for every member of the object at `pos`."""
+    if buf[pos : pos + 1] != b"{":
+        raise _error(buf, pos, "JSON object")
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos : pos + 1] == b"}":
+        return pos + 1
+    while True:
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise _error(buf, pos, "member name")
+        key = json.loads(m.group())
+        pos = _skip_ws(buf, m.end())
+        if buf[pos : pos + 1] != b":":
+            raise _error(buf, pos, "':'")
+        pos = _skip_ws(buf, handle(key, _skip_ws(buf, pos + 1)))
+        c = buf[pos : pos + 1]
+        if c == b",":
+            pos = _skip_ws(buf, pos + 1)
+        elif c == b"}":
+            return pos + 1
+        else:
+            raise _error(buf, pos, "',' or '}'")
+
+
+def load_lazy_spec(path: Path, *, validate: bool = False) -> LazyJSONObject:
+    """
+    Memory-map `path` and index the byte ranges of every `paths` entry and every
+    `components/<section>` entry; other top-level members are parsed right away.
+
+    Indexing only scans bytes for member boundaries (bracket nesting is checked, values
+    are not decoded), so a malformed entry normally fails when it is first accessed. With
+    `validate`, every entry is also parsed once and discarded, so it fails here instead.
+    """
+    with path.open("rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    lazy_objects: list[LazyJSONObject] = []
+
+    def lazy_object() -> LazyJSONObject:
+        obj = LazyJSONObject(buf)
+        lazy_objects.append(obj)
+        return obj
+
+    def lazy_members(target: LazyJSONObject) -> Callable[[str, int], int]:
+        def handle(key: str, start: int) -> int:
+            end = _skip_value(buf, start)
+            target._add_slot(key, start, end)
+            return end
+
+        return handle
+
+    def parsed(target: LazyJSONObject, key: str, start: int) -> int:
+        end = _skip_value(buf, start)
+        target._add_value(key, json.loads(buf[start:end]))
+        return end
+
+    def sections(target: LazyJSONObject) -> Callable[[str, int], int]:
+        def handle(key: str, start: int) -> int:
+            if buf[start : start + 1] != b"{":
+                return parsed(target, key, start)
+            child = lazy_object()
+            target._add_value(key, child)
+            return _walk_object(buf, start, lazy_members(child))
+
+        return handle
+
+    root = LazyJSONObject(buf)
+
+    def top(key: str, start: int) -> int:
+        if buf[start : start + 1] != b"{" or not (key in _LAZY_MEMBERS or key in _LAZY_SECTIONS):
+            return parsed(root, key, start)
+        child = lazy_object()
+        root._add_value(key, child)
+        return _walk_object(buf, start, lazy_members(child) if key in _LAZY_MEMBERS else sections(child))
+
+    start = 3 if buf[:3] == b"\xef\xbb\xbf" else 0
+    try:
+        end = _skip_ws(buf, _walk_object(buf, _skip_ws(buf, start), top))
+        if end != len(buf):
+            raise ValueError(f"Extra data after JSON document at offset {end}")
+        if validate:
+            for obj in lazy_objects:
+                obj._validate()
+    except ValueError as exc:
+        raise ValueError(f"{exc}: {path}") from None
+    return root
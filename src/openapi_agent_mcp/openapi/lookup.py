@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Mapping
 
 from ..errors import ToolError
-from .index import HTTP_METHODS
+from ..metrics import METRICS
+from .content_type import choose_content_type
+from .index import HTTP_METHODS, OperationIndex
+from .refgraph import Expansion
 
 
 def find_operation(spec: dict[str, Any], operation_id: str) -> tuple[str, str, dict[str, Any], dict[str, Any]]:
     paths = spec.get("paths")
-    if not isinstance(paths, dict):
+    if not isinstance(paths, Mapping):
         raise ToolError(code="OPENAPI_INVALID", message="OpenAPI document missing 'paths' or has invalid structure")
 
     found: list[tuple[str, str, dict[str, Any], dict[str, Any]]] = []
@@ -38,3 +41,65 @@ def find_operation(spec: dict[str, Any], operation_id: str) -> tuple[str, str, d
         )
     return found[0]
 
+
+def lookup_operation(index: OperationIndex, operation_id: str) -> tuple[str, str, dict[str, Any], dict[str, Any]]:
+    """Same contract as `find_operation`, answered from a prebuilt index in O(1)."""
+    METRICS.incr("lookup.calls")
+    matches = index.duplicates.get(operation_id)
+    if matches:
+        raise ToolError(
+            code="OPERATION_NOT_UNIQUE",
+            message=f"operationId is not unique: {operation_id}",
+            details={"operationId": operation_id, "matches": matches},
+        )
+    entry = index.entries.get(operation_id)
+    if entry is None:
+        METRICS.incr("lookup.not_found")
+        raise ToolError(
+            code="OPERATION_NOT_FOUND",
+            message=f"operationId not found: {operation_id}",
+            details={"operationId": operation_id},
+        )
+    return entry.operation.method, entry.operation.path, entry.op, entry.path_item
+
+
+def _media_schema(holder: Any) -> Any:
+    if not isinstance(holder, dict):
+        return None
+    if isinstance(holder.get("schema"), dict):
+        return holder["schema"]
+    content = holder.get("content")
+    _selected, media = choose_content_type(content if isinstance(content, dict) else None)
+    return media.get("schema") if isinstance(media, dict) else None
+
+
+def _cost(expansions: list[Expansion | None]) -> dict[str, int] | None:
+    if any(e is None for e in expansions):
+        return None
+    return {"nodes": sum(e.nodes for e in expansions), "maxDepth": max((e.depth for e in expansions), default=0)}
+
+
+def operation_cost(index: OperationIndex, operation_id: str) -> dict[str, Any]:
+    """
+    Exact node count/depth `deref_schema` spends on an operation's request and response
+    schemas, from the ref graph and without dereferencing anything. None marks a part whose
+    expansion is bounded only by the deref budget (it reaches a `$ref` cycle).
+    """
+    method, path, op, path_item = lookup_operation(index, operation_id)
+    graph = index.refs
+
+    params = [p for p in list(path_item.get("parameters") or []) + list(op.get("parameters") or []) if isinstance(p, dict)]
+    request = [graph.measure(s) for s in map(_media_schema, params + [op.get("requestBody")]) if isinstance(s, dict)]
+    responses = op.get("responses") if isinstance(op.get("responses"), dict) else {}
+    response_costs: dict[str, dict[str, int] | None] = {}
+    for code, resp in responses.items():
+        schema = _media_schema(resp)
+        if isinstance(schema, dict):
+            response_costs[str(code)] = _cost([graph.measure(schema)])
+    return {
+        "operationId": operation_id,
+        "method": method,
+        "path": path,
+        "request": _cost(request),
+        "responses": response_costs,
+    }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe bounded mapping with least-recently-used eviction and hit/miss counters.
+
+    Bounded by entry count and, when `max_weight` is set, by the sum of per-entry weights
+    passed to `put` (e.g. serialized size in bytes).
+    """
+
+    def __init__(self, max_entries: int, *, max_weight: int | None = None) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.max_weight = max_weight
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.weight = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._weights: dict[K, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V, *, weight: int = 1) -> None:
+        if self.max_entries <= 0:
+            return
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        with self._lock:
+            self.weight += weight - self._weights.get(key, 0)
+            self._data[key] = value
+            self._weights[key] = weight
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries or (self.max_weight is not None and self.weight > self.max_weight):
+                old_key, _ = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(old_key, 0)
+                self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            self.weight -= self._weights.pop(key, 0)
+            return self._data.pop(key, None)
+
+    def keys(self) -> list[K]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def items(self) -> list[tuple[K, V]]:
+        with self._lock:
+            return list(self._data.items())
+
+    def rekey(self, rename: Callable[[K], K | None]) -> int:
+        """Replace every key with `rename(key)`, dropping entries renamed to None; keeps recency and weights."""
+        with self._lock:
+            data: OrderedDict[K, V] = OrderedDict()
+            weights: dict[K, int] = {}
+            for key, value in self._data.items():
+                new_key = rename(key)
+                if new_key is None:
+                    continue
+                data[new_key] = value
+                weights[new_key] = self._weights.get(key, 0)
+            self._data, self._weights = data, weights
+            self.weight = sum(weights.values())
+            return len(data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxEntries": self.max_entries,
+                "weight": self.weight,
+                "maxWeight": self.max_weight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRatio": (self.hits / total) if total else 0.0,
+            }
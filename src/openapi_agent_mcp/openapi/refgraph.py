@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping
+
+ComponentKey = tuple[str, str]
+
+_COMPONENTS_PREFIX = "#/components/"
+_DONE = object()
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def component_key(ref: str) -> ComponentKey | None:
+    """`#/components/<section>/<name>[/...]` -> (section, name); None for any other ref."""
+    if not ref.startswith(_COMPONENTS_PREFIX):
+        return None
+    parts = ref[len(_COMPONENTS_PREFIX) :].split("/")
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        return None
+    return _unescape(parts[0]), _unescape(parts[1])
+
+
+def plain_component_key(ref: str) -> ComponentKey | None:
+    """(section, name) for a ref naming a whole component exactly as `deref` resolves it."""
+    if not ref.startswith(_COMPONENTS_PREFIX) or "~" in ref:
+        return None
+    parts = ref[len(_COMPONENTS_PREFIX) :].split("/")
+    if len(parts) != 2 or not parts[0] or not parts[1]:
+        return None
+    return parts[0], parts[1]
+
+
+def iter_refs(value: Any) -> Iterator[str]:
+    """Every `$ref` string in a JSON value (iterative, so deep schemas do not hit the recursion limit)."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _has_ref_key(value: Any) -> bool:
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
+
+@dataclass(frozen=True)
+class Expansion:
+    """Exact cost of fully dereferencing a value: nodes `deref_schema` visits and depth below it."""
+
+    nodes: int
+    depth: int
+
+
+class _Node:
+    __slots__ = ("value", "edges", "has_ref", "plain_refs", "exists")
+
+    def __init__(self, value: Any, exists: bool) -> None:
+        self.value = value
+        self.exists = exists
+        refs = list(iter_refs(value))
+        self.has_ref = bool(refs) or _has_ref_key(value)
+        self.edges = frozenset(k for k in map(component_key, refs) if k is not None)
+        # Only refs that name whole components can be sized; anything else disables the estimate.
+        self.plain_refs = all(plain_component_key(r) is not None for r in refs)
+
+    def rebound(self, value: Any, exists: bool) -> _Node:
+        node = _Node.__new__(_Node)
+        node.value, node.exists = value, exists
+        node.edges, node.has_ref, node.plain_refs = self.edges, self.has_ref, self.plain_refs
+        return node
+
+
+class RefGraph:
+    """
+    Component-level `$ref` dependencies of one spec version.
+
+    Components are grouped into strongly connected components (iterative Tarjan, run
+    lazily from whatever component is asked about first). Per SCC it keeps whether it is
+    cyclic and its transitive closure; per acyclic component, the exact `Expansion` a full
+    deref costs. Everything is computed once and kept for the life of the snapshot, i.e.
+    per spec sha256.
+    """
+
+    def __init__(self, spec: Mapping[str, Any]) -> None:
+        self._spec = spec
+        self._nodes: dict[ComponentKey, _Node] = {}
+        self._scc_of: dict[ComponentKey, int] = {}
+        self._scc_cyclic: list[bool] = []
+        self._scc_closure: list[frozenset[ComponentKey]] = []
+        self._expansions: dict[ComponentKey, Expansion | None] = {}
+        self._lock = threading.Lock()
+
+    def _component(self, key: ComponentKey) -> tuple[Any, bool]:
+        components = self._spec.get("components")
+        section = components.get(key[0]) if isinstance(components, Mapping) else None
+        if not isinstance(section, Mapping) or key[1] not in section:
+            return None, False
+        return section[key[1]], True
+
+    def _node(self, key: ComponentKey) -> _Node:
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = _Node(*self._component(key))
+        return node
+
+    def _ensure(self, key: ComponentKey) -> int:
+        scc = self._scc_of.get(key)
+        if scc is not None:
+            return scc
+        with self._lock:
+            if key not in self._scc_of:
+                self._tarjan(key)
+            return self._scc_of[key]
+
+    def _tarjan(self, root: ComponentKey) -> None:
+        index: dict[ComponentKey, int] = {}
+        low: dict[ComponentKey, int] = {}
+        stack: list[ComponentKey] = []
+        on_stack: set[ComponentKey] = set()
+        work: list[tuple[ComponentKey, Iterator[ComponentKey]]] = []
+
+        def visit(key: ComponentKey) -> None:
+            index[key] = low[key] = len(index)
+            stack.append(key)
+            on_stack.add(key)
+            work.append((key, iter(self._node(key).edges)))
+
+        visit(root)
+        while work:
+            key, targets = work[-1]
+            for target in targets:
+                if target in self._scc_of:
+                    continue
+                if target not in index:
+                    visit(target)
+                    break
+                if target in on_stack:
+                    low[key] = min(low[key], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[key])
+                if low[key] == index[key]:
+                    self._close_scc(key, stack, on_stack)
+
+    def _close_scc(self, head: ComponentKey, stack: list[ComponentKey], on_stack: set[ComponentKey]) -> None:
+        members: list[ComponentKey] = []
+        while True:
+            key = stack.pop()
+            on_stack.discard(key)
+            members.append(key)
+            if key == head:
+                break
+        # Successor SCCs finish (and are published) before this one, so their closures are known.
+        member_set = set(members)
+        closure = set(members)
+        for key in members:
+            for target in self._node(key).edges:
+                if target not in member_set:
+                    closure |= self._scc_closure[self._scc_of[target]]
+        cyclic = len(members) > 1 or head in self._node(head).edges
+        expansions = {key: None if cyclic else self._measure_component(key) for key in members}
+        scc = len(self._scc_cyclic)
+        self._scc_cyclic.append(cyclic)
+        self._scc_closure.append(frozenset(closure))
+        self._expansions.update(expansions)
+        # `_ensure` reads `_scc_of` without the lock, so members are published only once
+        # everything they index is in place.
+        for key in members:
+            self._scc_of[key] = scc
+
+    def _measure_component(self, key: ComponentKey) -> Expansion | None:
+        node = self._node(key)
+        if not node.exists or not node.plain_refs:
+            return None
+        if any(self._expansions.get(t) is None for t in node.edges):
+            return None
+        return self.measure(node.value)
+
+    def rebind(self, spec: Mapping[str, Any]) -> RefGraph:
+        """
+        This graph for a new spec version whose `components` are equal to this one's.
+
+        Everything computed so far (SCCs, closures, expansions, per-component refs) carries
+        over; component values are re-read from `spec` so the old document can be released.
+        """
+        graph = RefGraph(spec)
+        with self._lock:
+            graph._scc_of = dict(self._scc_of)
+            graph._scc_cyclic = list(self._scc_cyclic)
+            graph._scc_closure = list(self._scc_closure)
+            graph._expansions = dict(self._expansions)
+            nodes = list(self._nodes.items())
+        for key, node in nodes:
+            graph._nodes[key] = node.rebound(*graph._component(key))
+        return graph
+
+    def edges(self, key: ComponentKey) -> frozenset[ComponentKey]:
+        """Components referenced directly from component `key`."""
+        return self._node(key).edges
+
+    def is_cyclic(self, key: ComponentKey) -> bool:
+        """Whether `key` can reach itself through `$ref`s."""
+        return self._scc_cyclic[self._ensure(key)]
+
+    def contains_ref(self, key: ComponentKey) -> bool:
+        """Whether the raw component value contains any `$ref` key at all."""
+        return self._node(key).has_ref
+
+    def closure_of(self, key: ComponentKey) -> frozenset[ComponentKey]:
+        """`key` plus every component reachable from it."""
+        return self._scc_closure[self._ensure(key)]
+
+    def expansion(self, key: ComponentKey) -> Expansion | None:
+        """Exact cost of fully dereferencing component `key`; None if cyclic, missing or not sizeable."""
+        self._ensure(key)
+        return self._expansions[key]
+
+    def ref_expansion(self, ref: str) -> tuple[Any, Expansion] | None:
+        """(component value, expansion) when `ref` names a whole sizeable component."""
+        key = plain_component_key(ref)
+        if key is None:
+            return None
+        expansion = self.expansion(key)
+        if expansion is None:
+            return None
+        return self._node(key).value, expansion
+
+    def _open(self, value: Any) -> tuple[Expansion | None, Iterator[Any] | None]:
+        """Cost of `value` itself (including a resolved ref target) and the children still to add."""
+        if isinstance(value, list):
+            return Expansion(1, 0), iter(value)
+        if not isinstance(value, dict):
+            return Expansion(1, 0), None
+        ref = value.get("$ref")
+        if "$ref" not in value or not isinstance(ref, str):
+            return Expansion(1, 0), iter(value.values())
+        found = self.ref_expansion(ref)
+        if found is None:
+            return None, None
+        target, sub = found
+        own = Expansion(1 + sub.nodes, 1 + sub.depth)
+        if not isinstance(target, dict):
+            return own, None
+        return own, (v for k, v in value.items() if k != "$ref")
+
+    def measure(self, value: Any) -> Expansion | None:
+        """Expansion of an arbitrary schema (e.g. an operation's inline schema); None if unbounded."""
+        # Iterative post-order walk; frames are [nodes, depth, remaining children]. The root
+        # frame is a virtual parent of `value`, so its depth is one more than the answer.
+        root: list[Any] = [0, 0, iter((value,))]
+        frames = [root]
+        while frames:
+            frame = frames[-1]
+            child = next(frame[2], _DONE)
+            if child is _DONE:
+                frames.pop()
+                if frames:
+                    parent = frames[-1]
+                    parent[0] += frame[0]
+                    parent[1] = max(parent[1], frame[1] + 1)
+                continue
+            own, children = self._open(child)
+            if own is None:
+                return None
+            if children is None:
+                frame[0] += own.nodes
+                frame[1] = max(frame[1], own.depth + 1)
+            else:
+                frames.append([own.nodes, own.depth, children])
+        return Expansion(root[0], root[1] - 1)
+
+    def closure(self, refs: Iterable[str]) -> set[ComponentKey]:
+        """Components needed to resolve `refs`, transitively."""
+        out: set[ComponentKey] = set()
+        for ref in refs:
+            key = component_key(ref)
+            if key is not None and key not in out:
+                out |= self.closure_of(key)
+        return out
+
+    def components_for(self, values: Iterable[Any]) -> dict[str, dict[str, Any]]:
+        """The `components` subset that the `$ref`s left in `values` need, in spec order."""
+        return self.select(self.closure(ref for value in values for ref in iter_refs(value)))
+
+    def select(self, keys: Iterable[ComponentKey]) -> dict[str, dict[str, Any]]:
+        """The `components` entries named by `keys`, in spec order."""
+        needed: dict[str, set[str]] = {}
+        for section, name in keys:
+            needed.setdefault(section, set()).add(name)
+        components = self._spec.get("components")
+        if not needed or not isinstance(components, Mapping):
+            return {}
+        out: dict[str, dict[str, Any]] = {}
+        for section, names in components.items():
+            wanted = needed.get(section)
+            if not wanted or not isinstance(names, Mapping):
+                continue
+            picked = {name: names[name] for name in names if name in wanted}
+            if picked:
+                out[section] = picked
+        return out
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
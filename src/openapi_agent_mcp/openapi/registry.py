@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ..config import DEFAULT_SERVICE, Config
+from ..errors import ToolError
+from .store import OpenAPIStore
+
+
+class StoreRegistry:
+    """Named `OpenAPIStore`s served from one process, each with its own cache subdirectory."""
+
+    def __init__(self, stores: dict[str, OpenAPIStore]) -> None:
+        if not stores:
+            raise ValueError("StoreRegistry needs at least one service")
+        self._stores = dict(stores)
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "StoreRegistry":
+        stores: dict[str, OpenAPIStore] = {}
+        for name, base_url in cfg.service_urls().items():
+            stores[name] = store_from_config(cfg, base_url=base_url, cache_dir=cfg.service_cache_dir(name))
+        return cls(stores)
+
+    def names(self) -> list[str]:
+        return list(self._stores.keys())
+
+    def items(self) -> list[tuple[str, OpenAPIStore]]:
+        return list(self._stores.items())
+
+    def resolve(self, service: str | None) -> tuple[str, OpenAPIStore]:
+        if service:
+            store = self._stores.get(service)
+            if store is None:
+                raise ToolError(
+                    code="SERVICE_NOT_FOUND",
+                    message=f"Unknown service: {service}",
+                    details={"service": service, "services": self.names()},
+                )
+            return service, store
+        if len(self._stores) == 1:
+            return next(iter(self._stores.items()))
+        if DEFAULT_SERVICE in self._stores:
+            return DEFAULT_SERVICE, self._stores[DEFAULT_SERVICE]
+        raise ToolError(
+            code="SERVICE_REQUIRED",
+            message="Several services are configured; pass `service`",
+            details={"services": self.names()},
+        )
+
+    def get(self, service: str | None) -> OpenAPIStore:
+        return self.resolve(service)[1]
+
+    def describe(self) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        for name, store in self._stores.items():
+            meta = store.current_meta()
+            meta_out = meta or {}
+            out.append(
+                {
+                    "service": name,
+                    "baseUrl": store.base_url,
+                    "loaded": meta is not None,
+                    "sha256": meta_out.get("sha256"),
+                    "fetchedAt": meta_out.get("fetched_at"),
+                }
+            )
+        return out
+
+    def warm_up(self, *, max_workers: int | None = None) -> dict[str, str | None]:
+        """Load every store in parallel; returns service -> error message (None on success)."""
+
+        def load(item: tuple[str, OpenAPIStore]) -> tuple[str, str | None]:
+            name, store = item
+            try:
+                store.load()
+                return name, None
+            except ToolError as e:
+                return name, e.message
+            except Exception as e:  # pragma: no cover - defensive
+                return name, str(e)
+
+        workers = max_workers or min(16, len(self._stores))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openapi-warmup") as pool:
+            return dict(pool.map(load, self.items()))
+
+
+def store_from_config(cfg: Config, *, base_url: str, cache_dir: Path) -> OpenAPIStore:
+    return OpenAPIStore(
+        base_url=base_url,
+        cache_dir=cache_dir,
+        cache_ttl_seconds=cfg.cache_ttl_seconds,
+        timeout_seconds=cfg.request_timeout_seconds,
+        revalidate=cfg.revalidate,
+        refresh_interval_seconds=cfg.refresh_interval_seconds,
+        deref_cache_size=cfg.deref_cache_size,
+        disk_snapshot=cfg.disk_snapshot,
+        lazy_spec=cfg.lazy_spec,
+    )
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+if TYPE_CHECKING:
+    from .index import Operation
+
+SEARCH_FIELDS = ("operationId", "path", "tag", "summary", "description")
+
+FIELD_WEIGHTS = {"operationId": 3.0, "tag": 3.0, "path": 2.0, "summary": 2.0, "description": 1.0}
+
+_TOKEN_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+|[^\W\d_A-Za-z]+")
+_NGRAM = 3
+_TAG_SEP = "\x00"
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+FIELD_PREFIXES = {
+    "id": "operationId",
+    "op": "operationId",
+    "operationid": "operationId",
+    "path": "path",
+    "tag": "tag",
+    "tags": "tag",
+    "summary": "summary",
+    "desc": "description",
+    "description": "description",
+}
+
+_QUERY_TOKEN_RE = re.compile(r'(?:([A-Za-z]+):)?"([^"]*)"?|(\S+)')
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    text: str
+    field: str | None = None
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """OR-groups of AND-ed terms plus any `method:` filters found in the query."""
+
+    groups: tuple[tuple[QueryTerm, ...], ...]
+    methods: frozenset[str]
+    phrase: str
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Parse the search mini-language.
+
+    - Whitespace-separated terms are AND-ed; the keyword `OR` separates alternatives.
+    - `field:term` restricts a term to one field (`tag:`, `path:`, `id:`/`operationId:`,
+      `summary:`, `desc:`/`description:`), even if that field is disabled in `match`;
+      `method:get` filters by HTTP method.
+    - Double quotes keep a phrase (including spaces) as a single substring term.
+    """
+    groups: list[list[QueryTerm]] = [[]]
+    methods: set[str] = set()
+    for m in _QUERY_TOKEN_RE.finditer(query):
+        prefix, quoted, bare = m.group(1), m.group(2), m.group(3)
+        field: str | None = None
+        if quoted is not None:
+            text = quoted
+            if prefix:
+                field = FIELD_PREFIXES.get(prefix.lower())
+                if field is None and prefix.lower() != "method":
+                    text = f"{prefix}:{quoted}"
+        else:
+            text = bare
+            if text == "OR":
+                if groups[-1]:
+                    groups.append([])
+                continue
+            head, sep, rest = text.partition(":")
+            if sep and rest:
+                if head.lower() == "method":
+                    methods.add(rest.upper())
+                    continue
+                if head.lower() in FIELD_PREFIXES:
+                    field, text = FIELD_PREFIXES[head.lower()], rest
+        if prefix and prefix.lower() == "method" and quoted is not None:
+            methods.add(quoted.upper())
+            continue
+        text = text.strip().lower()
+        if text:
+            groups[-1].append(QueryTerm(text=text, field=field))
+
+    terms = [t for g in groups for t in g]
+    phrase = " ".join(t.text for t in terms) if len(terms) > 1 and all(t.field is None for t in terms) else ""
+    return ParsedQuery(groups=tuple(tuple(g) for g in groups if g), methods=frozenset(methods), phrase=phrase)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split camelCase, snake_case, kebab-case and path segments into lowercase tokens."""
+    if not text:
+        return []
+    return [t.lower() for t in _TOKEN_RE.findall(text)]
+
+
+def operation_to_dict(op: Operation) -> dict[str, Any]:
+    return {
+        "operationId": op.operationId,
+        "method": op.method,
+        "path": op.path,
+        "tags": op.tags,
+        "summary": op.summary,
+        "description": op.description,
+    }
+
+
+def _field_values(op: Operation) -> tuple[str, str, str, str, str]:
+    tags = _TAG_SEP + _TAG_SEP.join(op.tags) + _TAG_SEP if op.tags else ""
+    return (op.operationId, op.path, tags, op.summary or "", op.description or "")
+
+
+class SearchIndex:
+    """
+    Precomputed search structures over an operation list.
+
+    Per field it keeps the lowercased text, a space-delimited token string (for exact and
+    prefix token checks) and trigram posting lists, so a substring query only verifies the
+    operations containing every trigram of the query instead of lowercasing and scanning
+    every field of every operation. Identical field values share one posting entry.
+    Each field is materialized on the first query that needs it.
+
+    Built with `previous` (the index of an earlier spec version), every field already
+    materialized there whose values are identical for all operations is reused as is.
+    """
+
+    def __init__(self, operations: Sequence[Operation], previous: SearchIndex | None = None) -> None:
+        self.operations = list(operations)
+        self._text: dict[str, list[str]] = {}
+        self._tokens: dict[str, list[str]] = {}
+        self._lengths: dict[str, list[int]] = {}
+        self._avg_length: dict[str, float] = {}
+        self._grams: dict[str, dict[str, array]] = {}
+        self._by_method: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+        for pos, op in enumerate(self.operations):
+            self._by_method.setdefault(op.method, []).append(pos)
+        if previous is not None:
+            self._reuse_fields(previous)
+
+    def _reuse_fields(self, previous: SearchIndex) -> None:
+        with previous._lock:
+            built = [field for field in SEARCH_FIELDS if field in previous._grams]
+        if not built or len(previous.operations) != len(self.operations):
+            return
+        if previous.operations == self.operations:
+            same = built
+        else:
+            old_values = [_field_values(op) for op in previous.operations]
+            new_values = [_field_values(op) for op in self.operations]
+            same = []
+            for field in built:
+                field_no = SEARCH_FIELDS.index(field)
+                if all(a[field_no] == b[field_no] for a, b in zip(old_values, new_values)):
+                    same.append(field)
+        # Built fields are never mutated, so both versions can share them.
+        for field in same:
+            self._text[field] = previous._text[field]
+            self._tokens[field] = previous._tokens[field]
+            self._lengths[field] = previous._lengths[field]
+            self._avg_length[field] = previous._avg_length[field]
+            self._grams[field] = previous._grams[field]
+
+    def _ensure_field(self, field: str) -> None:
+        if field in self._grams:
+            return
+        with self._lock:
+            if field in self._grams:
+                return
+            field_no = SEARCH_FIELDS.index(field)
+            texts: list[str] = []
+            tokens: list[str] = []
+            lengths: list[int] = []
+            postings: dict[str, list[int]] = {}
+            seen: dict[str, list[int]] = {}
+            for pos, op in enumerate(self.operations):
+                value = _field_values(op)[field_no]
+                lowered = value.lower()
+                texts.append(lowered)
+                value_tokens = tokenize(value)
+                tokens.append(" " + " ".join(value_tokens) + " ")
+                lengths.append(len(value_tokens))
+                owners = seen.get(lowered)
+                if owners is not None:
+                    owners.append(pos)
+                    continue
+                seen[lowered] = [pos]
+            for lowered, owners in seen.items():
+                for gram in {lowered[i : i + _NGRAM] for i in range(len(lowered) - _NGRAM + 1)}:
+                    bucket = postings.get(gram)
+                    if bucket is None:
+                        postings[gram] = list(owners)
+                    else:
+                        bucket.extend(owners)
+            self._text[field] = texts
+            self._tokens[field] = tokens
+            self._lengths[field] = lengths
+            self._avg_length[field] = (sum(lengths) / len(lengths)) if lengths else 0.0
+            # Typed arrays keep posting lists compact in memory and in on-disk snapshots.
+            self._grams[field] = {gram: array("i", owners) for gram, owners in postings.items()}
+
+    def materialize(self) -> None:
+        """Build every field now instead of on first use (e.g. before snapshotting)."""
+        for field in SEARCH_FIELDS:
+            self._ensure_field(field)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _field_candidates(self, field: str, q: str) -> list[int]:
+        texts = self._text[field]
+        if len(q) < _NGRAM:
+            return [pos for pos, text in enumerate(texts) if q in text]
+
+        postings = self._grams[field]
+        lists = sorted((postings.get(q[i : i + _NGRAM], ()) for i in range(len(q) - _NGRAM + 1)), key=len)
+        if not lists[0]:
+            return []
+        candidates = set(lists[0])
+        for other in lists[1:]:
+            candidates.intersection_update(other)
+            if not candidates:
+                return []
+        return [pos for pos in candidates if q in texts[pos]]
+
+    def _term_matches(self, term: QueryTerm, fields: Sequence[str]) -> dict[int, list[tuple[str, int]]]:
+        """Positions matching `term` in any of `fields`, with the fields it was found in."""
+        hits: dict[int, list[tuple[str, int]]] = {}
+        for field in (term.field,) if term.field else fields:
+            self._ensure_field(field)
+            texts = self._text[field]
+            for pos in self._field_candidates(field, term.text):
+                hits.setdefault(pos, []).append((field, texts[pos].count(term.text)))
+        return hits
+
+    def _term_score(self, term: str, pos: int, found: list[tuple[str, int]], idf: float) -> float:
+        exact_token, prefix_token, exact_tag = f" {term} ", f" {term}", f"{_TAG_SEP}{term}{_TAG_SEP}"
+        score = 0.0
+        for field, tf in found:
+            text = self._text[field][pos]
+            toks = self._tokens[field][pos]
+            if exact_token in toks or text == term or exact_tag in text:
+                quality = 3.0
+            elif prefix_token in toks:
+                quality = 2.0
+            else:
+                quality = 1.0
+            avg = self._avg_length[field] or 1.0
+            norm = 1.0 - _BM25_B + _BM25_B * (self._lengths[field][pos] / avg)
+            saturation = tf * (_BM25_K1 + 1.0) / (tf + _BM25_K1 * norm)
+            score += FIELD_WEIGHTS[field] * quality * saturation
+        return idf * score
+
+    def search(
+        self,
+        query: str,
+        *,
+        match: dict[str, bool],
+        method: str | None,
+        limit: int,
+    ) -> list[Operation]:
+        """
+        Ranked search; see `parse_query` for the syntax.
+
+        Each AND-group evaluates its most selective term first and only intersects the
+        survivors with the remaining terms. Scores are BM25 over the enabled fields (field
+        weighted, boosted for exact-token/prefix hits and full-phrase matches), and the
+        best `limit` operations are selected with a bounded heap.
+        """
+        parsed = parse_query(query)
+        methods = set(parsed.methods)
+        if method:
+            methods = {method.upper()} if not methods else methods & {method.upper()}
+            if not methods:
+                return []
+
+        allowed: set[int] | None = None
+        if methods:
+            allowed = set()
+            for m in methods:
+                allowed.update(self._by_method.get(m, ()))
+
+        if not parsed.groups:
+            if allowed is None:
+                return self.operations[:limit]
+            return [self.operations[pos] for pos in sorted(allowed)[:limit]]
+
+        fields = [f for f in SEARCH_FIELDS if match.get(f, True)]
+        term_hits: dict[QueryTerm, dict[int, list[tuple[str, int]]]] = {}
+        candidates: set[int] = set()
+        for group in parsed.groups:
+            for term in group:
+                if term not in term_hits:
+                    term_hits[term] = self._term_matches(term, fields)
+            ordered = sorted(group, key=lambda t: len(term_hits[t]))
+            survivors = set(term_hits[ordered[0]])
+            if allowed is not None:
+                survivors &= allowed
+            for term in ordered[1:]:
+                if not survivors:
+                    break
+                survivors.intersection_update(term_hits[term])
+            candidates |= survivors
+
+        if not candidates:
+            return []
+
+        total = len(self.operations)
+        idf = {term: math.log(1.0 + (total - len(hits) + 0.5) / (len(hits) + 0.5)) for term, hits in term_hits.items()}
+
+        def score(pos: int) -> float:
+            value = 0.0
+            for term, hits in term_hits.items():
+                found = hits.get(pos)
+                if found:
+                    value += self._term_score(term.text, pos, found, idf[term])
+            if parsed.phrase:
+                for field in fields:
+                    if parsed.phrase in self._text[field][pos]:
+                        value += FIELD_WEIGHTS[field]
+            return value
+
+        best = heapq.nsmallest(limit, ((-score(pos), pos) for pos in candidates))
+        return [self.operations[pos] for _neg, pos in best]
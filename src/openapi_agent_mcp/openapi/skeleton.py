@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from .deref import _resolve_local_ref
+
+TRUNCATION_KEY = "..."
+_MAX_ENUM = 8
+
+
+def _ref_name(ref: str) -> str:
+    return ref.rsplit("/", 1)[-1]
+
+
+class SkeletonBuilder:
+    """
+    Flattens schemas into `{field path: type}` while resolving `$ref`s, instead of
+    expanding them: `address.city`, `items[].sku`, `labels{}` (additionalProperties).
+    Required fields end in `!`; `recursive(Name)` marks a `$ref` back into its own
+    ancestry and `(depth limit)` a node not expanded past `max_depth`.
+
+    `max_fields`/`max_bytes` (approximate serialized size) are shared by every `fields`
+    call on one builder. The first field that does not fit ends the walk: it and all
+    later fields are dropped and the dict gets a `TRUNCATION_KEY` entry.
+    """
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        *,
+        max_depth: int,
+        max_fields: int,
+        max_bytes: int,
+        required_only: bool = False,
+    ) -> None:
+        self.spec = spec
+        self.max_depth = max_depth
+        self.max_fields = max_fields
+        self.max_bytes = max_bytes
+        self.required_only = required_only
+        self.count = 0
+        self.size = 0
+        self.truncated = False
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "fields": self.count,
+            "bytes": self.size,
+            "maxFields": self.max_fields,
+            "maxBytes": self.max_bytes,
+            "truncated": self.truncated,
+        }
+
+    def _resolve(self, schema: Any, refs: tuple[str, ...]) -> tuple[Any, tuple[str, ...], str | None]:
+        """Follow `$ref`s (siblings override the target); the recursive ref's name, if any."""
+        while isinstance(schema, dict) and isinstance(schema.get("$ref"), str):
+            ref = schema["$ref"]
+            if ref in refs:
+                return schema, refs, ref
+            target = _resolve_local_ref(self.spec, ref)
+            refs = refs + (ref,)
+            if len(schema) > 1 and isinstance(target, dict):
+                target = {**target, **{k: v for k, v in schema.items() if k != "$ref"}}
+            schema = target
+        return schema, refs, None
+
+    def _flatten(self, schema: dict[str, Any], refs: tuple[str, ...]) -> dict[str, Any]:
+        """Fold `allOf` members into one schema (properties and required lists merged)."""
+        members = schema.get("allOf")
+        if not isinstance(members, list):
+            return schema
+        merged: dict[str, Any] = {k: v for k, v in schema.items() if k != "allOf"}
+        properties = dict(merged.get("properties") or {})
+        required = list(merged.get("required") or [])
+        for member in members:
+            resolved, member_refs, recursive = self._resolve(member, refs)
+            if recursive is not None or not isinstance(resolved, dict):
+                continue
+            resolved = self._flatten(resolved, member_refs)
+            properties.update(resolved.get("properties") or {})
+            required.extend(resolved.get("required") or [])
+            for key, value in resolved.items():
+                if key not in {"properties", "required"}:
+                    merged.setdefault(key, value)
+        if properties:
+            merged["properties"] = properties
+        if required:
+            merged["required"] = required
+        return merged
+
+    def _type_name(self, schema: Any, refs: tuple[str, ...]) -> str:
+        if not isinstance(schema, dict):
+            return "any"
+        if isinstance(schema.get("$ref"), str):
+            return _ref_name(schema["$ref"])
+        if "const" in schema:
+            return f"const({json.dumps(schema['const'])})"
+        enum = schema.get("enum")
+        if isinstance(enum, list) and enum:
+            values = "|".join(json.dumps(v) for v in enum[:_MAX_ENUM])
+            return f"enum({values}{'|...' if len(enum) > _MAX_ENUM else ''})"
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            name = "|".join(str(k) for k in kind)
+        elif isinstance(kind, str):
+            name = kind
+        else:
+            variants = schema.get("anyOf") or schema.get("oneOf")
+            if isinstance(variants, list) and variants:
+                name = "|".join(self._type_name(v, refs) for v in variants)
+            elif isinstance(schema.get("properties"), dict):
+                name = "object"
+            elif "items" in schema:
+                name = "array"
+            else:
+                name = "any"
+        if name == "array" and self._is_scalar(schema.get("items"), refs):
+            name = f"array<{self._type_name(self._resolve(schema.get('items'), refs)[0], refs)}>"
+        if isinstance(schema.get("format"), str):
+            name += f"({schema['format']})"
+        if schema.get("nullable") is True:
+            name += "|null"
+        return name
+
+    def _is_scalar(self, schema: Any, refs: tuple[str, ...]) -> bool:
+        resolved, _refs, recursive = self._resolve(schema, refs)
+        if recursive is not None or not isinstance(resolved, dict):
+            return recursive is None
+        return not any(k in resolved for k in ("properties", "items", "allOf", "anyOf", "oneOf", "additionalProperties"))
+
+    def _children(
+        self, schema: dict[str, Any], path: str, refs: tuple[str, ...]
+    ) -> list[tuple[Any, str, bool, tuple[str, ...]]]:
+        out: list[tuple[Any, str, bool, tuple[str, ...]]] = []
+        variants = [schema]
+        for key in ("anyOf", "oneOf"):
+            if isinstance(schema.get(key), list):
+                for variant in schema[key]:
+                    resolved, variant_refs, recursive = self._resolve(variant, refs)
+                    if recursive is None and isinstance(resolved, dict):
+                        variants.append(self._flatten(resolved, variant_refs))
+        seen: set[str] = set()
+        for variant in variants:
+            properties = variant.get("properties")
+            required = variant.get("required")
+            names = set(required) if isinstance(required, list) else set()
+            if isinstance(properties, dict):
+                for name, sub in properties.items():
+                    child = f"{path}.{name}" if path else str(name)
+                    if child in seen or (self.required_only and name not in names):
+                        continue
+                    seen.add(child)
+                    out.append((sub, child, name in names, refs))
+            items = variant.get("items")
+            if isinstance(items, dict) and not self._is_scalar(items, refs) and f"{path}[]" not in seen:
+                seen.add(f"{path}[]")
+                out.append((items, f"{path}[]", False, refs))
+            extra = variant.get("additionalProperties")
+            if isinstance(extra, dict) and extra and f"{path}{{}}" not in seen:
+                seen.add(f"{path}{{}}")
+                out.append((extra, f"{path}{{}}", False, refs))
+        return out
+
+    def _emit(self, out: dict[str, str], path: str, type_name: str) -> bool:
+        size = len(path) + len(type_name) + 6
+        if self.count + 1 > self.max_fields or self.size + size > self.max_bytes:
+            self.truncated = True
+            out[TRUNCATION_KEY] = f"truncated at {path or '$'} (maxFields={self.max_fields}, maxBytes={self.max_bytes})"
+            return False
+        out[path or "$"] = type_name
+        self.count += 1
+        self.size += size
+        return True
+
+    def fields(self, schema: Any, *, prefix: str = "", required: bool = False) -> dict[str, str]:
+        """
+        Field paths under `prefix` (`$` for the root of an unprefixed schema) and their types.
+        An unprefixed object root is not listed itself, only its fields.
+        """
+        out: dict[str, str] = {}
+        if self.truncated:
+            out[TRUNCATION_KEY] = "truncated (budget exhausted by earlier fields)"
+            return out
+        stack: list[tuple[Any, str, bool, tuple[str, ...], int]] = [(schema, prefix, required, (), 0)]
+        while stack:
+            node, path, is_required, refs, depth = stack.pop()
+            resolved, refs, recursive = self._resolve(node, refs)
+            if recursive is not None:
+                type_name = f"recursive({_ref_name(recursive)})"
+                children: list[tuple[Any, str, bool, tuple[str, ...]]] = []
+            else:
+                if isinstance(resolved, dict):
+                    resolved = self._flatten(resolved, refs)
+                type_name = self._type_name(resolved, refs)
+                if type_name == "object" and isinstance(node, dict) and isinstance(node.get("$ref"), str):
+                    type_name = f"object({_ref_name(node['$ref'])})"
+                children = self._children(resolved, path, refs) if isinstance(resolved, dict) else []
+                if children and depth >= self.max_depth:
+                    type_name += " (depth limit)"
+                    children = []
+            if path or not children:
+                if not self._emit(out, path, type_name + ("!" if is_required else "")):
+                    break
+            for child, child_path, child_required, child_refs in reversed(children):
+                stack.append((child, child_path, child_required, child_refs, depth + 1))
+        return out
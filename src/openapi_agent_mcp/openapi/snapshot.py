@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import gc
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+from .cache import open_temp_file, read_json
+from .index import OperationIndex
+
+SNAPSHOT_FILE = "openapi.snapshot"
+SNAPSHOT_MAGIC = b"OPENAPI-AGENT-MCP-SNAPSHOT\n"
+# Bump whenever Operation/OperationIndex/SearchIndex change shape.
+SNAPSHOT_VERSION = 2
+
+
+def snapshot_path(cache_dir: Path) -> Path:
+    return cache_dir / SNAPSHOT_FILE
+
+
+def write_snapshot(cache_dir: Path, *, sha256: str, spec: dict[str, Any], index: OperationIndex) -> Path:
+    """
+    Persist the parsed spec and its prebuilt index (lookup table and every search field)
+    next to `openapi.meta.json`.
+
+    Layout: magic line, one JSON header line (`version`, `sha256`), then a pickle of
+    `(spec, index)`; op dicts referenced by the index stay shared with the spec.
+    """
+    index.search.materialize()
+    path = snapshot_path(cache_dir)
+    header = json.dumps({"version": SNAPSHOT_VERSION, "sha256": sha256}).encode("utf-8") + b"\n"
+    f, tmp_path = open_temp_file(path)
+    try:
+        with f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(header)
+            pickle.dump((spec, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_snapshot(cache_dir: Path, sha256: str | None) -> tuple[dict[str, Any], OperationIndex] | None:
+    """
+    Load the snapshot written for `sha256`; None if it is missing, from another spec
+    version or format version, or unreadable.
+
+    The file is trusted like the rest of `cache_dir` (it is unpickled).
+    """
+    path = snapshot_path(cache_dir)
+    if not sha256 or not path.exists():
+        return None
+    try:
+        data = path.read_bytes()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            return None
+        header_end = data.index(b"\n", len(SNAPSHOT_MAGIC))
+        header = json.loads(data[len(SNAPSHOT_MAGIC) : header_end])
+        if header.get("version") != SNAPSHOT_VERSION or header.get("sha256") != sha256:
+            return None
+        # Unpickling allocates millions of containers; pausing the cyclic GC roughly halves load time.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            spec, index = pickle.loads(memoryview(data)[header_end + 1 :])
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    except Exception:
+        return None
+    if not isinstance(spec, dict) or not isinstance(index, OperationIndex):
+        return None
+    return spec, index
+
+
+def read_cached_snapshot(cache_dir: Path) -> tuple[dict[str, Any], dict[str, Any], OperationIndex] | None:
+    """Spec, meta and index for the spec recorded in `openapi.meta.json`, if snapshotted."""
+    meta_path = cache_dir / "openapi.meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        meta = read_json(meta_path)
+    except (OSError, ValueError):
+        return None
+    loaded = read_snapshot(cache_dir, meta.get("sha256") if isinstance(meta, dict) else None)
+    if loaded is None:
+        return None
+    spec, index = loaded
+    return spec, meta, index
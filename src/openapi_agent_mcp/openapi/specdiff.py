@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator, Mapping
+
+from .index import HTTP_METHODS, OperationIndex
+from .lazy import LazyJSONObject
+from .refgraph import ComponentKey, iter_refs
+
+
+@dataclass(frozen=True)
+class SpecDiff:
+    """What changed between two spec versions, per path item, operation and component."""
+
+    previous_sha256: str | None
+    added: tuple[str, ...]
+    removed: tuple[str, ...]
+    changed: tuple[str, ...]
+    paths: frozenset[str]
+    components: frozenset[ComponentKey]
+
+    def summary(self) -> dict[str, Any]:
+        """The `diff` entry of the fetch metadata."""
+        return {
+            "previous_sha256": self.previous_sha256,
+            "added": list(self.added),
+            "removed": list(self.removed),
+            "changed": list(self.changed),
+            "paths": sorted(self.paths),
+            "components": sorted(f"{section}/{name}" for section, name in self.components),
+        }
+
+
+def _mapping(value: Any) -> Mapping[str, Any]:
+    return value if isinstance(value, Mapping) else {}
+
+
+def _member_equal(old: Mapping[str, Any], new: Mapping[str, Any], key: str) -> bool:
+    # Lazily loaded members compare by source bytes first, so unchanged entries are never parsed.
+    if isinstance(old, LazyJSONObject) and isinstance(new, LazyJSONObject):
+        old_raw, new_raw = old.raw(key), new.raw(key)
+        if old_raw is not None and old_raw == new_raw:
+            return True
+    return old[key] == new[key]
+
+
+def _changed_members(old: Mapping[str, Any], new: Mapping[str, Any]) -> set[str]:
+    changed = set(old.keys() ^ new.keys())
+    changed.update(key for key in old if key in new and not _member_equal(old, new, key))
+    return changed
+
+
+def diff_components(old_spec: Mapping[str, Any], new_spec: Mapping[str, Any]) -> frozenset[ComponentKey]:
+    """Components added, removed or changed between two spec versions."""
+    old_sections, new_sections = _mapping(old_spec.get("components")), _mapping(new_spec.get("components"))
+    changed: set[ComponentKey] = set()
+    for section in old_sections.keys() | new_sections.keys():
+        old_entries = _mapping(old_sections.get(section))
+        new_entries = _mapping(new_sections.get(section))
+        changed.update((section, name) for name in _changed_members(old_entries, new_entries))
+    return frozenset(changed)
+
+
+def _locations(index: OperationIndex) -> dict[str, list[tuple[str, str]]]:
+    out: dict[str, list[tuple[str, str]]] = {}
+    for op in index.operations:
+        out.setdefault(op.operationId, []).append((op.method, op.path))
+    return out
+
+
+def _operation_parts(path_item: Any, method: str) -> tuple[Any, Any]:
+    """The raw operation for `method` and the path-level parameters it inherits."""
+    if not isinstance(path_item, dict):
+        return None, None
+    op = next((v for k, v in path_item.items() if str(k).upper() == method), None)
+    return op, path_item.get("parameters")
+
+
+def _operation_refs(paths: Mapping[str, Any], wanted: set[str]) -> Iterator[tuple[str, str, list[str]]]:
+    """(path, METHOD, refs) for every operation under the `wanted` paths, parsing lazy paths once."""
+    items = paths.iter_parsed() if isinstance(paths, LazyJSONObject) else paths.items()
+    for path, path_item in items:
+        if path not in wanted or not isinstance(path_item, dict):
+            continue
+        shared = list(iter_refs(path_item.get("parameters")))
+        for method, op in path_item.items():
+            if str(method).upper() in HTTP_METHODS:
+                yield path, str(method).upper(), shared + list(iter_refs(op))
+
+
+def diff_specs(
+    old_spec: Mapping[str, Any],
+    old_index: OperationIndex,
+    new_spec: Mapping[str, Any],
+    new_index: OperationIndex,
+    *,
+    previous_sha256: str | None = None,
+    components: frozenset[ComponentKey] | None = None,
+) -> SpecDiff:
+    """
+    Structural diff of two spec versions.
+
+    An operationId counts as changed when its (method, path) locations differ, its raw
+    operation or inherited path-level parameters differ, or any component it transitively
+    references (per `new_index.refs`) was added, removed or changed. `components` may be
+    passed in when already computed with `diff_components`.
+    """
+    old_paths, new_paths = _mapping(old_spec.get("paths")), _mapping(new_spec.get("paths"))
+    changed_paths = _changed_members(old_paths, new_paths)
+    if components is None:
+        components = diff_components(old_spec, new_spec)
+
+    old_locations, new_locations = _locations(old_index), _locations(new_index)
+    added = [op_id for op_id in new_locations if op_id not in old_locations]
+    removed = [op_id for op_id in old_locations if op_id not in new_locations]
+    changed: set[str] = set()
+    for op_id, locations in new_locations.items():
+        previous = old_locations.get(op_id)
+        if previous is None:
+            continue
+        if previous != locations:
+            changed.add(op_id)
+            continue
+        for method, path in locations:
+            if path in changed_paths and path in old_paths and path in new_paths:
+                if _operation_parts(old_paths[path], method) != _operation_parts(new_paths[path], method):
+                    changed.add(op_id)
+
+    if components:
+        # Only unchanged operations still need the (more expensive) reference check.
+        by_location = {
+            location: op_id
+            for op_id, locations in new_locations.items()
+            if op_id in old_locations and op_id not in changed
+            for location in locations
+        }
+        wanted = {path for _method, path in by_location}
+        for path, method, refs in _operation_refs(new_paths, wanted):
+            op_id = by_location.get((method, path))
+            if op_id is not None and op_id not in changed and new_index.refs.closure(refs) & components:
+                changed.add(op_id)
+
+    return SpecDiff(
+        previous_sha256=previous_sha256,
+        added=tuple(added),
+        removed=tuple(removed),
+        changed=tuple(op_id for op_id in new_locations if op_id in changed),
+        paths=frozenset(changed_paths),
+        components=components,
+    )
@@ -1,12 +1,74 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from ..errors import ToolError
-from .fetch import fetch_openapi_spec
-from .index import Operation, build_operations
+from ..metrics import METRICS
+from .deref import DerefCache
+from .fetch import fetch_openapi_spec, fetch_openapi_spec_async
+from .http import AsyncHTTPClient
+from .index import Operation, OperationIndex, build_index
+from .refgraph import component_key
+from .snapshot import read_cached_snapshot, write_snapshot
+from .specdiff import SpecDiff, diff_components, diff_specs
+
+
+@dataclass(frozen=True)
+class StoreSnapshot:
+    """One consistent view of the spec: parsed document, fetch metadata and operation index."""
+
+    spec: dict[str, Any]
+    meta: dict[str, Any]
+    index: OperationIndex
+
+    @property
+    def sha256(self) -> str | None:
+        return self.meta.get("sha256")
+
+
+class _Flight:
+    """A fetch in progress that concurrent callers wait on instead of starting their own."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.snapshot: StoreSnapshot | None = None
+        self.error: BaseException | None = None
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+        self._lock = threading.Lock()
+
+    def finish(self) -> None:
+        with self._lock:
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut)
+
+    def result(self) -> StoreSnapshot:
+        if self.error is not None:
+            raise self.error
+        assert self.snapshot is not None
+        return self.snapshot
+
+    async def wait_async(self) -> StoreSnapshot:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[None] = loop.create_future()
+        with self._lock:
+            if not self.done.is_set():
+                self._waiters.append((loop, fut))
+            else:
+                fut.set_result(None)
+        await fut
+        return self.result()
+
+
+def _resolve(fut: asyncio.Future[None]) -> None:
+    if not fut.done():
+        fut.set_result(None)
 
 
 @dataclass
@@ -15,41 +77,286 @@ class OpenAPIStore:
     cache_dir: Path
     cache_ttl_seconds: int
     timeout_seconds: float
+    revalidate: bool = True
+    refresh_interval_seconds: float = 0.0
+    deref_cache_size: int = 2048
+    disk_snapshot: bool = True
+    lazy_spec: bool = False
+
+    _snapshot: StoreSnapshot | None = field(default=None, repr=False)
+    _inflight: _Flight | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _refresher: threading.Thread | None = field(default=None, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, repr=False)
+    _refresh_error: Exception | None = None
+    _listeners: list[Callable[[str | None, dict[str, Any]], None]] = field(default_factory=list, repr=False)
+    _http: AsyncHTTPClient = field(default_factory=AsyncHTTPClient, repr=False)
+    _snapshot_writer: threading.Thread | None = field(default=None, repr=False)
+    deref_cache: DerefCache = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.deref_cache = DerefCache(self.deref_cache_size)
 
-    _spec: dict[str, Any] | None = None
-    _meta: dict[str, Any] | None = None
-    _operations: list[Operation] | None = None
-    _operation_by_id: dict[str, Operation] | None = None
+    def snapshot(self) -> StoreSnapshot:
+        """
+        Current snapshot, revalidated against the backend unless background refresh is on.
+
+        The snapshot is immutable and replaced as a whole, so callers never observe a spec
+        from one fetch paired with the index of another.
+        """
+        if self.refresh_interval_seconds > 0:
+            current = self._snapshot
+            if current is not None:
+                self.start_background_refresh()
+                return current
+            snap = self._refresh()
+            self.start_background_refresh()
+            return snap
+        return self._refresh()
 
     def load(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        snap = self.snapshot()
+        return snap.spec, snap.meta
+
+    def load_index(self) -> tuple[dict[str, Any], dict[str, Any], OperationIndex]:
+        """Spec, meta and operation index from the same snapshot."""
+        snap = self.snapshot()
+        return snap.spec, snap.meta, snap.index
+
+    async def snapshot_async(self) -> StoreSnapshot:
+        """`snapshot()` for the event loop: the fetch is asyncio-native and never blocks the loop."""
+        if self.refresh_interval_seconds > 0:
+            current = self._snapshot
+            if current is not None:
+                self.start_background_refresh()
+                return current
+            snap = await self._refresh_async()
+            self.start_background_refresh()
+            return snap
+        return await self._refresh_async()
+
+    async def load_index_async(self) -> tuple[dict[str, Any], dict[str, Any], OperationIndex]:
+        snap = await self.snapshot_async()
+        return snap.spec, snap.meta, snap.index
+
+    def _join_flight(self) -> tuple[_Flight, bool]:
+        # Single-flight: the first caller fetches, concurrent callers (sync or async) share its result.
+        with self._lock:
+            flight = self._inflight
+            if flight is not None:
+                return flight, False
+            flight = self._inflight = _Flight()
+            return flight, True
+
+    def _land_flight(self, flight: _Flight) -> None:
+        with self._lock:
+            self._inflight = None
+        flight.finish()
+
+    def _refresh(self) -> StoreSnapshot:
+        flight, leader = self._join_flight()
+        if not leader:
+            flight.done.wait()
+            return flight.result()
+        try:
+            flight.snapshot = self._fetch_snapshot()
+            return flight.snapshot
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land_flight(flight)
+
+    async def _refresh_async(self) -> StoreSnapshot:
+        flight, leader = self._join_flight()
+        if not leader:
+            return await flight.wait_async()
+        try:
+            flight.snapshot = await self._fetch_snapshot_async()
+            return flight.snapshot
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land_flight(flight)
+
+    def _cold_start_snapshot(self) -> StoreSnapshot | None:
+        """
+        The on-disk snapshot for the cached spec, used as the previous snapshot on a cold
+        start: a valid TTL, a 304 or an unchanged sha256 then skip JSON parsing and indexing.
+        """
+        if not self.disk_snapshot or self.lazy_spec:
+            return None
+        loaded = read_cached_snapshot(self.cache_dir)
+        if loaded is None:
+            return None
+        spec, meta, index = loaded
+        return StoreSnapshot(spec=spec, meta=meta, index=index)
+
+    def _write_disk_snapshot(self, snap: StoreSnapshot) -> None:
+        def write() -> None:
+            try:
+                write_snapshot(self.cache_dir, sha256=snap.sha256 or "", spec=snap.spec, index=snap.index)
+            except Exception:
+                # Best effort: without a snapshot the next cold start parses JSON instead.
+                pass
+
+        # Not a daemon thread, so a short-lived CLI process still finishes the write on exit.
+        thread = threading.Thread(target=write, name="openapi-snapshot")
+        self._snapshot_writer = thread
+        thread.start()
+
+    def flush_disk_snapshot(self, timeout: float | None = None) -> None:
+        """Wait for a pending on-disk snapshot write."""
+        thread = self._snapshot_writer
+        if thread is not None:
+            thread.join(timeout)
+
+    def _fetch_snapshot(self) -> StoreSnapshot:
+        previous = self._snapshot or self._cold_start_snapshot()
         try:
             spec, meta = fetch_openapi_spec(
                 base_url=self.base_url,
                 cache_dir=self.cache_dir,
                 cache_ttl_seconds=self.cache_ttl_seconds,
                 timeout_seconds=self.timeout_seconds,
+                revalidate=self.revalidate,
+                lazy=self.lazy_spec,
+                previous_spec=previous.spec if previous else None,
+                previous_meta=previous.meta if previous else None,
             )
         except Exception as e:  # pragma: no cover - defensive
+            METRICS.incr("fetch.error")
             raise ToolError(code="OPENAPI_FETCH_FAILED", message=str(e), details={"baseUrl": self.base_url})
+        return self._install(previous, spec, meta)
+
+    async def _fetch_snapshot_async(self) -> StoreSnapshot:
+        previous = self._snapshot or await asyncio.to_thread(self._cold_start_snapshot)
+        try:
+            spec, meta = await fetch_openapi_spec_async(
+                client=self._http,
+                base_url=self.base_url,
+                cache_dir=self.cache_dir,
+                cache_ttl_seconds=self.cache_ttl_seconds,
+                timeout_seconds=self.timeout_seconds,
+                revalidate=self.revalidate,
+                lazy=self.lazy_spec,
+                previous_spec=previous.spec if previous else None,
+                previous_meta=previous.meta if previous else None,
+            )
+        except Exception as e:
+            METRICS.incr("fetch.error")
+            raise ToolError(code="OPENAPI_FETCH_FAILED", message=str(e), details={"baseUrl": self.base_url})
+        if previous is not None and previous.sha256 == meta.get("sha256"):
+            return self._install(previous, spec, meta)
+        # Index building is CPU-bound; keep it off the event loop.
+        return await asyncio.to_thread(self._install, previous, spec, meta)
+
+    def _install(self, previous: StoreSnapshot | None, spec: dict[str, Any], meta: dict[str, Any]) -> StoreSnapshot:
+        if previous is not None and previous.sha256 == meta.get("sha256"):
+            snap = previous if previous.meta is meta else replace(previous, meta=meta)
+            with self._lock:
+                self._snapshot = snap
+            return snap
+
+        started = time.perf_counter()
+        changed_components = diff_components(previous.spec, spec) if previous is not None else None
+        try:
+            index = build_index(
+                spec, previous=previous.index if previous is not None else None, changed_components=changed_components
+            )
+        except ValueError as e:
+            raise ToolError(code="OPENAPI_INVALID", message=str(e), details={"baseUrl": self.base_url})
+        METRICS.observe_since("index.build", started)
+        diff = None
+        if previous is not None:
+            started = time.perf_counter()
+            diff = diff_specs(
+                previous.spec,
+                previous.index,
+                spec,
+                index,
+                previous_sha256=previous.sha256,
+                components=changed_components,
+            )
+            meta = {**meta, "diff": diff.summary()}
+            METRICS.observe_since("index.diff", started)
+        snap = StoreSnapshot(spec=spec, meta=meta, index=index)
+        with self._lock:
+            self._snapshot = snap
+        if previous is not None and previous.sha256 and snap.sha256 and diff is not None:
+            self._carry_over_deref_cache(previous.sha256, snap, diff)
+        # A lazy spec wraps a memory map and is not snapshotted (a snapshot is fully parsed anyway).
+        if self.disk_snapshot and not self.lazy_spec and snap.sha256:
+            self._write_disk_snapshot(snap)
+        previous_sha256 = previous.sha256 if previous else None
+        for listener in list(self._listeners):
+            listener(previous_sha256, meta)
+        return snap
+
+    def _carry_over_deref_cache(self, previous_sha256: str, snap: StoreSnapshot, diff: SpecDiff) -> None:
+        graph = snap.index.refs
+
+        def unchanged(ref: str) -> bool:
+            key = component_key(ref)
+            return key is not None and not (graph.closure_of(key) & diff.components)
+
+        self.deref_cache.carry_over(previous_sha256, snap.sha256 or "", unchanged)
+
+    def add_listener(self, listener: Callable[[str | None, dict[str, Any]], None]) -> None:
+        """
+        Call `listener(previous_sha256, meta)` after a snapshot with a new sha256 is swapped in.
+
+        When a previous snapshot existed, `meta["diff"]` is its `SpecDiff.summary()`.
+        """
+        self._listeners.append(listener)
 
-        if self._meta is None or self._meta.get("sha256") != meta.get("sha256"):
-            ops, by_id = build_operations(spec)
-            self._spec = spec
-            self._meta = meta
-            self._operations = ops
-            self._operation_by_id = by_id
+    def start_background_refresh(self) -> None:
+        """Revalidate the spec every `refresh_interval_seconds` on a daemon thread."""
+        if self.refresh_interval_seconds <= 0 or self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._stop.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="openapi-refresh", daemon=True)
+            self._refresher.start()
 
-        return self._spec or spec, self._meta or meta
+    def stop_background_refresh(self) -> None:
+        self._stop.set()
+        thread, self._refresher = self._refresher, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.timeout_seconds + 1)
+
+    def _refresh_loop(self) -> None:
+        if self._snapshot is None:
+            self._refresh_quietly()
+        while not self._stop.wait(self.refresh_interval_seconds):
+            self._refresh_quietly()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh()
+            self._refresh_error = None
+        except Exception as e:
+            # Keep serving the last good snapshot; the next tick retries.
+            self._refresh_error = e
+
+    def current_snapshot(self) -> StoreSnapshot | None:
+        """The loaded snapshot, without triggering a fetch."""
+        return self._snapshot
+
+    def current_meta(self) -> dict[str, Any] | None:
+        """Metadata of the loaded snapshot, without triggering a fetch."""
+        snap = self._snapshot
+        return snap.meta if snap is not None else None
 
     def operations(self) -> list[Operation]:
-        self.load()
-        return list(self._operations or [])
+        return list(self.snapshot().index.operations)
 
     def operation_by_id(self, operation_id: str) -> Operation | None:
-        self.load()
-        return (self._operation_by_id or {}).get(operation_id)
+        entry = self.snapshot().index.entries.get(operation_id)
+        return entry.operation if entry is not None else None
 
     def spec(self) -> dict[str, Any]:
-        self.load()
-        return self._spec or {}
-
+        return self.snapshot().spec
@@ -1,52 +1,161 @@
 from __future__ import annotations
 
+import atexit
+import threading
+from typing import Any, Awaitable, Callable
+
 from .config import Config
+from .errors import ToolError, error_response
+from .metrics import PROFILER
+from .openapi.registry import StoreRegistry
 from .openapi.store import OpenAPIStore
-from .tools.get_request_schema import get_request_schema
-from .tools.get_response_schema import get_response_schema
-from .tools.search_operations import search_operations
+from .tools.get_request_schema import get_request_schema_async
+from .tools.get_response_schema import get_response_schema_async
+from .tools.get_schemas import get_schemas_async
+from .tools.projection import DEFAULT_MAX_BYTES, DEFAULT_MAX_FIELDS
+from .tools.result_cache import ResultCache
+from .tools.search_operations import search_operations_async
+from .tools.stats import collect_stats
+
+
+def _result_caches(cfg: Config, registry: StoreRegistry) -> dict[str, ResultCache]:
+    caches: dict[str, ResultCache] = {}
+    for name, store in registry.items():
+        persist_dir = cfg.service_cache_dir(name)
+        cache = ResultCache(
+            max_bytes=cfg.result_cache_max_bytes,
+            persist_path=persist_dir / "schema_results.json" if cfg.result_cache_persist else None,
+        )
+        store.add_listener(cache.invalidate)
+        atexit.register(cache.save)
+        caches[name] = cache
+    return caches
 
 
 def create_server():
     from mcp.server.fastmcp import FastMCP
 
     cfg = Config.from_env()
-    store = OpenAPIStore(
-        base_url=cfg.base_url,
-        cache_dir=cfg.cache_dir,
-        cache_ttl_seconds=cfg.cache_ttl_seconds,
-        timeout_seconds=cfg.request_timeout_seconds,
-    )
+    registry = StoreRegistry.from_config(cfg)
+    results = _result_caches(cfg, registry)
+    if cfg.profile_slow_ms > 0:
+        PROFILER.configure(cfg.cache_dir / "profiles", cfg.profile_slow_ms)
+
+    def warm_up() -> None:
+        registry.warm_up()
+        for _name, store in registry.items():
+            store.start_background_refresh()
+
+    threading.Thread(target=warm_up, name="openapi-warmup", daemon=True).start()
+
+    async def with_store(service: str | None, fn: Callable[[str, OpenAPIStore], Awaitable[Any]]) -> Any:
+        try:
+            name, store = registry.resolve(service)
+        except ToolError as e:
+            return error_response(e.code, e.message, e.details)
+        return await fn(name, store)
 
     mcp = FastMCP("openapi-agent-mcp")
 
     @mcp.tool()
-    def search_operations_tool(
+    def list_services_tool():
+        return registry.describe()
+
+    @mcp.tool()
+    async def search_operations_tool(
         query: str = "",
         match: dict[str, bool] | None = None,
         method: str | None = None,
         limit: int = 50,
+        service: str | None = None,
     ):
-        return search_operations(store=store, query=query, match=match, method=method, limit=limit)
+        return await with_store(
+            service,
+            lambda _name, store: search_operations_async(
+                store=store, query=query, match=match, method=method, limit=limit
+            ),
+        )
+
+    @mcp.tool()
+    async def get_request_schema_tool(
+        operationId: str,
+        service: str | None = None,
+        pointer: str | None = None,
+        requiredOnly: bool = False,
+        mode: str = "full",
+        maxFields: int = DEFAULT_MAX_FIELDS,
+        maxBytes: int = DEFAULT_MAX_BYTES,
+    ):
+        return await with_store(
+            service,
+            lambda name, store: get_request_schema_async(
+                store=store,
+                operationId=operationId,
+                deref_max_depth=cfg.deref_max_depth,
+                deref_max_nodes=cfg.deref_max_nodes,
+                result_cache=results[name],
+                prune_components=cfg.prune_components,
+                pointer=pointer,
+                required_only=requiredOnly,
+                mode=mode,
+                max_fields=maxFields,
+                max_bytes=maxBytes,
+            ),
+        )
 
     @mcp.tool()
-    def get_request_schema_tool(operationId: str):
-        return get_request_schema(
-            store=store,
-            operationId=operationId,
-            deref_max_depth=cfg.deref_max_depth,
-            deref_max_nodes=cfg.deref_max_nodes,
+    async def get_response_schema_tool(
+        operationId: str,
+        service: str | None = None,
+        statusCodes: list[str] | None = None,
+        pointer: str | None = None,
+        requiredOnly: bool = False,
+        mode: str = "full",
+        maxFields: int = DEFAULT_MAX_FIELDS,
+        maxBytes: int = DEFAULT_MAX_BYTES,
+    ):
+        return await with_store(
+            service,
+            lambda name, store: get_response_schema_async(
+                store=store,
+                operationId=operationId,
+                deref_max_depth=cfg.deref_max_depth,
+                deref_max_nodes=cfg.deref_max_nodes,
+                result_cache=results[name],
+                prune_components=cfg.prune_components,
+                status_codes=statusCodes,
+                pointer=pointer,
+                required_only=requiredOnly,
+                mode=mode,
+                max_fields=maxFields,
+                max_bytes=maxBytes,
+            ),
         )
 
     @mcp.tool()
-    def get_response_schema_tool(operationId: str):
-        return get_response_schema(
-            store=store,
-            operationId=operationId,
-            deref_max_depth=cfg.deref_max_depth,
-            deref_max_nodes=cfg.deref_max_nodes,
+    async def get_schemas_tool(operationIds: list[str], service: str | None = None):
+        return await with_store(
+            service,
+            lambda name, store: get_schemas_async(
+                store=store,
+                operationIds=operationIds,
+                deref_max_depth=cfg.deref_max_depth,
+                deref_max_nodes=cfg.deref_max_nodes,
+                result_cache=results[name],
+                prune_components=cfg.prune_components,
+            ),
         )
 
+    @mcp.tool()
+    def stats_tool(service: str | None = None):
+        if service is None:
+            return collect_stats(registry.items(), results)
+        try:
+            name, store = registry.resolve(service)
+        except ToolError as e:
+            return error_response(e.code, e.message, e.details)
+        return collect_stats([(name, store)], results)
+
     return mcp
 
 
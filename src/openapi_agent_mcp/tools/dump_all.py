@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from ..openapi.cache import ensure_dir, open_temp_file, replace_atomic, write_json_atomic
+from ..openapi.deref import DerefCache
+from ..openapi.index import OperationIndex, build_index
+from ..openapi.lazy import LazyJSONObject, plain
+from .export_index import operation_record
+
+MANIFEST_FILE = "manifest.json"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+# Per-process state: the parsed spec and index, unpickled once when a worker starts.
+_WORKER: dict[str, Any] = {}
+
+
+def operation_filename(operation_id: str) -> str:
+    """`<operationId>.json`, with unsafe characters replaced and a hash suffix to keep names distinct."""
+    safe = _UNSAFE.sub("_", operation_id)
+    if safe != operation_id or safe.startswith("."):
+        safe = f"{safe}-{hashlib.sha1(operation_id.encode('utf-8')).hexdigest()[:8]}"
+    return safe + ".json"
+
+
+def _init_worker(state: dict[str, Any]) -> None:
+    _WORKER.clear()
+    _WORKER.update(state)
+    _WORKER["deref_cache"] = DerefCache()
+
+
+def _dump_chunk(positions: list[int]) -> list[tuple[str, str | None, str | None]]:
+    """(operationId, error code, file name or NDJSON line) per operation position."""
+    index: OperationIndex = _WORKER["index"]
+    out_dir: Path | None = _WORKER["out_dir"]
+    done: list[tuple[str, str | None, str | None]] = []
+    for position in positions:
+        op = index.operations[position]
+        record = operation_record(
+            op,
+            spec=_WORKER["spec"],
+            meta=_WORKER["meta"],
+            index=index,
+            with_schemas=True,
+            deref_cache=_WORKER["deref_cache"],
+            **_WORKER["options"],
+        )
+        error = record["error"]["code"] if "error" in record else None
+        if out_dir is None:
+            done.append((op.operationId, error, json.dumps(record, ensure_ascii=False, separators=(",", ":"))))
+        elif error is not None:
+            done.append((op.operationId, error, None))
+        else:
+            name = operation_filename(op.operationId)
+            write_json_atomic(out_dir / name, record)
+            done.append((op.operationId, None, name))
+    return done
+
+
+def _chunks(total: int, workers: int) -> list[list[int]]:
+    size = max(1, min(256, total // (workers * 8) or 1))
+    return [list(range(start, min(start + size, total))) for start in range(0, total, size)]
+
+
+def _run(state: dict[str, Any], chunks: list[list[int]], workers: int) -> Iterator[list[tuple[str, str | None, str | None]]]:
+    if workers <= 1:
+        _init_worker(state)
+        try:
+            yield from map(_dump_chunk, chunks)
+        finally:
+            _WORKER.clear()
+        return
+    # Never fork: the caller (server, daemon) may have live threads holding locks.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(state,)) as pool:
+        yield from pool.map(_dump_chunk, chunks)
+
+
+def _write_lines(path: Path, lines: Iterable[str]) -> None:
+    ensure_dir(path.parent)
+    raw, tmp_path = open_temp_file(path)
+    try:
+        with io.TextIOWrapper(raw, encoding="utf-8") as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+        replace_atomic(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def dump_all_schemas(
+    *,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    prune_components: bool = True,
+    out_dir: Path | None = None,
+    out: Path | None = None,
+    workers: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Build every operation's `operation_record` (with schemas) across a process pool.
+
+    Writes one `<operationId>.json` per operation plus `manifest.json` into `out_dir`, or
+    all records as NDJSON in spec order to `out`. Workers are started by forkserver (or
+    spawn) and unpickle the spec and index once; a lazy spec, which wraps a memory map, is
+    first copied into plain JSON and re-indexed.
+    `progress(done, total)` is called in this process as chunks complete.
+    """
+    if (out_dir is None) == (out is None):
+        raise ValueError("exactly one of out_dir/out is required")
+    total = len(index.operations)
+    workers = max(1, min(workers or os.cpu_count() or 1, total or 1))
+    if workers > 1 and isinstance(spec, LazyJSONObject):
+        spec = plain(spec)
+        index = build_index(spec)
+    state = {
+        "spec": spec,
+        "meta": meta,
+        "index": index,
+        "out_dir": out_dir,
+        "options": {
+            "deref_max_depth": deref_max_depth,
+            "deref_max_nodes": deref_max_nodes,
+            "prune_components": prune_components,
+        },
+    }
+    if out_dir is not None:
+        ensure_dir(out_dir)
+
+    started = time.perf_counter()
+    files: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    done = 0
+
+    def results() -> Iterator[str]:
+        nonlocal done
+        for chunk in _run(state, _chunks(total, workers), workers):
+            for operation_id, error, value in chunk:
+                if error is not None:
+                    errors[operation_id] = error
+                elif out_dir is not None:
+                    files[operation_id] = value
+                if out is not None:
+                    yield value
+            done += len(chunk)
+            if progress is not None:
+                progress(done, total)
+
+    if out is not None:
+        _write_lines(out, results())
+    else:
+        for _ in results():
+            pass
+        write_json_atomic(
+            out_dir / MANIFEST_FILE,
+            {"sha256": meta.get("sha256"), "operations": files, "errors": errors},
+        )
+
+    return {
+        "sha256": meta.get("sha256"),
+        "operations": total,
+        "written": len(files) if out_dir is not None else total,
+        "errors": errors,
+        "workers": workers,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
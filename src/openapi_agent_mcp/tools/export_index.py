@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+from ..errors import ToolError, error_response
+from ..openapi.deref import DerefCache
+from ..openapi.index import Operation, OperationIndex
+from ..openapi.search import operation_to_dict
+from .get_request_schema import build_request_schema
+from .get_response_schema import build_response_schema
+from .get_schemas import merge_components
+
+
+def operation_record(
+    op: Operation,
+    *,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
+    with_schemas: bool = False,
+    deref_max_depth: int = 20,
+    deref_max_nodes: int = 20000,
+    deref_cache: DerefCache | None = None,
+    prune_components: bool = True,
+) -> dict[str, Any]:
+    """
+    An operation's summary fields and, with `with_schemas`, its dereferenced `params`,
+    `body` and `responses` plus the `components` its remaining refs need (or an `error`
+    if the operation's schemas cannot be built).
+    """
+    record = operation_to_dict(op)
+    if not with_schemas:
+        return record
+    kwargs = dict(
+        spec=spec,
+        meta=meta,
+        index=index,
+        operationId=op.operationId,
+        deref_max_depth=deref_max_depth,
+        deref_max_nodes=deref_max_nodes,
+        deref_cache=deref_cache,
+        prune_components=prune_components,
+    )
+    try:
+        request = build_request_schema(**kwargs)
+        response = build_response_schema(**kwargs)
+    except ToolError as e:
+        record.update(error_response(e.code, e.message, e.details))
+        return record
+    record["params"] = request["params"]
+    record["body"] = request["body"]
+    record["responses"] = response["responses"]
+    record["components"] = merge_components([request, response], spec=spec, index=index, prune_components=prune_components)
+    return record
+
+
+def iter_index_records(
+    *,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
+    with_schemas: bool = False,
+    deref_max_depth: int = 20,
+    deref_max_nodes: int = 20000,
+    deref_cache: DerefCache | None = None,
+    prune_components: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Every indexed operation's `operation_record`, in spec order, built on demand and never retained."""
+    for op in index.operations:
+        yield operation_record(
+            op,
+            spec=spec,
+            meta=meta,
+            index=index,
+            with_schemas=with_schemas,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=deref_cache,
+            prune_components=prune_components,
+        )
+
+
+def write_ndjson(records: Iterable[Any], fp: TextIO) -> int:
+    """Write one compact JSON document per line; returns the number of lines."""
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        fp.write("\n")
+        count += 1
+    return count
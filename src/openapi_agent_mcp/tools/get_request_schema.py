@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 from typing import Any
 
 from ..errors import ToolError, error_response
+from ..metrics import profiled, timed_tool
 from ..openapi.content_type import choose_content_type
-from ..openapi.deref import deref_schema
-from ..openapi.lookup import find_operation
+from ..openapi.deref import DerefCache, deref_schema
+from ..openapi.index import OperationIndex
+from ..openapi.lookup import lookup_operation
+from ..openapi.skeleton import SkeletonBuilder
 from ..openapi.store import OpenAPIStore
+from .projection import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_FIELDS,
+    FULL,
+    Projection,
+    make_projection,
+    project_pointer,
+    result_components,
+    skeleton_builder,
+)
+from .result_cache import ResultCache
 
 
 def _empty_param_object() -> dict[str, Any]:
@@ -29,84 +45,235 @@ def _parameter_schema(spec: dict[str, Any], param: dict[str, Any]) -> Any:
     )
 
 
-def get_request_schema(
-    *,
-    store: OpenAPIStore,
-    operationId: str,
-    deref_max_depth: int,
-    deref_max_nodes: int,
-) -> dict[str, Any]:
-    try:
-        spec, _meta = store.load()
-        method, path, op, path_item = find_operation(spec, operationId)
+def _raw_request(op: dict[str, Any], path_item: dict[str, Any], spec: dict[str, Any]) -> dict[str, Any]:
+    """The get_request_schema `params`/`body` with raw (not yet dereferenced) schemas; raises ToolError."""
+    params = {"path": _empty_param_object(), "query": _empty_param_object(), "header": _empty_param_object(), "cookie": _empty_param_object()}
+    required_by_in: dict[str, set[str]] = {k: set() for k in params.keys()}
 
-        params = {"path": _empty_param_object(), "query": _empty_param_object(), "header": _empty_param_object(), "cookie": _empty_param_object()}
-        required_by_in: dict[str, set[str]] = {k: set() for k in params.keys()}
+    combined_params: list[Any] = []
+    if isinstance(path_item.get("parameters"), list):
+        combined_params.extend(path_item["parameters"])
+    if isinstance(op.get("parameters"), list):
+        combined_params.extend(op["parameters"])
 
-        combined_params: list[Any] = []
-        if isinstance(path_item.get("parameters"), list):
-            combined_params.extend(path_item["parameters"])
-        if isinstance(op.get("parameters"), list):
-            combined_params.extend(op["parameters"])
+    for p in combined_params:
+        if not isinstance(p, dict):
+            continue
+        p_in = p.get("in")
+        name = p.get("name")
+        if p_in not in params or not isinstance(name, str) or not name:
+            continue
 
-        kept_ref = False
-        for p in combined_params:
-            if not isinstance(p, dict):
-                continue
-            p_in = p.get("in")
-            name = p.get("name")
-            if p_in not in params or not isinstance(name, str) or not name:
-                continue
+        params[p_in]["properties"][name] = _parameter_schema(spec, p)
 
-            schema = _parameter_schema(spec, p)
-            res = deref_schema(schema, spec=spec, max_depth=deref_max_depth, max_nodes=deref_max_nodes)
-            kept_ref = kept_ref or res.kept_ref
+        is_required = bool(p.get("required", False)) or p_in == "path"
+        if is_required:
+            required_by_in[p_in].add(name)
 
-            params[p_in]["properties"][name] = res.schema
+    for loc, req in required_by_in.items():
+        params[loc]["required"] = sorted(req)
 
-            is_required = bool(p.get("required", False)) or p_in == "path"
-            if is_required:
-                required_by_in[p_in].add(name)
+    body_obj = {"selectedContentType": None, "required": False, "schema": {}}
+    request_body = op.get("requestBody")
+    if request_body is None:
+        pass
+    elif isinstance(request_body, dict):
+        content = request_body.get("content")
+        if not isinstance(content, dict):
+            raise ToolError(code="REQUEST_BODY_MISSING", message="requestBody.content missing or invalid")
 
-        for loc, req in required_by_in.items():
-            params[loc]["required"] = sorted(req)
+        selected, media = choose_content_type(content)
+        if selected is None or not isinstance(media, dict):
+            raise ToolError(code="REQUEST_BODY_MISSING", message="requestBody.content is empty")
+
+        schema = media.get("schema")
+        if not isinstance(schema, dict):
+            raise ToolError(code="REQUEST_BODY_SCHEMA_MISSING", message="requestBody schema missing and cannot be inferred")
+
+        body_obj = {"selectedContentType": selected, "required": bool(request_body.get("required", False)), "schema": schema}
+    else:
+        raise ToolError(code="REQUEST_BODY_INVALID", message="requestBody must be an object when present")
+
+    return {"params": params, "body": body_obj}
+
+
+def _request_skeleton(raw: dict[str, Any], builder: SkeletonBuilder) -> dict[str, Any]:
+    params: dict[str, str] = {}
+    for loc, obj in raw["params"].items():
+        required = set(obj["required"])
+        for name, schema in obj["properties"].items():
+            if builder.required_only and name not in required:
+                continue
+            params.update(builder.fields(schema, prefix=f"{loc}.{name}", required=name in required))
+    body = raw["body"]
+    fields = builder.fields(body["schema"]) if body["selectedContentType"] is not None else {}
+    return {
+        "params": params,
+        "body": {"selectedContentType": body["selectedContentType"], "required": body["required"], "fields": fields},
+        "skeleton": builder.summary(),
+    }
 
-        body_obj = {"selectedContentType": None, "required": False, "schema": {}}
-        request_body = op.get("requestBody")
-        if request_body is None:
-            pass
-        elif isinstance(request_body, dict):
-            content = request_body.get("content")
-            if not isinstance(content, dict):
-                raise ToolError(code="REQUEST_BODY_MISSING", message="requestBody.content missing or invalid")
 
-            selected, media = choose_content_type(content)
-            if selected is None or not isinstance(media, dict):
-                raise ToolError(code="REQUEST_BODY_MISSING", message="requestBody.content is empty")
+@profiled("get_request_schema")
+def build_request_schema(
+    *,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
+    operationId: str,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    deref_cache: DerefCache | None = None,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    projection: Projection = FULL,
+) -> dict[str, Any]:
+    """
+    Build the get_request_schema response from one snapshot; raises ToolError.
 
-            schema = media.get("schema")
-            if not isinstance(schema, dict):
-                raise ToolError(code="REQUEST_BODY_SCHEMA_MISSING", message="requestBody schema missing and cannot be inferred")
+    When `$ref`s are kept, `components` holds only the entries they transitively need
+    (`prune_components`), or the whole `components` object otherwise. A non-default
+    `projection` returns only the selected part (see `Projection`).
+    """
+    tool = "request" + projection.tag() + ("" if prune_components else ":full")
+    if result_cache is not None:
+        cached = result_cache.get(meta.get("sha256"), tool, operationId, deref_max_depth, deref_max_nodes)
+        if cached is not None:
+            return cached
 
-            res = deref_schema(schema, spec=spec, max_depth=deref_max_depth, max_nodes=deref_max_nodes)
+    method, path, op, path_item = lookup_operation(index, operationId)
+    raw = _raw_request(op, path_item, spec)
+    deref = functools.partial(
+        deref_schema,
+        spec=spec,
+        max_depth=deref_max_depth,
+        max_nodes=deref_max_nodes,
+        cache=deref_cache,
+        spec_hash=meta.get("sha256"),
+        graph=index.refs,
+        required_only=projection.required_only,
+    )
+
+    result: dict[str, Any] = {"operationId": operationId, "method": method, "path": path}
+    if projection.pointer is not None:
+        result.update(
+            project_pointer(
+                raw,
+                projection=projection,
+                spec=spec,
+                index=index,
+                deref=deref,
+                max_depth=deref_max_depth,
+                prune_components=prune_components,
+            )
+        )
+    elif projection.skeleton:
+        result.update(_request_skeleton(raw, skeleton_builder(spec, projection, deref_max_depth)))
+    else:
+        params, body_obj = raw["params"], raw["body"]
+        kept_ref = False
+        for obj in params.values():
+            if projection.required_only:
+                obj["properties"] = {k: v for k, v in obj["properties"].items() if k in obj["required"]}
+            for name, schema in obj["properties"].items():
+                res = deref(schema)
+                kept_ref = kept_ref or res.kept_ref
+                obj["properties"][name] = res.schema
+        if body_obj["selectedContentType"] is not None:
+            res = deref(body_obj["schema"])
             kept_ref = kept_ref or res.kept_ref
+            body_obj["schema"] = res.schema
+        result["params"] = params
+        result["body"] = body_obj
+        result["components"] = result_components(
+            [params, body_obj], kept_ref=kept_ref, spec=spec, index=index, prune_components=prune_components
+        )
 
-            body_obj = {"selectedContentType": selected, "required": bool(request_body.get("required", False)), "schema": res.schema}
-        else:
-            raise ToolError(code="REQUEST_BODY_INVALID", message="requestBody must be an object when present")
+    if result_cache is not None:
+        result_cache.put(meta.get("sha256"), tool, operationId, deref_max_depth, deref_max_nodes, result)
+    return result
 
-        components = spec.get("components", {}) if kept_ref else {}
 
-        return {
-            "operationId": operationId,
-            "method": method,
-            "path": path,
-            "params": params,
-            "body": body_obj,
-            "components": components if isinstance(components, dict) else {},
-        }
+@timed_tool("get_request_schema")
+def get_request_schema(
+    *,
+    store: OpenAPIStore,
+    operationId: str,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    pointer: str | None = None,
+    required_only: bool = False,
+    mode: str = "full",
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, Any]:
+    try:
+        projection = make_projection(
+            pointer=pointer,
+            required_only=required_only,
+            mode=mode,
+            max_fields=max_fields,
+            max_bytes=max_bytes,
+        )
+        spec, meta, index = store.load_index()
+        return build_request_schema(
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationId=operationId,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+            projection=projection,
+        )
     except ToolError as e:
         return error_response(e.code, e.message, e.details)
     except Exception as e:  # pragma: no cover - defensive
         return error_response("INTERNAL_ERROR", str(e), {})
 
+
+@timed_tool("get_request_schema")
+async def get_request_schema_async(
+    *,
+    store: OpenAPIStore,
+    operationId: str,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    pointer: str | None = None,
+    required_only: bool = False,
+    mode: str = "full",
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, Any]:
+    try:
+        projection = make_projection(
+            pointer=pointer,
+            required_only=required_only,
+            mode=mode,
+            max_fields=max_fields,
+            max_bytes=max_bytes,
+        )
+        spec, meta, index = await store.load_index_async()
+        return await asyncio.to_thread(
+            build_request_schema,
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationId=operationId,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+            projection=projection,
+        )
+    except ToolError as e:
+        return error_response(e.code, e.message, e.details)
+    except Exception as e:  # pragma: no cover - defensive
+        return error_response("INTERNAL_ERROR", str(e), {})
@@ -1,67 +1,226 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 from typing import Any
 
 from ..errors import ToolError, error_response
+from ..metrics import profiled, timed_tool
 from ..openapi.content_type import choose_content_type
-from ..openapi.deref import deref_schema
-from ..openapi.lookup import find_operation
+from ..openapi.deref import DerefCache, deref_schema
+from ..openapi.index import OperationIndex
+from ..openapi.lookup import lookup_operation
 from ..openapi.store import OpenAPIStore
+from .projection import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_FIELDS,
+    FULL,
+    Projection,
+    make_projection,
+    project_pointer,
+    result_components,
+    select_responses,
+    skeleton_builder,
+)
+from .result_cache import ResultCache
 
 
-def get_response_schema(
+def _raw_responses(op: dict[str, Any], status_codes: tuple[str, ...]) -> dict[str, Any]:
+    """The get_response_schema `responses` with raw (not yet dereferenced) schemas; raises ToolError."""
+    responses = op.get("responses")
+    if not isinstance(responses, dict):
+        raise ToolError(code="RESPONSES_MISSING", message="responses missing or invalid")
+
+    out: dict[str, Any] = {}
+    for status_code, resp in select_responses(responses, status_codes).items():
+        key = str(status_code)
+        if not isinstance(resp, dict):
+            out[key] = {"selectedContentType": None, "schema": {}}
+            continue
+
+        content = resp.get("content")
+        selected, media = choose_content_type(content if isinstance(content, dict) else None)
+        if selected is None or not isinstance(media, dict):
+            out[key] = {"selectedContentType": None, "schema": {}}
+            continue
+
+        schema = media.get("schema")
+        if not isinstance(schema, dict):
+            raise ToolError(
+                code="RESPONSE_SCHEMA_MISSING",
+                message="response schema missing and cannot be inferred",
+                details={"statusCode": key},
+            )
+        out[key] = {"selectedContentType": selected, "schema": schema}
+    return {"responses": out}
+
+
+@profiled("get_response_schema")
+def build_response_schema(
     *,
-    store: OpenAPIStore,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
     operationId: str,
     deref_max_depth: int,
     deref_max_nodes: int,
+    deref_cache: DerefCache | None = None,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    projection: Projection = FULL,
 ) -> dict[str, Any]:
-    try:
-        spec, _meta = store.load()
-        method, path, op, _path_item = find_operation(spec, operationId)
+    """
+    Build the get_response_schema response from one snapshot; raises ToolError.
 
-        responses = op.get("responses")
-        if not isinstance(responses, dict):
-            raise ToolError(code="RESPONSES_MISSING", message="responses missing or invalid")
+    When `$ref`s are kept, `components` holds only the entries they transitively need
+    (`prune_components`), or the whole `components` object otherwise. A non-default
+    `projection` returns only the selected part (see `Projection`).
+    """
+    tool = "response" + projection.tag() + ("" if prune_components else ":full")
+    if result_cache is not None:
+        cached = result_cache.get(meta.get("sha256"), tool, operationId, deref_max_depth, deref_max_nodes)
+        if cached is not None:
+            return cached
 
-        out: dict[str, Any] = {}
-        kept_ref = False
+    method, path, op, _path_item = lookup_operation(index, operationId)
+    raw = _raw_responses(op, projection.status_codes)
+    deref = functools.partial(
+        deref_schema,
+        spec=spec,
+        max_depth=deref_max_depth,
+        max_nodes=deref_max_nodes,
+        cache=deref_cache,
+        spec_hash=meta.get("sha256"),
+        graph=index.refs,
+        required_only=projection.required_only,
+    )
 
-        for status_code, resp in responses.items():
-            key = str(status_code)
-            if not isinstance(resp, dict):
-                out[key] = {"selectedContentType": None, "schema": {}}
+    result: dict[str, Any] = {"operationId": operationId, "method": method, "path": path}
+    if projection.pointer is not None:
+        result.update(
+            project_pointer(
+                raw,
+                projection=projection,
+                spec=spec,
+                index=index,
+                deref=deref,
+                max_depth=deref_max_depth,
+                prune_components=prune_components,
+            )
+        )
+    elif projection.skeleton:
+        builder = skeleton_builder(spec, projection, deref_max_depth)
+        result["responses"] = {
+            key: {
+                "selectedContentType": entry["selectedContentType"],
+                "fields": builder.fields(entry["schema"]) if entry["selectedContentType"] is not None else {},
+            }
+            for key, entry in raw["responses"].items()
+        }
+        result["skeleton"] = builder.summary()
+    else:
+        out = raw["responses"]
+        kept_ref = False
+        for entry in out.values():
+            if entry["selectedContentType"] is None:
                 continue
+            res = deref(entry["schema"])
+            kept_ref = kept_ref or res.kept_ref
+            entry["schema"] = res.schema
+        result["responses"] = out
+        result["components"] = result_components(
+            [out], kept_ref=kept_ref, spec=spec, index=index, prune_components=prune_components
+        )
 
-            content = resp.get("content")
-            selected, media = choose_content_type(content if isinstance(content, dict) else None)
-            if selected is None or not isinstance(media, dict):
-                out[key] = {"selectedContentType": None, "schema": {}}
-                continue
+    if result_cache is not None:
+        result_cache.put(meta.get("sha256"), tool, operationId, deref_max_depth, deref_max_nodes, result)
+    return result
 
-            schema = media.get("schema")
-            if not isinstance(schema, dict):
-                raise ToolError(
-                    code="RESPONSE_SCHEMA_MISSING",
-                    message="response schema missing and cannot be inferred",
-                    details={"statusCode": key},
-                )
 
-            res = deref_schema(schema, spec=spec, max_depth=deref_max_depth, max_nodes=deref_max_nodes)
-            kept_ref = kept_ref or res.kept_ref
-            out[key] = {"selectedContentType": selected, "schema": res.schema}
+@timed_tool("get_response_schema")
+def get_response_schema(
+    *,
+    store: OpenAPIStore,
+    operationId: str,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    status_codes: list[str] | None = None,
+    pointer: str | None = None,
+    required_only: bool = False,
+    mode: str = "full",
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, Any]:
+    try:
+        projection = make_projection(
+            status_codes=status_codes,
+            pointer=pointer,
+            required_only=required_only,
+            mode=mode,
+            max_fields=max_fields,
+            max_bytes=max_bytes,
+        )
+        spec, meta, index = store.load_index()
+        return build_response_schema(
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationId=operationId,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+            projection=projection,
+        )
+    except ToolError as e:
+        return error_response(e.code, e.message, e.details)
+    except Exception as e:  # pragma: no cover - defensive
+        return error_response("INTERNAL_ERROR", str(e), {})
 
-        components = spec.get("components", {}) if kept_ref else {}
 
-        return {
-            "operationId": operationId,
-            "method": method,
-            "path": path,
-            "responses": out,
-            "components": components if isinstance(components, dict) else {},
-        }
+@timed_tool("get_response_schema")
+async def get_response_schema_async(
+    *,
+    store: OpenAPIStore,
+    operationId: str,
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+    status_codes: list[str] | None = None,
+    pointer: str | None = None,
+    required_only: bool = False,
+    mode: str = "full",
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, Any]:
+    try:
+        projection = make_projection(
+            status_codes=status_codes,
+            pointer=pointer,
+            required_only=required_only,
+            mode=mode,
+            max_fields=max_fields,
+            max_bytes=max_bytes,
+        )
+        spec, meta, index = await store.load_index_async()
+        return await asyncio.to_thread(
+            build_response_schema,
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationId=operationId,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+            projection=projection,
+        )
     except ToolError as e:
         return error_response(e.code, e.message, e.details)
     except Exception as e:  # pragma: no cover - defensive
         return error_response("INTERNAL_ERROR", str(e), {})
-
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from ..errors import ToolError, error_response
+from ..metrics import profiled, timed_tool
+from ..openapi.deref import DerefCache
+from ..openapi.index import OperationIndex
+from ..openapi.lazy import plain
+from ..openapi.store import OpenAPIStore
+from .get_request_schema import build_request_schema
+from .get_response_schema import build_response_schema
+from .result_cache import ResultCache
+
+MAX_BATCH = 200
+
+
+def _check_operation_ids(operation_ids: Any) -> list[str]:
+    if not isinstance(operation_ids, list) or not all(isinstance(o, str) and o for o in operation_ids):
+        raise ToolError(code="BAD_INPUT", message="operationIds must be a list of non-empty strings")
+    if not operation_ids:
+        raise ToolError(code="BAD_INPUT", message="operationIds must not be empty")
+    if len(operation_ids) > MAX_BATCH:
+        raise ToolError(
+            code="BAD_INPUT",
+            message=f"at most {MAX_BATCH} operationIds per call",
+            details={"count": len(operation_ids)},
+        )
+    return list(dict.fromkeys(operation_ids))
+
+
+def merge_components(
+    results: list[dict[str, Any]], *, spec: dict[str, Any], index: OperationIndex, prune_components: bool
+) -> dict[str, Any]:
+    """One `components` section covering the `components` of several schema-tool results."""
+    needed: set[tuple[str, str]] = set()
+    for result in results:
+        for section, names in result["components"].items():
+            if isinstance(names, dict):
+                needed.update((section, name) for name in names)
+    if not needed:
+        return {}
+    if prune_components:
+        return index.refs.select(needed)
+    components = plain(spec.get("components", {}))
+    return components if isinstance(components, dict) else {}
+
+
+@profiled("get_schemas")
+def build_schemas(
+    *,
+    spec: dict[str, Any],
+    meta: dict[str, Any],
+    index: OperationIndex,
+    operationIds: list[str],
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    deref_cache: DerefCache | None = None,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+) -> dict[str, Any]:
+    """
+    Request and response schemas for several operations from one snapshot; raises ToolError on bad input.
+
+    Each entry is built exactly like get_request_schema/get_response_schema (sharing their
+    deref and result caches) minus its `components`; the union of those is returned once at
+    the top level. An unknown or malformed operation yields an `error` entry instead of
+    failing the whole batch. Duplicate operationIds are returned once.
+    """
+    kwargs = dict(
+        spec=spec,
+        meta=meta,
+        index=index,
+        deref_max_depth=deref_max_depth,
+        deref_max_nodes=deref_max_nodes,
+        deref_cache=deref_cache,
+        result_cache=result_cache,
+        prune_components=prune_components,
+    )
+    entries: list[dict[str, Any]] = []
+    results: list[dict[str, Any]] = []
+    for operation_id in _check_operation_ids(operationIds):
+        try:
+            request = build_request_schema(operationId=operation_id, **kwargs)
+            response = build_response_schema(operationId=operation_id, **kwargs)
+        except ToolError as e:
+            entries.append({"operationId": operation_id, **error_response(e.code, e.message, e.details)})
+            continue
+        results += (request, response)
+        entries.append(
+            {
+                "operationId": operation_id,
+                "method": request["method"],
+                "path": request["path"],
+                "params": request["params"],
+                "body": request["body"],
+                "responses": response["responses"],
+            }
+        )
+    components = merge_components(results, spec=spec, index=index, prune_components=prune_components)
+    return {"operations": entries, "components": components}
+
+
+@timed_tool("get_schemas")
+def get_schemas(
+    *,
+    store: OpenAPIStore,
+    operationIds: list[str],
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+) -> dict[str, Any]:
+    try:
+        _check_operation_ids(operationIds)
+        spec, meta, index = store.load_index()
+        return build_schemas(
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationIds=operationIds,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+        )
+    except ToolError as e:
+        return error_response(e.code, e.message, e.details)
+    except Exception as e:  # pragma: no cover - defensive
+        return error_response("INTERNAL_ERROR", str(e), {})
+
+
+@timed_tool("get_schemas")
+async def get_schemas_async(
+    *,
+    store: OpenAPIStore,
+    operationIds: list[str],
+    deref_max_depth: int,
+    deref_max_nodes: int,
+    result_cache: ResultCache | None = None,
+    prune_components: bool = True,
+) -> dict[str, Any]:
+    try:
+        _check_operation_ids(operationIds)
+        spec, meta, index = await store.load_index_async()
+        return await asyncio.to_thread(
+            build_schemas,
+            spec=spec,
+            meta=meta,
+            index=index,
+            operationIds=operationIds,
+            deref_max_depth=deref_max_depth,
+            deref_max_nodes=deref_max_nodes,
+            deref_cache=store.deref_cache,
+            result_cache=result_cache,
+            prune_components=prune_components,
+        )
+    except ToolError as e:
+        return error_response(e.code, e.message, e.details)
+    except Exception as e:  # pragma: no cover - defensive
+        return error_response("INTERNAL_ERROR", str(e), {})
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from ..errors import ToolError
+from ..openapi.deref import DerefResult, _resolve_local_ref
+from ..openapi.index import OperationIndex
+from ..openapi.lazy import plain
+from ..openapi.skeleton import SkeletonBuilder
+
+MODES = ("full", "skeleton")
+DEFAULT_MAX_FIELDS = 200
+DEFAULT_MAX_BYTES = 16_000
+
+_STATUS_RE = re.compile(r"^([1-5](\d\d|XX)|default)$", re.IGNORECASE)
+_MAX_REF_HOPS = 64
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    Which part of a schema-tool result to build, and how.
+
+    `status_codes` limits responses (`2XX` matches any 2xx code), `pointer` selects one
+    JSON-pointer subtree of the result (e.g. `/body/schema/properties/lines`), `required_only`
+    drops non-required properties, and `skeleton` returns `{field path: type}` maps capped by
+    `max_fields`/`max_bytes` instead of expanded schemas. Everything is applied while
+    dereferencing, so unselected parts are never expanded.
+    """
+
+    status_codes: tuple[str, ...] = ()
+    pointer: str | None = None
+    required_only: bool = False
+    skeleton: bool = False
+    max_fields: int = DEFAULT_MAX_FIELDS
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    def tag(self) -> str:
+        """Result-cache key suffix; empty for the default (full) projection."""
+        parts: list[str] = []
+        if self.status_codes:
+            parts.append("status=" + ",".join(self.status_codes))
+        if self.pointer is not None:
+            parts.append("pointer=" + self.pointer)
+        if self.required_only:
+            parts.append("required")
+        if self.skeleton:
+            parts.append(f"skeleton={self.max_fields}/{self.max_bytes}")
+        return f"[{';'.join(parts)}]" if parts else ""
+
+
+FULL = Projection()
+
+
+def make_projection(
+    *,
+    status_codes: list[str] | None = None,
+    pointer: str | None = None,
+    required_only: bool = False,
+    mode: str = "full",
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> Projection:
+    """Validate tool arguments into a Projection; raises ToolError(BAD_INPUT)."""
+    if mode not in MODES:
+        raise ToolError(code="BAD_INPUT", message=f"mode must be one of {', '.join(MODES)}", details={"mode": mode})
+    codes: list[str] = []
+    for code in status_codes or []:
+        if not isinstance(code, (str, int)) or not _STATUS_RE.match(str(code)):
+            raise ToolError(
+                code="BAD_INPUT",
+                message="statusCodes entries must be HTTP status codes, NXX ranges or 'default'",
+                details={"statusCode": code},
+            )
+        codes.append(str(code).upper() if str(code).lower() != "default" else "default")
+    if pointer is not None and not (isinstance(pointer, str) and pointer.startswith("/")):
+        raise ToolError(code="BAD_INPUT", message="pointer must be a JSON pointer starting with '/'", details={"pointer": pointer})
+    if int(max_fields) <= 0 or int(max_bytes) <= 0:
+        raise ToolError(
+            code="BAD_INPUT",
+            message="maxFields and maxBytes must be > 0",
+            details={"maxFields": max_fields, "maxBytes": max_bytes},
+        )
+    return Projection(
+        status_codes=tuple(dict.fromkeys(codes)),
+        pointer=pointer,
+        required_only=bool(required_only),
+        skeleton=mode == "skeleton",
+        max_fields=int(max_fields),
+        max_bytes=int(max_bytes),
+    )
+
+
+def _status_matches(key: str, wanted: str) -> bool:
+    key = key.upper() if key.lower() != "default" else "default"
+    if key == wanted:
+        return True
+    return wanted.endswith("XX") and len(key) == 3 and key[0] == wanted[0] and key[1:].isdigit()
+
+
+def select_responses(responses: dict[str, Any], status_codes: tuple[str, ...]) -> dict[str, Any]:
+    """The responses whose status code matches one of `status_codes` (all when empty)."""
+    if not status_codes:
+        return responses
+    selected = {
+        code: resp for code, resp in responses.items() if any(_status_matches(str(code), w) for w in status_codes)
+    }
+    if not selected:
+        raise ToolError(
+            code="STATUS_CODE_NOT_FOUND",
+            message="none of the requested status codes is documented for this operation",
+            details={"statusCodes": list(status_codes), "available": [str(c) for c in responses]},
+        )
+    return selected
+
+
+def _pointer_tokens(pointer: str) -> list[str]:
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer.split("/")[1:]]
+
+
+def _follow_refs(node: Any, spec: dict[str, Any]) -> Any:
+    for _ in range(_MAX_REF_HOPS):
+        if not (isinstance(node, dict) and isinstance(node.get("$ref"), str)):
+            return node
+        target = _resolve_local_ref(spec, node["$ref"])
+        if len(node) > 1 and isinstance(target, dict):
+            target = {**target, **{k: v for k, v in node.items() if k != "$ref"}}
+        node = target
+    raise ToolError(code="POINTER_NOT_FOUND", message="pointer runs into a $ref loop")
+
+
+def resolve_pointer(root: Any, pointer: str, spec: dict[str, Any]) -> Any:
+    """
+    Walk `pointer` through `root` (a result skeleton holding raw, un-dereferenced schemas),
+    resolving `$ref`s on the way, so only the selected subtree needs dereferencing.
+    """
+    node = root
+    for token in _pointer_tokens(pointer):
+        node = _follow_refs(node, spec)
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+            node = node[int(token)]
+        else:
+            raise ToolError(
+                code="POINTER_NOT_FOUND",
+                message=f"pointer does not resolve: {pointer}",
+                details={"pointer": pointer, "at": token},
+            )
+    return node
+
+
+def result_components(
+    values: list[Any], *, kept_ref: bool, spec: dict[str, Any], index: OperationIndex, prune_components: bool
+) -> dict[str, Any]:
+    """The `components` of a result: none without kept `$ref`s, else the pruned or full set."""
+    if not kept_ref:
+        return {}
+    if prune_components:
+        return index.refs.components_for(values)
+    components = plain(spec.get("components", {}))
+    return components if isinstance(components, dict) else {}
+
+
+def skeleton_builder(spec: dict[str, Any], projection: Projection, max_depth: int) -> SkeletonBuilder:
+    return SkeletonBuilder(
+        spec,
+        max_depth=max_depth,
+        max_fields=projection.max_fields,
+        max_bytes=projection.max_bytes,
+        required_only=projection.required_only,
+    )
+
+
+def project_pointer(
+    raw: dict[str, Any],
+    *,
+    projection: Projection,
+    spec: dict[str, Any],
+    index: OperationIndex,
+    deref: Callable[[Any], DerefResult],
+    max_depth: int,
+    prune_components: bool,
+) -> dict[str, Any]:
+    """The `projection.pointer` subtree of a raw result, dereferenced or as a skeleton."""
+    assert projection.pointer is not None
+    target = resolve_pointer(raw, projection.pointer, spec)
+    if projection.skeleton:
+        builder = skeleton_builder(spec, projection, max_depth)
+        return {"pointer": projection.pointer, "fields": builder.fields(target), "skeleton": builder.summary()}
+    res = deref(target)
+    components = result_components(
+        [res.schema], kept_ref=res.kept_ref, spec=spec, index=index, prune_components=prune_components
+    )
+    return {"pointer": projection.pointer, "schema": res.schema, "components": components}
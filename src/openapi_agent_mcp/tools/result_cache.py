@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from ..openapi.cache import ensure_dir, read_json, write_json_atomic
+from ..openapi.lru import LRUCache
+
+ResultKey = tuple[str, str, str, int, int]
+
+_FORMAT_VERSION = 2
+
+
+def _result_size(result: dict[str, Any]) -> int:
+    return len(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+
+
+class ResultCache:
+    """
+    Built schema-tool responses keyed by (sha256, tool, operationId, deref_max_depth, deref_max_nodes).
+
+    Bounded by the serialized size of the stored responses (`max_bytes`). `invalidate`, which
+    `OpenAPIStore.add_listener` calls on hash change, carries entries of the previous hash
+    over when the fetch metadata's `diff` shows their operation (and, for full-components
+    results, every component) unchanged, and drops the rest.
+    With `persist_path`, entries for the current hash are saved to and restored from disk.
+    Cached responses are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, *, max_bytes: int = 32 * 1024 * 1024, persist_path: Path | None = None) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.persist_path = persist_path
+        self._lru: LRUCache[ResultKey, dict[str, Any]] = LRUCache(max_entries=1_000_000, max_weight=self.max_bytes)
+        self._dirty = False
+        if persist_path is not None and persist_path.exists():
+            self._restore(persist_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, sha256: str | None, tool: str, operation_id: str, max_depth: int, max_nodes: int) -> dict[str, Any] | None:
+        if not self.enabled or not sha256:
+            return None
+        return self._lru.get((sha256, tool, operation_id, int(max_depth), int(max_nodes)))
+
+    def put(
+        self,
+        sha256: str | None,
+        tool: str,
+        operation_id: str,
+        max_depth: int,
+        max_nodes: int,
+        result: dict[str, Any],
+    ) -> None:
+        if not self.enabled or not sha256 or "error" in result:
+            return
+        self._lru.put((sha256, tool, operation_id, int(max_depth), int(max_nodes)), result, weight=_result_size(result))
+        self._dirty = True
+
+    def invalidate(self, previous_sha256: str | None = None, meta: dict[str, Any] | None = None) -> None:
+        keep = (meta or {}).get("sha256")
+        diff = (meta or {}).get("diff")
+        carry = isinstance(diff, dict) and bool(previous_sha256) and diff.get("previous_sha256") == previous_sha256
+        stale = set(diff.get("changed", ())) | set(diff.get("removed", ())) if carry else set()
+        components_changed = bool(diff.get("components")) if carry else True
+
+        def rename(key: ResultKey) -> ResultKey | None:
+            if key[0] == keep:
+                return key
+            if not carry or key[0] != previous_sha256 or key[2] in stale:
+                return None
+            if key[1].endswith(":full") and components_changed:
+                return None
+            return (keep, *key[1:])
+
+        self._lru.rekey(rename)
+        self._dirty = True
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._dirty = True
+
+    def stats(self) -> dict[str, Any]:
+        return self._lru.stats()
+
+    def save(self) -> None:
+        if self.persist_path is None or not self._dirty:
+            return
+        items = self._lru.items()
+        ensure_dir(self.persist_path.parent)
+        write_json_atomic(
+            self.persist_path,
+            {
+                "version": _FORMAT_VERSION,
+                "entries": [{"key": list(key), "result": result} for key, result in items],
+            },
+        )
+        self._dirty = False
+
+    def _restore(self, path: Path) -> None:
+        try:
+            data = read_json(path)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+            return
+        for entry in data.get("entries") or []:
+            key = entry.get("key") if isinstance(entry, dict) else None
+            result = entry.get("result") if isinstance(entry, dict) else None
+            if not isinstance(key, list) or len(key) != 5 or not isinstance(result, dict):
+                continue
+            sha256, tool, operation_id, max_depth, max_nodes = key
+            self.put(str(sha256), str(tool), str(operation_id), int(max_depth), int(max_nodes), result)
+        self._dirty = False
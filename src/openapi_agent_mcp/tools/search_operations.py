@@ -1,12 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 from ..errors import ToolError, error_response
+from ..metrics import profiled, timed_tool
+from ..openapi.index import OperationIndex
 from ..openapi.index import search_operations as search_impl
 from ..openapi.store import OpenAPIStore
 
+DEFAULT_MATCH = {"tag": True, "operationId": True, "path": True, "summary": True, "description": True}
 
+
+def _check_limit(limit: int) -> None:
+    if limit <= 0:
+        raise ToolError(code="BAD_INPUT", message="limit must be > 0", details={"limit": limit})
+
+
+@profiled("search_operations")
+def _search(
+    index: OperationIndex, query: str, match: dict[str, bool] | None, method: str | None, limit: int
+) -> list[dict[str, Any]]:
+    return search_impl(
+        operations=index.operations,
+        query=query or "",
+        match=match or DEFAULT_MATCH,
+        method=method,
+        limit=int(limit),
+        search_index=index.search,
+    )
+
+
+@timed_tool("search_operations")
 def search_operations(
     *,
     store: OpenAPIStore,
@@ -16,12 +41,25 @@ def search_operations(
     limit: int = 50,
 ) -> list[dict[str, Any]] | dict[str, Any]:
     try:
-        if limit <= 0:
-            raise ToolError(code="BAD_INPUT", message="limit must be > 0", details={"limit": limit})
-
-        match_map = match or {"tag": True, "operationId": True, "path": True, "summary": True, "description": True}
-        ops = store.operations()
-        return search_impl(operations=ops, query=query or "", match=match_map, method=method, limit=int(limit))
+        _check_limit(limit)
+        _spec, _meta, index = store.load_index()
+        return _search(index, query, match, method, limit)
     except ToolError as e:
         return error_response(e.code, e.message, e.details)
 
+
+@timed_tool("search_operations")
+async def search_operations_async(
+    *,
+    store: OpenAPIStore,
+    query: str = "",
+    match: dict[str, bool] | None = None,
+    method: str | None = None,
+    limit: int = 50,
+) -> list[dict[str, Any]] | dict[str, Any]:
+    try:
+        _check_limit(limit)
+        _spec, _meta, index = await store.load_index_async()
+        return await asyncio.to_thread(_search, index, query, match, method, limit)
+    except ToolError as e:
+        return error_response(e.code, e.message, e.details)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from ..metrics import METRICS
+from ..openapi.store import OpenAPIStore
+from .result_cache import ResultCache
+
+
+def service_stats(store: OpenAPIStore, result_cache: ResultCache | None = None) -> dict[str, Any]:
+    """Snapshot and cache state of one service, without triggering a fetch."""
+    snapshot = store.current_snapshot()
+    return {
+        "baseUrl": store.base_url,
+        "loaded": snapshot is not None,
+        "sha256": snapshot.meta.get("sha256") if snapshot is not None else None,
+        "operations": len(snapshot.index.operations) if snapshot is not None else 0,
+        "derefCache": store.deref_cache.stats(),
+        "resultCache": result_cache.stats() if result_cache is not None else None,
+    }
+
+
+def collect_stats(
+    services: Iterable[tuple[str, OpenAPIStore]],
+    result_caches: dict[str, ResultCache] | None = None,
+) -> dict[str, Any]:
+    """Process-wide metrics plus per-service snapshot and cache state."""
+    caches = result_caches or {}
+    return {
+        "metrics": METRICS.snapshot(),
+        "services": {name: service_stats(store, caches.get(name)) for name, store in services},
+    }
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class SpecServer:
+    """Local stand-in for a FastAPI backend serving `/openapi.json`."""
+
+    def __init__(self, body: bytes, *, etag: str | None = None, last_modified: str | None = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.delay_seconds = 0.0
+        self.chunked = False
+        self.gzip = False
+        self.content_encoding: str | None = None
+        self.redirects: dict[str, str] = {}
+        self.requests: list[dict[str, str]] = []
+        self.proxied: list[str] = []
+        self.statuses: list[int] = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802 - http.server API
+                headers = {k: v for k, v in self.headers.items()}
+                server.requests.append(headers)
+                if server.delay_seconds:
+                    time.sleep(server.delay_seconds)
+                path = self.path
+                if path.startswith("http://"):
+                    # Absolute-form target: this server is acting as a forward proxy.
+                    server.proxied.append(path)
+                    path = urlsplit(path).path
+                if path in server.redirects:
+                    server.statuses.append(307)
+                    self.send_response(307)
+                    self.send_header("Location", server.redirects[path])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if path != "/openapi.json":
+                    self._send(404, b"")
+                    return
+                inm = self.headers.get("If-None-Match")
+                ims = self.headers.get("If-Modified-Since")
+                if (server.etag and inm == server.etag) or (
+                    not server.etag and server.last_modified and ims == server.last_modified
+                ):
+                    self._send(304, b"")
+                    return
+                encoding = server.content_encoding
+                if encoding:
+                    self._send(200, server.body, encoding)
+                    return
+                if server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    encoding = "gzip"
+                self._send(200, gzip.compress(server.body) if encoding else server.body, encoding)
+
+            def _send(self, status: int, body: bytes, encoding: str | None = None) -> None:
+                server.statuses.append(status)
+                self.send_response(status)
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                if server.etag:
+                    self.send_header("ETag", server.etag)
+                if server.last_modified:
+                    self.send_header("Last-Modified", server.last_modified)
+                if status != 304:
+                    self.send_header("Content-Type", "application/json")
+                    if server.chunked:
+                        self.send_header("Transfer-Encoding", "chunked")
+                    else:
+                        self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if status == 304:
+                    return
+                if server.chunked:
+                    for i in range(0, len(body), 1000):
+                        part = body[i : i + 1000]
+                        self.wfile.write(f"{len(part):x}\r\n".encode("ascii") + part + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa: A002 - http.server API
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "SpecServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
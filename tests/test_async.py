@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.fetch import fetch_openapi_spec_async
+from openapi_agent_mcp.openapi.http import AsyncHTTPClient, HTTPStatusError
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from openapi_agent_mcp.tools.get_request_schema import get_request_schema, get_request_schema_async
+from openapi_agent_mcp.tools.search_operations import search_operations, search_operations_async
+from tests.spec_server import SpecServer
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+SYNTHETIC = json.dumps(make_spec(20, 5)).encode("utf-8")
+
+
+def _store(server: SpecServer, cache_dir: str) -> OpenAPIStore:
+    return OpenAPIStore(base_url=server.base_url, cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5)
+
+
+class AsyncHTTPClientTests(unittest.TestCase):
+    def test_keep_alive_reuses_one_connection(self):
+        async def run(url):
+            client = AsyncHTTPClient()
+            bodies = []
+            for _ in range(3):
+                async with client.get(url, timeout=5) as resp:
+                    self.assertEqual(resp.status, 200)
+                    bodies.append(b"".join([c async for c in resp.iter_chunks(4096)]))
+            await client.aclose()
+            return client, bodies
+
+        for chunked in (False, True):
+            with SpecServer(SYNTHETIC) as server:
+                server.chunked = chunked
+                client, bodies = asyncio.run(run(server.base_url + "/openapi.json"))
+            self.assertEqual(bodies, [SYNTHETIC] * 3)
+            self.assertEqual(client.connections_opened, 1, chunked)
+            self.assertEqual(client.requests, 3)
+
+    def test_error_status_raises(self):
+        async def run(base_url, cache_dir):
+            return await fetch_openapi_spec_async(
+                client=AsyncHTTPClient(), base_url=base_url + "/nope", cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5
+            )
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            with self.assertRaises(HTTPStatusError):
+                asyncio.run(run(server.base_url, tmp))
+
+
+class AsyncFetchTests(unittest.TestCase):
+    def test_async_conditional_get_reuses_previous_spec(self):
+        async def run(base_url, cache_dir):
+            client = AsyncHTTPClient()
+            kwargs = dict(client=client, base_url=base_url, cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5)
+            spec1, meta1 = await fetch_openapi_spec_async(**kwargs)
+            spec2, meta2 = await fetch_openapi_spec_async(**kwargs, previous_spec=spec1, previous_meta=meta1)
+            await client.aclose()
+            return spec1, meta1, spec2, meta2
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag='"a"') as server:
+            spec1, meta1, spec2, meta2 = asyncio.run(run(server.base_url, tmp))
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertIs(spec2, spec1)
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+            self.assertTrue((Path(tmp) / "openapi.json").exists())
+
+    def test_async_fetch_follows_redirects(self):
+        async def run(base_url, cache_dir):
+            client = AsyncHTTPClient()
+            try:
+                return await fetch_openapi_spec_async(
+                    client=client, base_url=base_url + "/old", cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5
+                )
+            finally:
+                await client.aclose()
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            server.redirects = {"/old/openapi.json": "/moved", "/moved": server.base_url + "/openapi.json"}
+            spec, _meta = asyncio.run(run(server.base_url, tmp))
+            self.assertEqual(server.statuses, [307, 307, 200])
+            self.assertEqual(spec, json.loads(MINIMAL))
+
+            server.redirects = {"/loop/openapi.json": "/loop/openapi.json"}
+            with self.assertRaises(HTTPStatusError):
+                asyncio.run(run(server.base_url + "/loop", tmp))
+
+    def test_async_fetch_honours_proxy_environment(self):
+        async def run(base_url):
+            client = AsyncHTTPClient()
+            try:
+                async with client.get(base_url + "/openapi.json", timeout=5) as resp:
+                    return resp.status, b"".join([c async for c in resp.iter_chunks()])
+            finally:
+                await client.aclose()
+
+        with SpecServer(MINIMAL) as proxy:
+            env = {"http_proxy": proxy.base_url, "no_proxy": "direct.test"}
+            with mock.patch.dict(os.environ, env):
+                status, body = asyncio.run(run("http://backend.test:8000"))
+            self.assertEqual((status, body), (200, MINIMAL))
+            self.assertEqual(proxy.proxied, ["http://backend.test:8000/openapi.json"])
+
+        with SpecServer(MINIMAL) as server:
+            env = {"http_proxy": "http://127.0.0.1:9", "no_proxy": "127.0.0.1"}
+            with mock.patch.dict(os.environ, env):
+                status, body = asyncio.run(run(server.base_url))
+            self.assertEqual((status, body), (200, MINIMAL))
+            self.assertEqual(server.proxied, [])
+
+    def test_async_store_is_single_flight(self):
+        async def run(store):
+            snaps = await asyncio.gather(*(store.snapshot_async() for _ in range(10)))
+            await store._http.aclose()
+            return snaps
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(SYNTHETIC) as server:
+            server.delay_seconds = 0.1
+            snaps = asyncio.run(run(_store(server, tmp)))
+            self.assertEqual(len(server.requests), 1)
+            self.assertTrue(all(s is snaps[0] for s in snaps))
+
+
+class AsyncToolTests(unittest.TestCase):
+    def test_async_tools_match_sync_tools(self):
+        async def run(store):
+            found = await search_operations_async(store=store, query="invoice", limit=5)
+            schema = await get_request_schema_async(
+                store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000
+            )
+            await store._http.aclose()
+            return found, schema
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(SYNTHETIC) as server:
+            store = _store(server, tmp)
+            found, schema = asyncio.run(run(store))
+            self.assertEqual(schema["method"], "POST")
+            self.assertEqual(found, search_operations(store=store, query="invoice", limit=5))
+            self.assertEqual(
+                schema,
+                get_request_schema(store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000),
+            )
+
+    def test_slow_backend_does_not_block_other_services(self):
+        async def run(slow_store, fast_store):
+            loop = asyncio.get_running_loop()
+            slow = asyncio.create_task(search_operations_async(store=slow_store, query="ping"))
+            await asyncio.sleep(0.05)
+            started = loop.time()
+            fast = await search_operations_async(store=fast_store, query="invoice", limit=1)
+            fast_elapsed = loop.time() - started
+            slow_result = await slow
+            await slow_store._http.aclose()
+            await fast_store._http.aclose()
+            return slow_result, fast, fast_elapsed, slow.done()
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as slow_server, SpecServer(SYNTHETIC) as fast_server:
+            slow_server.delay_seconds = 0.6
+            started = time.monotonic()
+            slow, fast, fast_elapsed, _ = asyncio.run(
+                run(_store(slow_server, tmp + "/slow"), _store(fast_server, tmp + "/fast"))
+            )
+            self.assertEqual(slow[0]["operationId"], "ping")
+            self.assertEqual(len(fast), 1)
+            self.assertLess(fast_elapsed, 0.4)
+            self.assertGreaterEqual(time.monotonic() - started, 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench import memory
+from openapi_agent_mcp.bench.suite import BENCHMARKS, SpecParams, compare_results, main, run_suite
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.index import build_index
+
+
+class SyntheticSpecTests(unittest.TestCase):
+    def test_same_arguments_give_the_same_spec(self):
+        kwargs = dict(depth=4, fan_out=3, cycle_density=0.3, seed=7)
+        self.assertEqual(make_spec(50, 30, **kwargs), make_spec(50, 30, **kwargs))
+        self.assertNotEqual(make_spec(50, 30, **kwargs), make_spec(50, 30, **{**kwargs, "seed": 8}))
+
+    def test_shape_parameters(self):
+        flat = make_spec(10, 20)
+        refs = build_index(flat).refs
+        self.assertFalse(any(refs.is_cyclic(("schemas", f"Model{c}")) for c in range(20)))
+
+        spec = make_spec(10, 20, depth=3, fan_out=3, cycle_density=0.5)
+        model = spec["components"]["schemas"]["Model5"]["properties"]
+        self.assertEqual(model["details"]["properties"]["details"]["properties"]["value"], {"type": "string"})
+        self.assertIn("link2", model)
+        refs = build_index(spec).refs
+        self.assertTrue(any(refs.is_cyclic(("schemas", f"Model{c}")) for c in range(20)))
+
+
+class BenchSuiteTests(unittest.TestCase):
+    def test_run_suite_reports_every_benchmark(self):
+        report = run_suite(SpecParams(operations=40, components=10), repeat=2, sample=5)
+        self.assertEqual(list(report["results"]), list(BENCHMARKS))
+        self.assertEqual(report["results"]["lookup"]["items"], 5)
+        self.assertEqual(report["spec"]["operations"], 40)
+        json.dumps(report)
+
+        rows = compare_results(report, report)
+        self.assertEqual({row["ratio"] for row in rows}, {1.0})
+
+    def test_cold_start_benchmarks_remove_their_cache_dirs(self):
+        left: dict[str, list[Path]] = {}
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(tempfile, "tempdir", tmp):
+            run_suite(
+                SpecParams(operations=20, components=5),
+                repeat=1,
+                sample=5,
+                only=["cold_start"],
+                progress=lambda name, _result: left.setdefault(name, list(Path(tmp).iterdir())),
+            )
+        self.assertEqual(left, {"cold_start.json": [], "cold_start.snapshot": []})
+
+    @unittest.skipUnless(memory.supported(), "needs /proc for RSS")
+    def test_memory_report_covers_both_loading_modes(self):
+        report = run_suite(SpecParams(operations=40, components=10), repeat=1, sample=5, only=["parse"], measure_memory=True)
+        self.assertEqual(list(report["memory"]["rssGrowth"]), ["eager", "lazy"])
+        for growth in report["memory"]["rssGrowth"].values():
+            self.assertEqual(sorted(growth), ["peak", "steady"])
+            self.assertTrue(all(isinstance(kb, int) for kb in growth.values()))
+
+    def test_cli_writes_results_and_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = Path(tmp) / "base.json"
+            args = ["--operations", "40", "--components", "10", "--repeat", "1", "--sample", "5", "--only", "search"]
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as done:
+                main([*args, "--out", str(baseline)])
+            self.assertEqual(done.exception.code, 0)
+
+            report = json.loads(baseline.read_text(encoding="utf-8"))
+            self.assertEqual(list(report["results"]), ["search", "search.linear"])
+            report["results"]["search"]["median"] /= 1000
+            baseline.write_text(json.dumps(report), encoding="utf-8")
+
+            with redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit) as done:
+                main([*args, "--out", str(Path(tmp) / "new.json"), "--compare", str(baseline), "--max-ratio", "2"])
+            self.assertEqual(done.exception.code, 1)
+            self.assertIn("REGRESSION", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import io
+import json
+import os
+from pathlib import Path
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp import cli, daemon
+from openapi_agent_mcp.metrics import PROFILER
+from tests.spec_server import SpecServer
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+
+
+def _run(argv):
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            cli.main(argv)
+        except SystemExit as e:
+            rc = e.code
+    return rc, out.getvalue(), err.getvalue()
+
+
+@unittest.skipUnless(daemon.supported(), "needs Unix domain sockets")
+class DaemonTests(unittest.TestCase):
+    def test_commands_route_through_a_running_daemon_and_fall_back_without_one(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag='"v1"') as server:
+            base = ["--base-url", server.base_url, "--cache-dir", tmp]
+            path = cli._daemon_socket(cli.build_parser().parse_args([*base, "fetch"]))
+            # Not through _run: sys.stdout redirection is process-wide.
+            serve_args = cli.build_parser().parse_args([*base, "daemon"])
+            thread = threading.Thread(target=cli.cmd_daemon, args=(serve_args,), daemon=True)
+            thread.start()
+            for _ in range(200):
+                if daemon.request(path, {"op": "ping"}) is not None:
+                    break
+                threading.Event().wait(0.02)
+
+            rc, out, _err = _run([*base, "search", "--query", "ping"])
+            self.assertEqual(rc, 0)
+            self.assertEqual(json.loads(out)[0]["operationId"], "ping")
+            rc, out, _err = _run([*base, "schema", "request", "--operation-id", "missing"])
+            self.assertEqual(json.loads(out)["error"]["code"], "OPERATION_NOT_FOUND")
+            for _ in range(2):
+                rc, out, _err = _run([*base, "schema", "response", "--operation-id", "ping"])
+                self.assertIn("responses", json.loads(out))
+
+            rc, out, _err = _run([*base, "daemon", "--status"])
+            status = json.loads(out)
+            self.assertEqual(status["served"], 4)
+            self.assertEqual(status["services"]["default"]["operations"], 1)
+            self.assertEqual(status["services"]["default"]["resultCache"]["hits"], 1)
+            # One initial download; every forwarded command only revalidated.
+            self.assertEqual(server.statuses, [200, 304, 304, 304, 304])
+
+            rc, out, _err = _run([*base, "--no-daemon", "search", "--query", "ping"])
+            self.assertEqual(json.loads(out)[0]["operationId"], "ping")
+            rc, out, _err = _run([*base, "index", "--format", "ndjson"])
+            self.assertEqual(json.loads(out.splitlines()[0])["operationId"], "ping")
+            self.assertEqual(json.loads(_run([*base, "daemon", "--status"])[1])["served"], 4)
+
+            rc, out, _err = _run([*base, "--profile-slow-ms", "0.0001", "search", "--query", "ping"])
+            self.assertEqual(json.loads(out)[0]["operationId"], "ping")
+            self.assertEqual(json.loads(_run([*base, "daemon", "--status"])[1])["served"], 5)
+            self.assertEqual(len(list((Path(tmp) / "profiles").glob("*search_operations*.prof"))), 1)
+            self.assertFalse(PROFILER.enabled)
+
+            rc, _out, _err = _run([*base, "daemon", "--stop"])
+            self.assertEqual(rc, 0)
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(path.exists())
+
+            rc, out, _err = _run([*base, "search", "--query", "ping"])
+            self.assertEqual(json.loads(out)[0]["operationId"], "ping")
+            rc, _out, err = _run([*base, "daemon", "--status"])
+            self.assertEqual(rc, 1)
+            self.assertIn("not running", err)
+
+    def test_other_store_options_get_their_own_socket(self):
+        parser = cli.build_parser()
+        plain = parser.parse_args(["--base-url", "http://a", "fetch"])
+        lazy = parser.parse_args(["--base-url", "http://a", "--lazy-spec", "fetch"])
+        tuned = parser.parse_args(["--base-url", "http://a", "--deref-max-depth", "3", "fetch"])
+        self.assertNotEqual(cli._daemon_socket(plain), cli._daemon_socket(lazy))
+        self.assertEqual(cli._daemon_socket(plain), cli._daemon_socket(tuned))
+
+    def test_stale_socket_file_is_replaced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "d.sock"
+            path.write_bytes(b"")
+            self.assertIsNone(daemon.request(path, {"op": "ping"}))
+
+            served = []
+            thread = threading.Thread(
+                target=lambda: served.append(daemon.serve(path, lambda m: {"echo": m.get("op")})), daemon=True
+            )
+            thread.start()
+            for _ in range(200):
+                if daemon.request(path, {"op": "ping"}) is not None:
+                    break
+                threading.Event().wait(0.02)
+            self.assertEqual(daemon.request(path, {"op": "hello"})["echo"], "hello")
+            self.assertEqual(daemon.request(path, {"op": "stop"})["stopped"], True)
+            thread.join(timeout=5)
+            self.assertEqual(served, [3])
+
+    def _serve(self, path):
+        thread = threading.Thread(target=daemon.serve, args=(path, lambda m: {"echo": m.get("op")}), daemon=True)
+        thread.start()
+        for _ in range(200):
+            if daemon.request(path, {"op": "ping"}) is not None:
+                break
+            threading.Event().wait(0.02)
+        return thread
+
+    def test_stalled_client_does_not_block_others(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "d.sock"
+            thread = self._serve(path)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+                stalled.connect(str(path))
+                # Answered while the first connection is still waiting for its request line.
+                reply = daemon.request(path, {"op": "hello"}, timeout=daemon.READ_TIMEOUT_SECONDS / 2)
+                self.assertEqual(reply["echo"], "hello")
+            daemon.request(path, {"op": "stop"})
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+
+    def test_sockets_other_users_could_plant_are_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "private" / "d.sock"
+            thread = self._serve(path)
+            self.assertEqual(stat.S_IMODE(path.parent.stat().st_mode), 0o700)
+            self.assertIsNotNone(daemon.request(path, {"op": "ping"}))
+
+            os.chmod(path, 0o666)
+            self.assertIsNone(daemon.request(path, {"op": "ping"}))
+            os.chmod(path, 0o600)
+            os.chmod(path.parent, 0o777)
+            self.assertIsNone(daemon.request(path, {"op": "ping"}))
+            with self.assertRaises(RuntimeError):
+                daemon.serve(path.parent / "other.sock", lambda m: {})
+            os.chmod(path.parent, 0o700)
+
+            daemon.request(path, {"op": "stop"})
+            thread.join(timeout=5)
+
+    def test_long_paths_fall_back_to_a_per_user_temp_dir(self):
+        path = daemon.socket_path(Path("/" + "x" * 120), {"k": 1})
+        self.assertEqual(path.parent.name, f"openapi-agent-mcp-{os.getuid()}")
+        self.assertEqual(path.suffix, ".sock")
+
+
+if __name__ == "__main__":
+    unittest.main()
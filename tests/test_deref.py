@@ -5,7 +5,46 @@ import unittest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from openapi_agent_mcp.openapi.deref import deref_schema
+from openapi_agent_mcp.bench.baselines import recursive_deref
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.deref import DerefCache, deref_schema
+from openapi_agent_mcp.openapi.refgraph import RefGraph
+
+
+def _wide_spec():
+    spec = make_spec(1, 0)
+    schemas = spec["components"]["schemas"]
+    for i in range(60):
+        schemas[f"Leaf{i}"] = {
+            "type": "object",
+            "properties": {f"f{j}": {"type": "string", "maxLength": j, "examples": ["a", "b"]} for j in range(15)},
+        }
+    schemas["Wide"] = {
+        "type": "object",
+        "properties": {f"p{i}": {"$ref": f"#/components/schemas/Leaf{i}"} for i in range(60)}
+        | {"meta": {"type": "object", "properties": {f"m{j}": {"type": "integer"} for j in range(200)}}},
+    }
+    return spec, {"$ref": "#/components/schemas/Wide"}
+
+
+def _deep_spec():
+    spec = make_spec(1, 100)
+    return spec, {"$ref": "#/components/schemas/Model99"}
+
+
+def _cyclic_spec():
+    spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+    schemas = spec["components"]["schemas"]
+    for i in range(40):
+        schemas[f"Node{i}"] = {
+            "type": "object",
+            "properties": {
+                "next": {"$ref": f"#/components/schemas/Node{(i + 1) % 40}"},
+                "owner": {"$ref": "#/components/schemas/User"},
+                "tags": {"type": "array", "items": {"type": "string", "enum": ["x", "y", "z"]}},
+            },
+        }
+    return spec, {"$ref": "#/components/schemas/Node0"}
 
 
 class DerefTests(unittest.TestCase):
@@ -20,5 +59,133 @@ class DerefTests(unittest.TestCase):
         self.assertEqual(res.schema["properties"]["manager"]["$ref"], "#/components/schemas/User")
 
 
+class DerefCacheTests(unittest.TestCase):
+    def _mixed_spec(self):
+        spec = make_spec(10, 12)
+        cycle = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        schemas = spec["components"]["schemas"]
+        schemas["User"] = cycle["components"]["schemas"]["User"]
+        schemas["Team"] = {
+            "type": "object",
+            "properties": {
+                "lead": {"$ref": "#/components/schemas/User"},
+                "model": {"$ref": "#/components/schemas/Model5", "description": "sibling keys are merged"},
+                "errors": {"$ref": "#/components/schemas/HTTPValidationError"},
+            },
+        }
+        return spec
+
+    def test_cached_results_match_uncached_across_budgets(self):
+        spec = self._mixed_spec()
+        cache = DerefCache()
+        roots = [{"$ref": f"#/components/schemas/{name}"} for name in spec["components"]["schemas"]]
+        for max_depth, max_nodes in [(20, 20000), (6, 20000), (20, 40), (3, 15), (50, 100000)]:
+            for _ in range(2):
+                for root in roots:
+                    expected = deref_schema(root, spec=spec, max_depth=max_depth, max_nodes=max_nodes)
+                    got = deref_schema(
+                        root, spec=spec, max_depth=max_depth, max_nodes=max_nodes, cache=cache, spec_hash="h1"
+                    )
+                    self.assertEqual(got, expected, (root, max_depth, max_nodes))
+        stats = cache.stats()
+        self.assertGreater(stats["hits"], 0)
+        self.assertGreater(stats["misses"], 0)
+
+    def test_cycles_are_not_cached(self):
+        spec = self._mixed_spec()
+        cache = DerefCache()
+        schema = {"$ref": "#/components/schemas/User"}
+        first = deref_schema(schema, spec=spec, max_depth=20, max_nodes=20000, cache=cache, spec_hash="h1")
+        second = deref_schema(schema, spec=spec, max_depth=20, max_nodes=20000, cache=cache, spec_hash="h1")
+        self.assertTrue(first.kept_ref)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_is_bounded(self):
+        spec = make_spec(1, 30)
+        cache = DerefCache(max_entries=5)
+        deref_schema({"$ref": "#/components/schemas/Model29"}, spec=spec, max_depth=100, max_nodes=100000, cache=cache, spec_hash="h1")
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 5)
+        self.assertGreater(stats["evictions"], 0)
+
+
+class RefGraphDerefTests(unittest.TestCase):
+    def _spec(self):
+        spec = DerefCacheTests()._mixed_spec()
+        schemas = spec["components"]["schemas"]
+        schemas["A"] = {"type": "object", "properties": {"b": {"$ref": "#/components/schemas/B"}}}
+        schemas["B"] = {"type": "array", "items": {"$ref": "#/components/schemas/C"}}
+        schemas["C"] = {"allOf": [{"$ref": "#/components/schemas/A"}, {"$ref": "#/components/schemas/Model2"}]}
+        schemas["IntoCycle"] = {"properties": {"c": {"$ref": "#/components/schemas/C"}, "n": {"type": "null"}}}
+        schemas["Alias"] = {"$ref": "#/components/schemas/Model3", "title": "alias"}
+        schemas["Deep"] = {"properties": {"x": {"$ref": "#/components/schemas/Team/properties/model"}}}
+        schemas["NonStringRef"] = {"$ref": 5, "type": "integer"}
+        spec["components"]["parameters"] = {"Limit": {"schema": {"$ref": "#/components/schemas/Alias"}}}
+        return spec
+
+    def test_graph_short_cuts_give_identical_output(self):
+        spec = self._spec()
+        graph = RefGraph(spec)
+        roots = [{"$ref": f"#/components/schemas/{name}"} for name in spec["components"]["schemas"]]
+        roots.append({"type": "object", "properties": {"p": {"$ref": "#/components/parameters/Limit"}}})
+        budgets = [(20, 20000), (6, 20000), (3, 15)] + [(d, n) for d in range(0, 8) for n in range(1, 40, 3)]
+        cache = DerefCache()
+        for max_depth, max_nodes in budgets:
+            for root in roots:
+                expected = deref_schema(root, spec=spec, max_depth=max_depth, max_nodes=max_nodes)
+                got = deref_schema(root, spec=spec, max_depth=max_depth, max_nodes=max_nodes, graph=graph)
+                self.assertEqual(got, expected, (root, max_depth, max_nodes))
+                cached = deref_schema(
+                    root, spec=spec, max_depth=max_depth, max_nodes=max_nodes, graph=graph, cache=cache, spec_hash="h"
+                )
+                self.assertEqual(cached, expected, (root, max_depth, max_nodes))
+
+
+class IterativeDerefTests(unittest.TestCase):
+    def test_matches_recursive_deref(self):
+        spec = RefGraphDerefTests()._spec()
+        graph = RefGraph(spec)
+        roots = [{"$ref": f"#/components/schemas/{name}"} for name in spec["components"]["schemas"]]
+        roots.append({"type": "object", "properties": {"p": {"$ref": "#/components/parameters/Limit"}}})
+        roots.append([{"$ref": "#/components/schemas/Model4"}, {"type": "string"}, []])
+        budgets = [(20, 20000)] + [(d, n) for d in range(0, 8) for n in range(1, 40, 3)]
+        for max_depth, max_nodes in budgets:
+            for root in roots:
+                expected = recursive_deref(root, spec=spec, max_depth=max_depth, max_nodes=max_nodes)
+                got = deref_schema(root, spec=spec, max_depth=max_depth, max_nodes=max_nodes, graph=graph)
+                self.assertEqual(got, expected, (root, max_depth, max_nodes))
+
+    def test_large_fixtures_match_recursive_deref(self):
+        budget = {"max_depth": 800, "max_nodes": 200_000}
+        for name, (spec, root) in {"wide": _wide_spec(), "deep": _deep_spec(), "cyclic": _cyclic_spec()}.items():
+            expected = recursive_deref(root, spec=spec, **budget)
+            self.assertEqual(deref_schema(root, spec=spec, **budget), expected, name)
+            self.assertEqual(deref_schema(root, spec=spec, graph=RefGraph(spec), **budget), expected, name)
+
+    def test_depth_is_not_bounded_by_the_recursion_limit(self):
+        spec = make_spec(1, sys.getrecursionlimit() + 200)
+        name = f"Model{sys.getrecursionlimit() + 199}"
+        res = deref_schema({"$ref": f"#/components/schemas/{name}"}, spec=spec, max_depth=100_000, max_nodes=1_000_000)
+        self.assertFalse(res.kept_ref)
+        depth, node = 0, res.schema
+        while "parent" in node["properties"]:
+            node, depth = node["properties"]["parent"], depth + 1
+        self.assertEqual(depth, sys.getrecursionlimit() + 199)
+
+    def test_ref_free_subtrees_are_shared_unless_copy_requested(self):
+        spec, root = _wide_spec()
+        leaf = spec["components"]["schemas"]["Leaf3"]
+        shared = deref_schema(root, spec=spec, max_depth=20, max_nodes=20000)
+        self.assertIs(shared.schema["properties"]["p3"], leaf)
+        self.assertIs(shared.schema["properties"]["meta"], spec["components"]["schemas"]["Wide"]["properties"]["meta"])
+
+        private = deref_schema(root, spec=spec, max_depth=20, max_nodes=20000, share=False)
+        self.assertEqual(private, shared)
+        self.assertIsNot(private.schema["properties"]["p3"], leaf)
+        private.schema["properties"]["p3"]["properties"]["f0"]["examples"].append("c")
+        self.assertEqual(leaf["properties"]["f0"]["examples"], ["a", "b"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,122 @@
+import io
+import json
+from pathlib import Path
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp import cli
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.openapi.lazy import load_lazy_spec
+from openapi_agent_mcp.tools.dump_all import MANIFEST_FILE, dump_all_schemas, operation_filename
+from openapi_agent_mcp.tools.export_index import iter_index_records, write_ndjson
+from tests.spec_server import SpecServer
+
+
+class ExportIndexTests(unittest.TestCase):
+    def test_ndjson_has_every_operation_without_a_limit(self):
+        spec = make_spec(10_050, 5)
+        index = build_index(spec)
+        records = iter_index_records(spec=spec, meta={"sha256": "h"}, index=index)
+        self.assertIsInstance(records, types.GeneratorType)
+
+        out = io.StringIO()
+        self.assertEqual(write_ndjson(records, out), 10_050)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 10_050)
+        self.assertNotIn(": ", lines[0])
+        self.assertEqual(json.loads(lines[-1])["operationId"], "create_order_v251_10049")
+
+    def test_records_with_schemas_are_self_contained(self):
+        spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        spec["paths"]["/users2/{id}"] = {"get": dict(spec["paths"]["/users/{id}"]["get"])}
+        spec["paths"]["/users3/{id}"] = {"get": dict(spec["paths"]["/users/{id}"]["get"], operationId="get_user3")}
+        index = build_index(spec)
+        records = list(iter_index_records(spec=spec, meta={"sha256": "h"}, index=index, with_schemas=True))
+
+        self.assertEqual([r["operationId"] for r in records], ["get_user", "get_user", "get_user3"])
+        self.assertEqual(records[0]["error"]["code"], "OPERATION_NOT_UNIQUE")
+        self.assertIn("User", records[2]["components"]["schemas"])
+        self.assertIn("200", records[2]["responses"])
+
+    def test_cli_writes_ndjson_file(self):
+        body = json.dumps(make_spec(30, 3)).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(body) as server:
+            out = Path(tmp) / "out" / "index.ndjson"
+            argv = ["--base-url", server.base_url, "--cache-dir", tmp, "--no-disk-snapshot"]
+            with self.assertRaises(SystemExit) as exit_:
+                cli.main(argv + ["index", "--format", "ndjson", "--with-schemas", "--out", str(out)])
+            self.assertEqual(exit_.exception.code, 0)
+            records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([r["operationId"] for r in records][:2], ["get_user_v0_0", "get_order_v0_1"])
+            self.assertEqual(len(records), 30)
+            self.assertIn("params", records[0])
+            self.assertEqual(list(out.parent.iterdir()), [out])
+
+
+class DumpAllTests(unittest.TestCase):
+    def _spec(self):
+        spec = make_spec(60, 8)
+        spec["paths"]["/odd"] = {"get": {"operationId": "odd/id", "responses": {"204": {"description": "none"}}}}
+        spec["paths"]["/broken"] = {"get": {"operationId": "broken"}}
+        return spec
+
+    def test_pool_output_matches_sequential_ndjson(self):
+        spec = self._spec()
+        index = build_index(spec)
+        budget = {"deref_max_depth": 20, "deref_max_nodes": 20000}
+        expected = io.StringIO()
+        write_ndjson(iter_index_records(spec=spec, meta={}, index=index, with_schemas=True, **budget), expected)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            seen = []
+            out = Path(tmp) / "all.ndjson"
+            summary = dump_all_schemas(
+                spec=spec, meta={"sha256": "h"}, index=index, out=out, workers=2, progress=lambda d, t: seen.append((d, t)), **budget
+            )
+            self.assertEqual(out.read_text(encoding="utf-8"), expected.getvalue())
+            self.assertEqual(summary["workers"], 2)
+            self.assertEqual(summary["errors"], {"broken": "RESPONSES_MISSING"})
+            self.assertEqual(seen[-1], (62, 62))
+
+    def test_pool_accepts_a_lazy_spec(self):
+        spec = self._spec()
+        budget = {"deref_max_depth": 20, "deref_max_nodes": 20000}
+        expected = io.StringIO()
+        write_ndjson(iter_index_records(spec=spec, meta={}, index=build_index(spec), with_schemas=True, **budget), expected)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "openapi.json"
+            path.write_bytes(json.dumps(spec).encode("utf-8"))
+            lazy = load_lazy_spec(path)
+            out = Path(tmp) / "all.ndjson"
+            summary = dump_all_schemas(spec=lazy, meta={"sha256": "h"}, index=build_index(lazy), out=out, workers=2, **budget)
+            self.assertEqual(out.read_text(encoding="utf-8"), expected.getvalue())
+            self.assertEqual(summary["workers"], 2)
+
+    def test_per_operation_files_and_manifest(self):
+        spec = self._spec()
+        index = build_index(spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp) / "schemas"
+            summary = dump_all_schemas(
+                spec=spec, meta={"sha256": "h"}, index=index, out_dir=out_dir, workers=1, deref_max_depth=20, deref_max_nodes=20000
+            )
+            manifest = json.loads((out_dir / MANIFEST_FILE).read_text(encoding="utf-8"))
+            self.assertEqual(summary["written"], 61)
+            self.assertEqual(manifest["errors"], {"broken": "RESPONSES_MISSING"})
+            name = manifest["operations"]["odd/id"]
+            self.assertEqual(name, operation_filename("odd/id"))
+            self.assertTrue(name.startswith("odd_id-"))
+            record = json.loads((out_dir / manifest["operations"]["create_user_v0_8"]).read_text(encoding="utf-8"))
+            self.assertEqual(record["method"], "POST")
+            self.assertIn("body", record)
+            self.assertEqual(len(list(out_dir.iterdir())), 62)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi import fetch as fetch_mod
+from openapi_agent_mcp.openapi import store as store_mod
+from openapi_agent_mcp.openapi.cache import read_json
+from openapi_agent_mcp.openapi.fetch import fetch_openapi_spec, fetch_openapi_spec_async
+from openapi_agent_mcp.openapi.http import AsyncHTTPClient
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from tests.spec_server import SpecServer
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+
+
+class ConditionalFetchTests(unittest.TestCase):
+    def _store(self, server: SpecServer, cache_dir: str, **kwargs) -> OpenAPIStore:
+        kwargs.setdefault("cache_ttl_seconds", 0)
+        return OpenAPIStore(base_url=server.base_url, cache_dir=Path(cache_dir), timeout_seconds=5, **kwargs)
+
+    def test_etag_304_reuses_in_memory_spec_without_disk_writes(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag='"v1"') as server:
+            store = self._store(server, tmp)
+            spec1, meta1 = store.load()
+            self.assertEqual(meta1["etag"], '"v1"')
+            self.assertEqual(read_json(Path(tmp) / "openapi.meta.json")["etag"], '"v1"')
+
+            with mock.patch.object(fetch_mod, "replace_atomic") as wb, mock.patch.object(
+                fetch_mod, "write_json_atomic"
+            ) as wj, mock.patch.object(json, "loads") as loads:
+                spec2, meta2 = store.load()
+
+            self.assertIs(spec2, spec1)
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertEqual(server.requests[1].get("If-None-Match"), '"v1"')
+            wb.assert_not_called()
+            wj.assert_not_called()
+            loads.assert_not_called()
+
+    def test_revalidation_with_ttl_persists_refreshed_meta(self):
+        for etag in ('"v1"', None):
+            with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag=etag) as server:
+                store = self._store(server, tmp, cache_ttl_seconds=10)
+                _spec, meta1 = store.load()
+                with mock.patch("time.time", return_value=meta1["fetched_at"] + 100):
+                    _spec, meta2 = store.load()
+
+                self.assertEqual(server.statuses, [200, 304 if etag else 200])
+                on_disk = read_json(Path(tmp) / "openapi.meta.json")
+                self.assertEqual(on_disk, meta2)
+                self.assertEqual(on_disk["fetched_at"], meta1["fetched_at"] + 100)
+                self.assertEqual(on_disk.get("etag"), etag)
+
+    def test_last_modified_304_on_cold_start_reads_cached_file(self):
+        lm = "Wed, 21 Oct 2015 07:28:00 GMT"
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, last_modified=lm) as server:
+            _spec, meta1 = self._store(server, tmp).load()
+            spec2, meta2 = self._store(server, tmp).load()
+
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertEqual(server.requests[1].get("If-Modified-Since"), lm)
+            self.assertIn("/ping", spec2["paths"])
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+
+    def test_revalidate_disabled_sends_no_validators(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag='"v1"') as server:
+            store = self._store(server, tmp, revalidate=False)
+            store.load()
+            store.load()
+            self.assertEqual(server.statuses, [200, 200])
+            self.assertNotIn("If-None-Match", server.requests[1])
+
+
+class CompressedFetchTests(unittest.TestCase):
+    BODY = json.dumps(make_spec(300, 30)).encode("utf-8")
+
+    def _fetch(self, base_url: str, cache_dir: str, **kwargs):
+        return fetch_openapi_spec(base_url=base_url, cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5, **kwargs)
+
+    def _assert_decoded_cache(self, cache_dir: str, meta: dict) -> None:
+        self.assertEqual(meta["sha256"], hashlib.sha256(self.BODY).hexdigest())
+        self.assertEqual(meta["size_bytes"], len(self.BODY))
+        self.assertEqual((Path(cache_dir) / "openapi.json").read_bytes(), self.BODY)
+        self.assertEqual(list(Path(cache_dir).glob("*.part")), [])
+
+    def test_gzip_body_is_decoded_and_hashed_canonically(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            server.gzip = True
+            spec, meta = self._fetch(server.base_url, tmp)
+
+            self.assertIn("gzip", server.requests[0].get("Accept-Encoding", ""))
+            self.assertEqual(spec, json.loads(self.BODY))
+            self.assertEqual(meta["content_encoding"], "gzip")
+            self.assertLess(meta["transfer_bytes"], len(self.BODY) // 5)
+            self._assert_decoded_cache(tmp, meta)
+
+    def test_async_gzip_chunked_body(self):
+        async def run(base_url, cache_dir):
+            client = AsyncHTTPClient()
+            try:
+                return await fetch_openapi_spec_async(
+                    client=client, base_url=base_url, cache_dir=Path(cache_dir), cache_ttl_seconds=0, timeout_seconds=5
+                )
+            finally:
+                await client.aclose()
+
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            server.gzip = True
+            server.chunked = True
+            spec, meta = asyncio.run(run(server.base_url, tmp))
+            self.assertEqual(spec, json.loads(self.BODY))
+            self._assert_decoded_cache(tmp, meta)
+
+    def test_sha256_does_not_depend_on_transfer_encoding(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            spec1, meta1 = self._fetch(server.base_url, tmp)
+            server.gzip = True
+            with mock.patch.object(fetch_mod, "replace_atomic") as replace:
+                spec2, meta2 = self._fetch(server.base_url, tmp, previous_spec=spec1, previous_meta=meta1)
+
+            self.assertIs(spec2, spec1)
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+            replace.assert_not_called()
+            self.assertEqual(list(Path(tmp).glob("*.part")), [])
+
+    def test_truncated_gzip_keeps_previous_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            _spec, meta1 = self._fetch(server.base_url, tmp)
+            server.body = gzip.compress(self.BODY)[:-40]
+            server.content_encoding = "gzip"
+            with self.assertRaises(ValueError):
+                self._fetch(server.base_url, tmp)
+
+            self.assertEqual((Path(tmp) / "openapi.json").read_bytes(), MINIMAL)
+            self.assertEqual(read_json(Path(tmp) / "openapi.meta.json")["sha256"], meta1["sha256"])
+            self.assertEqual(list(Path(tmp).glob("*.part")), [])
+
+
+class SameHashReloadBenchmark(unittest.TestCase):
+    def test_same_hash_reload_skips_parse_writes_and_reindex(self):
+        body = json.dumps(make_spec(2000, 200)).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(body) as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            spec1, meta1 = store.load()
+            ops1 = store.operations()
+
+            with mock.patch.object(fetch_mod, "replace_atomic") as wb, mock.patch.object(
+                fetch_mod, "write_json_atomic"
+            ) as wj, mock.patch.object(json, "loads", wraps=json.loads) as loads, mock.patch.object(
+                store_mod, "build_index", wraps=store_mod.build_index
+            ) as build:
+                for _ in range(5):
+                    spec2, meta2 = store.load()
+
+            self.assertEqual(set(server.statuses), {200})
+            self.assertIs(spec2, spec1)
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+            self.assertEqual(store.operations(), ops1)
+            self.assertEqual(loads.call_count, 0)
+            # TTL 0 and unchanged validators: nothing touches disk.
+            self.assertEqual(wb.call_count + wj.call_count, 0)
+            self.assertEqual(build.call_count, 0)
+
+    def test_changed_hash_reparses_and_rewrites(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            _spec, meta1 = store.load()
+            server.body = json.dumps(make_spec(3, 1)).encode("utf-8")
+            spec2, meta2 = store.load()
+
+            self.assertNotEqual(meta2["sha256"], meta1["sha256"])
+            self.assertEqual(read_json(Path(tmp) / "openapi.meta.json")["sha256"], meta2["sha256"])
+            self.assertEqual(len(store.operations()), 3)
+            self.assertNotIn("/ping", spec2["paths"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.errors import ToolError
+from openapi_agent_mcp.openapi.index import build_index, build_operations
+from openapi_agent_mcp.openapi.deref import deref_schema
+from openapi_agent_mcp.openapi.lookup import find_operation, lookup_operation, operation_cost
+
+
+def _duplicate_spec():
+    spec = json.loads(Path("tests/fixtures/openapi_minimal.json").read_text(encoding="utf-8"))
+    spec["paths"]["/ping2"] = {"post": dict(spec["paths"]["/ping"]["get"])}
+    return spec
+
+
+class OperationIndexTests(unittest.TestCase):
+    def test_lookup_matches_linear_scan(self):
+        spec = make_spec(200, 10)
+        index = build_index(spec)
+        for op_id in ("get_user_v0_0", "create_order_v0_9", "list_shipment_v4_199"):
+            method, path, op, path_item = lookup_operation(index, op_id)
+            expected = find_operation(spec, op_id)
+            self.assertEqual((method, path), expected[:2])
+            self.assertIs(op, expected[2])
+            self.assertIs(path_item, expected[3])
+
+    def test_lookup_not_found(self):
+        index = build_index(make_spec(3, 1))
+        with self.assertRaises(ToolError) as ctx:
+            lookup_operation(index, "missing")
+        self.assertEqual(ctx.exception.code, "OPERATION_NOT_FOUND")
+
+    def test_duplicate_ids_are_recorded_not_fatal(self):
+        index = build_index(_duplicate_spec())
+        self.assertEqual(len(index.operations), 2)
+        self.assertEqual(
+            index.duplicates["ping"], [{"method": "GET", "path": "/ping"}, {"method": "POST", "path": "/ping2"}]
+        )
+        with self.assertRaises(ToolError) as ctx:
+            lookup_operation(index, "ping")
+        self.assertEqual(ctx.exception.code, "OPERATION_NOT_UNIQUE")
+        self.assertEqual(ctx.exception.details["matches"], index.duplicates["ping"])
+
+    def test_build_operations_still_rejects_duplicates(self):
+        with self.assertRaises(ValueError):
+            build_operations(_duplicate_spec())
+
+
+class OperationCostTests(unittest.TestCase):
+    def test_cost_is_the_exact_deref_budget(self):
+        spec = make_spec(40, 12)
+        index = build_index(spec)
+        cost = operation_cost(index, "create_user_v0_8")
+        self.assertEqual((cost["method"], cost["path"]), ("POST", "/api/v0/user/{item_id}/create"))
+        self.assertIsNotNone(cost["request"])
+
+        schema = spec["paths"]["/api/v0/user/{item_id}/create"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+        nodes = cost["responses"]["200"]["nodes"]
+        full = deref_schema(schema, spec=spec, max_depth=1000, max_nodes=100000)
+        self.assertEqual(deref_schema(schema, spec=spec, max_depth=1000, max_nodes=nodes), full)
+
+    def test_cycles_have_no_bounded_cost(self):
+        spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        cost = operation_cost(build_index(spec), "get_user")
+        self.assertEqual(cost["request"], {"nodes": 2, "maxDepth": 1})
+        self.assertEqual(cost["responses"], {"200": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
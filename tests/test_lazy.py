@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.openapi.lazy import LazyJSONObject, load_lazy_spec
+from openapi_agent_mcp.openapi.lookup import lookup_operation
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from openapi_agent_mcp.tools.get_request_schema import build_request_schema
+from openapi_agent_mcp.tools.get_response_schema import build_response_schema
+from tests.spec_server import SpecServer
+
+
+def _unicode_spec() -> dict:
+    spec = make_spec(40, 10)
+    for i, path_item in enumerate(spec["paths"].values()):
+        for op in path_item.values():
+            op["summary"] = f"Überprüfen {i} — 注文 ✓"
+    spec["components"]["schemas"]["Model3"]["description"] = "Größe 📦"
+    spec["components"]["parameters"] = {"Verbose": {"name": "verbose", "in": "query", "schema": {"type": "boolean"}}}
+    spec["x-note"] = "café"
+    return spec
+
+
+class LazySpecTests(unittest.TestCase):
+    def _write(self, tmp: str, data: bytes) -> Path:
+        path = Path(tmp) / "openapi.json"
+        path.write_bytes(data)
+        return path
+
+    def test_matches_eager_parse_with_non_ascii_and_bom(self):
+        spec = _unicode_spec()
+        for data in (
+            json.dumps(spec, ensure_ascii=False, indent=2).encode("utf-8"),
+            b"\xef\xbb\xbf" + json.dumps(spec, ensure_ascii=False).encode("utf-8"),
+        ):
+            with tempfile.TemporaryDirectory() as tmp:
+                lazy = load_lazy_spec(self._write(tmp, data))
+                self.assertEqual(lazy["components"]["schemas"]["Model3"], spec["components"]["schemas"]["Model3"])
+                self.assertEqual(lazy["x-note"], "café")
+                self.assertEqual(lazy.to_dict(), spec)
+
+    def test_only_accessed_entries_are_materialized(self):
+        spec = make_spec(100, 20)
+        with tempfile.TemporaryDirectory() as tmp:
+            lazy = load_lazy_spec(self._write(tmp, json.dumps(spec).encode("utf-8")))
+            self.assertIsInstance(lazy["paths"], LazyJSONObject)
+            self.assertEqual(lazy["paths"].stats()["materialized"], 0)
+
+            index = build_index(lazy)
+            self.assertEqual(index.operations, build_index(spec).operations)
+            self.assertEqual(lazy["paths"].stats()["materialized"], 0)
+
+            method, path, op, _path_item = lookup_operation(index, "create_user_v0_8")
+            self.assertEqual((method, op), ("POST", spec["paths"][path]["post"]))
+            self.assertEqual(lazy["paths"].stats(), {"members": 100, "materialized": 1})
+
+    def test_malformed_document_raises_value_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for data in (b'{"paths": {"/a": {"get": {}}', b'{"paths": {"/a": {]}}', b'{"paths": {}} trailing'):
+                with self.assertRaises(ValueError):
+                    load_lazy_spec(self._write(tmp, data))
+
+    def test_loading_scans_bytes_without_parsing_entries(self):
+        spec = make_spec(50, 10)
+        spec["components"]["schemas"]["Model1"]["description"] = 'brackets } ] { [ and "quotes" \\ in strings'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, json.dumps(spec).encode("utf-8"))
+            with mock.patch("json.decoder.JSONDecoder.raw_decode", wraps=json.JSONDecoder().raw_decode) as decode:
+                lazy = load_lazy_spec(path)
+            # Only member names and the small eager members (openapi, info) are decoded.
+            self.assertLess(max(len(c.args[0]) for c in decode.call_args_list), 200)
+            self.assertEqual(lazy.to_dict(), spec)
+
+    def test_malformed_entry_fails_on_access_or_with_validate(self):
+        data = b'{"paths": {"/a": {"get": [1,,2]}, "/b": {}}}'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, data)
+            lazy = load_lazy_spec(path)
+            self.assertEqual(lazy["paths"]["/b"], {})
+            with self.assertRaises(ValueError):
+                lazy["paths"]["/a"]
+            with self.assertRaises(ValueError):
+                load_lazy_spec(path, validate=True)
+
+    def test_schema_tools_return_same_output(self):
+        spec = make_spec(60, 12)
+        eager_index = build_index(spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            lazy = load_lazy_spec(self._write(tmp, json.dumps(spec).encode("utf-8")))
+            lazy_index = build_index(lazy)
+            for op_id in ("create_user_v0_8", "get_order_v0_1", "get_invoice_v1_42"):
+                for build in (build_request_schema, build_response_schema):
+                    for depth in (20, 2):
+                        kwargs = dict(meta={}, operationId=op_id, deref_max_depth=depth, deref_max_nodes=20000)
+                        expected = build(spec=spec, index=eager_index, **kwargs)
+                        actual = build(spec=lazy, index=lazy_index, **kwargs)
+                        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+
+class LazyStoreTests(unittest.TestCase):
+    def test_store_serves_lazy_spec_across_revalidation(self):
+        body = json.dumps(make_spec(30, 5)).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(body, etag='"v1"') as server:
+            store = OpenAPIStore(
+                base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5, lazy_spec=True
+            )
+            spec1, _meta, index = store.load_index()
+            self.assertIsInstance(spec1, LazyJSONObject)
+            self.assertIsNotNone(index.entries.get("get_user_v0_0"))
+
+            cold = OpenAPIStore(
+                base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5, lazy_spec=True
+            )
+            spec2, _meta2 = cold.load()
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertIsInstance(spec2, LazyJSONObject)
+            self.assertEqual(len(cold.operations()), 30)
+            self.assertFalse((Path(tmp) / "openapi.snapshot").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
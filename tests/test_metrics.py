@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.metrics import METRICS, PROFILER, Histogram
+from openapi_agent_mcp.openapi.deref import deref_schema
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from openapi_agent_mcp.tools.get_request_schema import get_request_schema
+from openapi_agent_mcp.tools.search_operations import search_operations
+from openapi_agent_mcp.tools.stats import collect_stats
+from tests.spec_server import SpecServer
+from tests.test_tools import FakeStore
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self):
+        METRICS.reset()
+
+    def tearDown(self):
+        PROFILER.configure(None, 0)
+        METRICS.reset()
+
+    def test_histogram_quantiles_use_bucket_bounds(self):
+        h = Histogram((1, 10, 100))
+        for value in [0.5] * 50 + [5] * 40 + [50] * 9 + [500]:
+            h.observe(value)
+        snap = h.snapshot()
+        self.assertEqual(snap["count"], 100)
+        self.assertEqual((snap["p50"], snap["p90"], snap["p99"]), (1, 10, 100))
+        self.assertEqual(snap["max"], 500)
+        self.assertEqual(snap["buckets"][-1], {"le": float("inf"), "count": 1})
+
+    def test_tool_calls_record_latency_errors_and_lookups(self):
+        store = FakeStore(json.loads(MINIMAL))
+        search_operations(store=store, query="ping", match=None, method=None, limit=5)
+        search_operations(store=store, query="ping", match=None, method=None, limit=0)
+        get_request_schema(store=store, operationId="missing", deref_max_depth=20, deref_max_nodes=20000)
+
+        snap = METRICS.snapshot()
+        self.assertEqual(snap["histograms"]["tool.search_operations"]["count"], 2)
+        self.assertEqual(snap["counters"]["tool.search_operations.errors"], 1)
+        self.assertEqual(snap["counters"]["tool.get_request_schema.errors"], 1)
+        self.assertEqual(snap["counters"]["lookup.not_found"], 1)
+
+    def test_deref_counts_nodes_and_budget_hits(self):
+        spec = {"components": {"schemas": {"A": {"type": "object", "properties": {"x": {"type": "string"}}}}}}
+        schema = {"$ref": "#/components/schemas/A"}
+        deref_schema(schema, spec=spec, max_depth=20, max_nodes=20000)
+        deref_schema(schema, spec=spec, max_depth=1, max_nodes=20000)
+
+        snap = METRICS.snapshot()
+        self.assertEqual(snap["counters"]["deref.calls"], 2)
+        self.assertEqual(snap["counters"]["deref.budget_hits"], 1)
+        self.assertEqual(snap["histograms"]["deref.nodes"]["count"], 2)
+
+    def test_fetch_outcomes_and_stats(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL, etag='"v1"') as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            store.load_index()
+            store.load_index()
+
+            stats = collect_stats([("default", store)])
+        counters = stats["metrics"]["counters"]
+        self.assertEqual((counters["fetch.200"], counters["fetch.304"]), (1, 1))
+        self.assertEqual(counters["fetch.bytes"], len(MINIMAL))
+        self.assertEqual(stats["metrics"]["histograms"]["fetch"]["count"], 2)
+        self.assertIn("index.build", stats["metrics"]["histograms"])
+        service = stats["services"]["default"]
+        self.assertTrue(service["loaded"])
+        self.assertGreater(service["operations"], 0)
+        self.assertIn("hitRatio", service["derefCache"])
+
+    def test_slow_calls_leave_a_profile(self):
+        store = FakeStore(json.loads(MINIMAL))
+        with tempfile.TemporaryDirectory() as tmp:
+            PROFILER.configure(Path(tmp) / "profiles", 0.0001)
+            search_operations(store=store, query="ping", match=None, method=None, limit=5)
+            dumps = list((Path(tmp) / "profiles").glob("*.prof"))
+
+        self.assertEqual(len(dumps), 1)
+        self.assertIn("search_operations", dumps[0].name)
+        self.assertEqual(METRICS.snapshot()["counters"]["profile.captured"], 1)
+
+    def test_concurrent_profiled_calls_do_not_collide(self):
+        store = FakeStore(json.loads(MINIMAL))
+        results, errors = [], []
+        barrier = threading.Barrier(8)
+
+        def call():
+            try:
+                barrier.wait()
+                for _ in range(20):
+                    results.append(search_operations(store=store, query="ping", match=None, method=None, limit=5))
+            except Exception as e:
+                errors.append(e)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            PROFILER.configure(Path(tmp) / "profiles", 0.0001)
+            threads = [threading.Thread(target=call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            dumps = list((Path(tmp) / "profiles").glob("*.prof"))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 160)
+        self.assertTrue(all(r[0]["operationId"] == "ping" for r in results))
+        self.assertGreaterEqual(len(dumps), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.deref import deref_schema
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.openapi.skeleton import TRUNCATION_KEY, SkeletonBuilder
+from openapi_agent_mcp.tools.get_request_schema import build_request_schema, get_request_schema
+from openapi_agent_mcp.tools.get_response_schema import build_response_schema, get_response_schema
+from openapi_agent_mcp.tools.projection import make_projection
+from openapi_agent_mcp.tools.result_cache import ResultCache
+from tests.test_tools import FakeStore
+
+BUDGET = {"deref_max_depth": 20, "deref_max_nodes": 20000}
+
+
+class ProjectionTests(unittest.TestCase):
+    def setUp(self):
+        self.spec = make_spec(20, 8, depth=3, fan_out=2)
+        self.index = build_index(self.spec)
+        self.kwargs = dict(spec=self.spec, meta={"sha256": "h"}, index=self.index, **BUDGET)
+
+    def test_required_only_drops_optional_properties_while_dereferencing(self):
+        spec = {
+            "components": {
+                "schemas": {
+                    "A": {
+                        "type": "object",
+                        "required": ["id", "properties"],
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "note": {"type": "string"},
+                            "properties": {"$ref": "#/components/schemas/B"},
+                        },
+                    },
+                    "B": {"type": "object", "required": ["x"], "properties": {"x": {"type": "string"}, "y": {}}},
+                }
+            }
+        }
+        res = deref_schema({"$ref": "#/components/schemas/A"}, spec=spec, max_depth=20, max_nodes=100, required_only=True)
+        self.assertEqual(list(res.schema["properties"]), ["id", "properties"])
+        self.assertEqual(list(res.schema["properties"]["properties"]["properties"]), ["x"])
+        self.assertIn("note", spec["components"]["schemas"]["A"]["properties"])
+
+    def test_required_only_follows_schema_positions(self):
+        def obj(**props):
+            return {"type": "object", "required": ["keep"], "properties": {"keep": {"type": "string"}, **props}}
+
+        schema = {
+            "type": "object",
+            "required": ["properties", "list"],
+            "properties": {
+                # An inline property literally named "properties" is a schema like any other.
+                "properties": obj(drop={"type": "string"}),
+                "list": {"type": "array", "items": obj(drop={})},
+            },
+            "allOf": [obj(drop={}), {"$ref": "#/components/schemas/B"}],
+            "additionalProperties": obj(drop={}),
+            "example": {"required": [], "properties": {"drop": 1}},
+        }
+        spec = {"components": {"schemas": {"B": obj(drop={})}}}
+        res = deref_schema(schema, spec=spec, max_depth=20, max_nodes=200, required_only=True)
+        props = res.schema["properties"]
+        self.assertEqual(list(props), ["properties", "list"])
+        self.assertEqual(list(props["properties"]["properties"]), ["keep"])
+        self.assertEqual(list(props["list"]["items"]["properties"]), ["keep"])
+        self.assertEqual([list(member["properties"]) for member in res.schema["allOf"]], [["keep"], ["keep"]])
+        self.assertEqual(list(res.schema["additionalProperties"]["properties"]), ["keep"])
+        self.assertEqual(res.schema["example"], schema["example"])
+
+    def test_status_codes_select_responses_before_dereferencing(self):
+        op = "create_order_v0_9"
+        full = build_response_schema(operationId=op, **self.kwargs)
+        only = build_response_schema(operationId=op, projection=make_projection(status_codes=["2XX"]), **self.kwargs)
+        self.assertEqual(only["responses"], {"200": full["responses"]["200"]})
+
+        store = FakeStore(self.spec)
+        res = get_response_schema(store=store, operationId=op, status_codes=["5XX"], **BUDGET)
+        self.assertEqual(res["error"]["code"], "STATUS_CODE_NOT_FOUND")
+        res = get_response_schema(store=store, operationId=op, status_codes=["abc"], **BUDGET)
+        self.assertEqual(res["error"]["code"], "BAD_INPUT")
+
+    def test_pointer_selects_a_subtree_through_refs(self):
+        op = "create_order_v0_9"
+        full = build_request_schema(operationId=op, **self.kwargs)
+        pointer = "/body/schema/properties/parent/properties/details"
+        res = build_request_schema(operationId=op, projection=make_projection(pointer=pointer), **self.kwargs)
+        self.assertEqual(res["pointer"], pointer)
+        self.assertEqual(res["schema"], full["body"]["schema"]["properties"]["parent"]["properties"]["details"])
+        self.assertNotIn("body", res)
+
+        query = build_request_schema(operationId=op, projection=make_projection(pointer="/params/query"), **self.kwargs)
+        self.assertEqual(query["schema"], full["params"]["query"])
+
+        missing = get_request_schema(store=FakeStore(self.spec), operationId=op, pointer="/body/schema/nope", **BUDGET)
+        self.assertEqual(missing["error"]["code"], "POINTER_NOT_FOUND")
+
+    def test_skeleton_lists_field_paths_and_types(self):
+        spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        store = FakeStore(spec)
+        res = get_response_schema(store=store, operationId="get_user", mode="skeleton", **BUDGET)
+        self.assertEqual(res["responses"]["200"]["fields"], {"id": "string!", "manager": "recursive(User)!"})
+        self.assertNotIn("components", res)
+
+        req = get_request_schema(store=store, operationId="get_user", mode="skeleton", **BUDGET)
+        self.assertEqual(req["params"], {"path.id": "string!"})
+        self.assertEqual(req["body"]["fields"], {})
+
+    def test_skeleton_budget_is_shared_and_marks_truncation(self):
+        builder = SkeletonBuilder(self.spec, max_depth=20, max_fields=5, max_bytes=10_000)
+        first = builder.fields({"$ref": "#/components/schemas/Model3"})
+        self.assertEqual(len(first), 6)
+        self.assertIn(TRUNCATION_KEY, first)
+        self.assertTrue(builder.summary()["truncated"])
+        self.assertEqual(list(builder.fields({"type": "string"})), [TRUNCATION_KEY])
+
+        small = SkeletonBuilder(self.spec, max_depth=20, max_fields=1000, max_bytes=60)
+        fields = small.fields({"$ref": "#/components/schemas/Model3"})
+        self.assertLessEqual(small.size, 60)
+        self.assertIn(TRUNCATION_KEY, fields)
+
+        shallow = SkeletonBuilder(self.spec, max_depth=1, max_fields=1000, max_bytes=10_000)
+        fields = shallow.fields({"$ref": "#/components/schemas/Model3"})
+        self.assertEqual(fields["parent"], "object(Model2) (depth limit)")
+        self.assertNotIn("parent.id", fields)
+
+    def test_projections_are_cached_separately(self):
+        cache = ResultCache()
+        op = "create_order_v0_9"
+        full = build_response_schema(operationId=op, result_cache=cache, **self.kwargs)
+        skeleton = build_response_schema(
+            operationId=op, result_cache=cache, projection=make_projection(mode="skeleton"), **self.kwargs
+        )
+        self.assertIn("schema", full["responses"]["200"])
+        self.assertIn("fields", skeleton["responses"]["200"])
+        again = build_response_schema(operationId=op, result_cache=cache, **self.kwargs)
+        self.assertIs(again, full)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.refgraph import Expansion, RefGraph, component_key, iter_refs
+from openapi_agent_mcp.tools.get_request_schema import get_request_schema
+from openapi_agent_mcp.tools.get_response_schema import get_response_schema
+from tests.test_tools import FakeStore
+
+
+def _schema(ref: str) -> dict:
+    return {"$ref": f"#/components/schemas/{ref}"}
+
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "A": {"type": "object", "properties": {"b": _schema("B"), "p": {"$ref": "#/components/parameters/P"}}},
+            "B": {"type": "array", "items": _schema("A")},
+            "C": {"type": "object", "properties": {"d": _schema("D")}},
+            "D": {"type": "string"},
+            "a/b": {"type": "object", "properties": {"d": _schema("D")}},
+            "Unused": {"type": "integer"},
+        },
+        "parameters": {"P": {"name": "p", "in": "query", "schema": _schema("C")}},
+        "securitySchemes": {"bearer": {"type": "http", "scheme": "bearer"}},
+    }
+}
+
+
+class RefGraphTests(unittest.TestCase):
+    def test_component_key(self):
+        self.assertEqual(component_key("#/components/schemas/User"), ("schemas", "User"))
+        self.assertEqual(component_key("#/components/schemas/User/properties/id"), ("schemas", "User"))
+        self.assertEqual(component_key("#/components/schemas/a~1b"), ("schemas", "a/b"))
+        self.assertIsNone(component_key("#/paths/~1users"))
+        self.assertIsNone(component_key("#/components/schemas"))
+
+    def test_closure_follows_cycles_and_sections(self):
+        graph = RefGraph(SPEC)
+        self.assertEqual(
+            graph.closure(["#/components/schemas/A"]),
+            {("schemas", "A"), ("schemas", "B"), ("parameters", "P"), ("schemas", "C"), ("schemas", "D")},
+        )
+        self.assertEqual(graph.closure(["#/components/schemas/a~1b"]), {("schemas", "a/b"), ("schemas", "D")})
+        self.assertEqual(graph.closure(["#/components/schemas/Missing"]), {("schemas", "Missing")})
+
+    def test_cycles_and_expansion_sizes(self):
+        graph = RefGraph(SPEC)
+        self.assertTrue(graph.is_cyclic(("schemas", "A")))
+        self.assertTrue(graph.is_cyclic(("schemas", "B")))
+        self.assertFalse(graph.is_cyclic(("parameters", "P")))
+        self.assertIsNone(graph.expansion(("schemas", "A")))
+        self.assertIsNone(graph.ref_expansion("#/components/schemas/a~1b"))  # deref does not unescape pointers
+        # Every dict, list and scalar deref visits counts; a ref dict counts once plus its target.
+        self.assertEqual(graph.expansion(("schemas", "D")), Expansion(nodes=2, depth=1))
+        self.assertEqual(graph.expansion(("schemas", "C")), Expansion(nodes=6, depth=4))
+        self.assertEqual(graph.expansion(("parameters", "P")), Expansion(nodes=10, depth=6))
+        self.assertFalse(graph.contains_ref(("schemas", "D")))
+        self.assertTrue(graph.contains_ref(("schemas", "C")))
+
+    def test_measure_handles_schemas_deeper_than_the_recursion_limit(self):
+        deep: dict = {"type": "string"}
+        for _ in range(sys.getrecursionlimit() + 100):
+            deep = {"type": "object", "properties": {"x": deep}}
+        expansion = RefGraph(SPEC).measure(deep)
+        self.assertEqual(expansion.depth, 2 * (sys.getrecursionlimit() + 100) + 1)
+
+    def test_concurrent_queries_on_a_cold_graph(self):
+        spec = make_spec(400, 200)
+        keys = [("schemas", name) for name in spec["components"]["schemas"]]
+        expected = RefGraph(spec)
+        want = {key: (expected.closure_of(key), expected.expansion(key)) for key in keys}
+        for _ in range(5):
+            graph = RefGraph(spec)
+            barrier = threading.Barrier(8)
+            errors: list[BaseException] = []
+
+            def worker(offset: int) -> None:
+                barrier.wait()
+                try:
+                    for key in keys[offset:] + keys[:offset]:
+                        self.assertEqual((graph.closure_of(key), graph.expansion(key)), want[key])
+                except BaseException as exc:  # surfaced on the main thread below
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=worker, args=(i * len(keys) // 8,)) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(errors, [])
+
+    def test_components_for_keeps_spec_order_and_drops_unreferenced(self):
+        picked = RefGraph(SPEC).components_for([{"x": [_schema("C")]}, {"y": {"$ref": "#/components/parameters/P"}}])
+        self.assertEqual(picked, {"schemas": {"C": SPEC["components"]["schemas"]["C"], "D": {"type": "string"}}, "parameters": SPEC["components"]["parameters"]})
+        self.assertEqual(list(picked["schemas"]), ["C", "D"])
+
+
+class PrunedComponentsToolTests(unittest.TestCase):
+    def _assert_self_contained(self, res: dict) -> None:
+        body = {k: v for k, v in res.items() if k != "components"}
+        for ref in iter_refs(body):
+            section, name = component_key(ref)
+            self.assertIn(name, res["components"][section])
+        for ref in iter_refs(res["components"]):
+            section, name = component_key(ref)
+            self.assertIn(name, res["components"][section])
+
+    def test_cycle_fixture_returns_only_referenced_schema(self):
+        spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        spec["components"]["schemas"]["Unrelated"] = {"type": "string"}
+        spec["components"]["securitySchemes"] = {"bearer": {"type": "http", "scheme": "bearer"}}
+        store = FakeStore(spec)
+
+        res = get_response_schema(store=store, operationId="get_user", deref_max_depth=20, deref_max_nodes=20000)
+        self.assertEqual(res["components"], {"schemas": {"User": spec["components"]["schemas"]["User"]}})
+
+        full = get_response_schema(
+            store=store, operationId="get_user", deref_max_depth=20, deref_max_nodes=20000, prune_components=False
+        )
+        self.assertEqual(full["components"], spec["components"])
+        self.assertEqual(full["responses"], res["responses"])
+
+    def test_budget_cut_keeps_transitive_closure_only(self):
+        store = FakeStore(make_spec(200, 100))
+        for fn in (get_request_schema, get_response_schema):
+            res = fn(store=store, operationId="create_invoice_v0_10", deref_max_depth=4, deref_max_nodes=20000)
+            full = fn(
+                store=store, operationId="create_invoice_v0_10", deref_max_depth=4, deref_max_nodes=20000, prune_components=False
+            )
+            names = set(res["components"]["schemas"])
+            self.assertTrue(names)
+            self.assertNotIn("Model11", names)
+            self.assertLess(len(json.dumps(res)), len(json.dumps(full)) / 2)
+            self._assert_self_contained(res)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.config import Config, load_services_file, parse_services
+from openapi_agent_mcp.errors import ToolError
+from openapi_agent_mcp.openapi.registry import StoreRegistry
+from tests.spec_server import SpecServer
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+
+
+class ServiceConfigTests(unittest.TestCase):
+    def test_parse_services(self):
+        self.assertEqual(
+            parse_services("hr=http://localhost:5052, erp=http://localhost:8000/\n"),
+            {"hr": "http://localhost:5052", "erp": "http://localhost:8000/"},
+        )
+        with self.assertRaises(ValueError):
+            parse_services("hr")
+        with self.assertRaises(ValueError):
+            parse_services("../x=http://a")
+
+    def test_load_services_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "services.json"
+            path.write_text(
+                json.dumps({"services": {"hr": "http://a", "erp": {"base_url": "http://b"}}}), encoding="utf-8"
+            )
+            self.assertEqual(load_services_file(path), {"hr": "http://a", "erp": "http://b"})
+
+    def test_base_url_is_the_default_service(self):
+        cfg = Config(base_url="http://a", services=(("erp", "http://b"),))
+        self.assertEqual(cfg.service_urls(), {"default": "http://a", "erp": "http://b"})
+
+
+class StoreRegistryTests(unittest.TestCase):
+    def test_stores_get_their_own_cache_dirs_and_warm_up_in_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as hr, SpecServer(
+            json.dumps(make_spec(4, 1)).encode("utf-8")
+        ) as erp:
+            hr.delay_seconds = erp.delay_seconds = 0.3
+            cfg = Config(base_url="", cache_dir=Path(tmp), services=(("hr", hr.base_url), ("erp", erp.base_url)))
+            registry = StoreRegistry.from_config(cfg)
+
+            started = time.monotonic()
+            errors = registry.warm_up()
+            elapsed = time.monotonic() - started
+
+            self.assertEqual(errors, {"hr": None, "erp": None})
+            self.assertLess(elapsed, 0.55)
+            self.assertTrue((Path(tmp) / "services" / "hr" / "openapi.json").exists())
+            self.assertTrue((Path(tmp) / "services" / "erp" / "openapi.json").exists())
+            self.assertEqual(len(registry.get("erp").operations()), 4)
+            self.assertEqual([s["loaded"] for s in registry.describe()], [True, True])
+
+    def test_resolve_service(self):
+        cfg = Config(base_url="", services=(("hr", "http://a"), ("erp", "http://b")))
+        registry = StoreRegistry.from_config(cfg)
+        self.assertEqual(registry.resolve("erp")[0], "erp")
+        with self.assertRaises(ToolError) as ctx:
+            registry.resolve(None)
+        self.assertEqual(ctx.exception.code, "SERVICE_REQUIRED")
+        with self.assertRaises(ToolError) as ctx:
+            registry.resolve("crm")
+        self.assertEqual(ctx.exception.code, "SERVICE_NOT_FOUND")
+
+        single = StoreRegistry.from_config(Config(base_url="http://a", cache_dir=Path("/tmp/x")))
+        name, store = single.resolve(None)
+        self.assertEqual(name, "default")
+        self.assertEqual(store.cache_dir, Path("/tmp/x"))
+
+    def test_service_caches_do_not_collide_with_reserved_dirs(self):
+        cfg = Config(base_url="http://a", cache_dir=Path("/tmp/x"), services=(("daemon", "http://b"), ("profiles", "http://c")))
+        dirs = {name: store.cache_dir for name, store in StoreRegistry.from_config(cfg).items()}
+        self.assertEqual(
+            dirs,
+            {
+                "default": Path("/tmp/x"),
+                "daemon": Path("/tmp/x/services/daemon"),
+                "profiles": Path("/tmp/x/services/profiles"),
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
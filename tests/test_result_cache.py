@@ -0,0 +1,96 @@
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.tools import get_request_schema as request_mod
+from openapi_agent_mcp.tools.get_request_schema import get_request_schema
+from openapi_agent_mcp.tools.get_response_schema import get_response_schema
+from openapi_agent_mcp.tools.result_cache import ResultCache
+from tests.test_tools import FakeStore
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_repeated_calls_are_served_from_cache(self):
+        store = FakeStore(make_spec(20, 5))
+        cache = ResultCache()
+        first = get_request_schema(
+            store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache
+        )
+        with mock.patch.object(request_mod, "deref_schema") as deref:
+            second = get_request_schema(
+                store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache
+            )
+        deref.assert_not_called()
+        self.assertIs(second, first)
+        self.assertEqual(first["method"], "POST")
+
+        uncached = get_request_schema(store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000)
+        self.assertEqual(uncached, first)
+
+    def test_budget_and_tool_are_part_of_the_key(self):
+        store = FakeStore(make_spec(20, 5))
+        cache = ResultCache()
+        get_response_schema(store=store, operationId="get_user_v0_0", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache)
+        get_response_schema(store=store, operationId="get_user_v0_0", deref_max_depth=2, deref_max_nodes=20000, result_cache=cache)
+        get_request_schema(store=store, operationId="get_user_v0_0", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache)
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_errors_are_not_cached(self):
+        store = FakeStore(make_spec(2, 1))
+        cache = ResultCache()
+        res = get_request_schema(store=store, operationId="missing", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache)
+        self.assertIn("error", res)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_invalidate_drops_other_hashes(self):
+        cache = ResultCache()
+        cache.put("old", "request", "a", 20, 20000, {"operationId": "a"})
+        cache.put("new", "request", "b", 20, 20000, {"operationId": "b"})
+        cache.invalidate("old", {"sha256": "new"})
+        self.assertIsNone(cache.get("old", "request", "a", 20, 20000))
+        self.assertEqual(cache.get("new", "request", "b", 20, 20000), {"operationId": "b"})
+
+    def test_invalidate_carries_over_operations_unchanged_in_the_diff(self):
+        cache = ResultCache()
+        for tool in ("request", "request:full"):
+            for op in ("a", "b"):
+                cache.put("old", tool, op, 20, 20000, {"operationId": op})
+        diff = {"previous_sha256": "old", "added": [], "removed": [], "changed": ["b"], "components": ["schemas/X"]}
+        cache.invalidate("old", {"sha256": "new", "diff": diff})
+        self.assertEqual(cache.get("new", "request", "a", 20, 20000), {"operationId": "a"})
+        self.assertIsNone(cache.get("new", "request", "b", 20, 20000))
+        self.assertIsNone(cache.get("new", "request:full", "a", 20, 20000))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_memory_cap_evicts_least_recently_used(self):
+        cache = ResultCache(max_bytes=200)
+        for i in range(10):
+            cache.put("h", "request", f"op{i}", 20, 20000, {"operationId": f"op{i}", "pad": "x" * 40})
+        stats = cache.stats()
+        self.assertLessEqual(stats["weight"], 200)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNotNone(cache.get("h", "request", "op9", 20, 20000))
+        self.assertIsNone(cache.get("h", "request", "op0", 20, 20000))
+
+    def test_persisted_entries_survive_restart(self):
+        store = FakeStore(make_spec(20, 5))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "schema_results.json"
+            cache = ResultCache(persist_path=path)
+            first = get_response_schema(
+                store=store, operationId="get_user_v0_0", deref_max_depth=20, deref_max_nodes=20000, result_cache=cache
+            )
+            cache.save()
+
+            warm = ResultCache(persist_path=path)
+            self.assertEqual(warm.get("test", "response", "get_user_v0_0", 20, 20000), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.baselines import linear_search
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.index import build_index, search_operations
+from openapi_agent_mcp.openapi.search import QueryTerm, parse_query, tokenize
+
+ALL_FIELDS = {"tag": True, "operationId": True, "path": True, "summary": True, "description": True}
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_tokenize_splits_identifiers_and_paths(self):
+        self.assertEqual(tokenize("getPurchaseRequisition_list"), ["get", "purchase", "requisition", "list"])
+        self.assertEqual(tokenize("/api/v1/HTTPServer/{item_id}"), ["api", "v", "1", "http", "server", "item", "id"])
+
+    def test_matches_linear_substring_semantics(self):
+        index = build_index(make_spec(300, 10))
+        cases = [
+            ("", ALL_FIELDS, None),
+            ("user", ALL_FIELDS, None),
+            ("USER", ALL_FIELDS, "get"),
+            ("er_v1", ALL_FIELDS, None),
+            ("a", ALL_FIELDS, "POST"),
+            ("{item_id}/up", ALL_FIELDS, None),
+            ("group-3", {**ALL_FIELDS, "tag": False}, None),
+            ("group-3", {"tag": True, "operationId": False, "path": False, "summary": False, "description": False}, None),
+            ('"operation 12"', ALL_FIELDS, None),
+            ("no-such-thing", ALL_FIELDS, None),
+        ]
+        for query, match, method in cases:
+            got = search_operations(
+                operations=index.operations, query=query, match=match, method=method, limit=10_000, search_index=index.search
+            )
+            expected = linear_search(index.operations, query.strip("\""), match, method)
+            self.assertEqual(sorted(r["operationId"] for r in got), sorted(expected), (query, match, method))
+            if not query:
+                self.assertEqual([r["operationId"] for r in got], expected)
+
+    def test_results_are_ranked_by_relevance(self):
+        index = build_index(make_spec(300, 10))
+        got = search_operations(
+            operations=index.operations, query="invoice", match=ALL_FIELDS, method=None, limit=5, search_index=index.search
+        )
+        self.assertEqual(len(got), 5)
+        for row in got:
+            self.assertIn("invoice", row["tags"])
+
+        got = search_operations(
+            operations=index.operations, query="delete", match=ALL_FIELDS, method=None, limit=3, search_index=index.search
+        )
+        self.assertTrue(all(row["operationId"].startswith("delete_") for row in got))
+
+
+class QuerySyntaxTests(unittest.TestCase):
+    def setUp(self):
+        self.index = build_index(make_spec(300, 10))
+
+    def _ids(self, query, method=None, limit=10_000, match=ALL_FIELDS):
+        got = search_operations(
+            operations=self.index.operations,
+            query=query,
+            match=match,
+            method=method,
+            limit=limit,
+            search_index=self.index.search,
+        )
+        return [r["operationId"] for r in got]
+
+    def test_parse_query(self):
+        parsed = parse_query('tag:invoice "Operation 12" OR path:/api/v1 method:post bogus:x')
+        self.assertEqual(
+            parsed.groups,
+            (
+                (QueryTerm("invoice", "tag"), QueryTerm("operation 12")),
+                (QueryTerm("/api/v1", "path"), QueryTerm("bogus:x")),
+            ),
+        )
+        self.assertEqual(parsed.methods, frozenset({"POST"}))
+
+    def test_terms_are_anded(self):
+        ids = self._ids("invoice create")
+        self.assertTrue(ids)
+        self.assertTrue(all(i.startswith("create_invoice_") for i in ids))
+        self.assertEqual(set(ids), set(self._ids("invoice")) & set(self._ids("create")))
+
+    def test_or_groups_are_unioned(self):
+        ids = set(self._ids("tag:invoice OR tag:payment"))
+        self.assertEqual(ids, set(self._ids("tag:invoice")) | set(self._ids("tag:payment")))
+
+    def test_field_prefix_restricts_field(self):
+        ids = self._ids("path:group")
+        self.assertEqual(ids, [])
+        self.assertTrue(self._ids("tag:group-2"))
+
+    def test_method_prefix_and_argument_combine(self):
+        ids = self._ids("method:delete user")
+        self.assertTrue(ids)
+        self.assertTrue(all(i.startswith("delete_user") for i in ids))
+        self.assertEqual(self._ids("method:delete user", method="GET"), [])
+
+    def test_operations_matching_more_terms_rank_first(self):
+        self.assertEqual(self._ids("user OR v3_120", limit=1), ["get_user_v3_120"])
+
+    def test_top_k_is_prefix_of_full_ranking(self):
+        full = self._ids("api OR invoice OR group-1")
+        self.assertEqual(self._ids("api OR invoice OR group-1", limit=7), full[:7])
+
+
+class LargeSpecSearchTests(unittest.TestCase):
+    def test_indexed_search_matches_linear_scan_on_10k_operations(self):
+        index = build_index(make_spec(10_000, 100))
+        for query in ["create_invoice_v3_", "supplier_v12", "/api/v200/", "group-150", "#9999", "missing-op"]:
+            indexed = search_operations(
+                operations=index.operations, query=query, match=ALL_FIELDS, method=None, limit=50, search_index=index.search
+            )
+            linear = linear_search(index.operations, query, ALL_FIELDS, None)
+            self.assertEqual(sorted(r["operationId"] for r in indexed), sorted(linear[:50]), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
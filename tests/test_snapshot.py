@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi import snapshot as snapshot_mod
+from openapi_agent_mcp.openapi import store as store_mod
+from openapi_agent_mcp.openapi.cache import read_json
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.openapi.snapshot import read_snapshot, snapshot_path, write_snapshot
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from tests.spec_server import SpecServer
+
+ALL_FIELDS = {"operationId": True, "path": True, "tag": True, "summary": True, "description": True}
+
+
+class SnapshotFileTests(unittest.TestCase):
+    def test_round_trip_keeps_index_and_shared_ops(self):
+        spec = make_spec(200, 20)
+        index = build_index(spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(Path(tmp), sha256="abc", spec=spec, index=index)
+            loaded = read_snapshot(Path(tmp), "abc")
+
+        self.assertIsNotNone(loaded)
+        spec2, index2 = loaded
+        self.assertEqual(spec2, spec)
+        self.assertEqual(index2.operations, index.operations)
+        entry = index2.entries["create_user_v0_8"]
+        self.assertIs(entry.op, spec2["paths"][entry.operation.path]["post"])
+        self.assertEqual(
+            index2.search.search("invoice v1", match=ALL_FIELDS, method=None, limit=10),
+            index.search.search("invoice v1", match=ALL_FIELDS, method=None, limit=10),
+        )
+
+    def test_mismatched_or_corrupt_snapshot_is_ignored(self):
+        spec = make_spec(5, 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(Path(tmp), sha256="abc", spec=spec, index=build_index(spec))
+            self.assertIsNone(read_snapshot(Path(tmp), "other"))
+            with mock.patch.object(snapshot_mod, "SNAPSHOT_VERSION", 999):
+                self.assertIsNone(read_snapshot(Path(tmp), "abc"))
+            path = snapshot_path(Path(tmp))
+            path.write_bytes(path.read_bytes()[:-100])
+            self.assertIsNone(read_snapshot(Path(tmp), "abc"))
+            self.assertIsNone(read_snapshot(Path(tmp) / "missing", "abc"))
+
+
+class StoreColdStartTests(unittest.TestCase):
+    BODY = json.dumps(make_spec(300, 30)).encode("utf-8")
+
+    def _store(self, server: SpecServer, cache_dir: str, **kwargs) -> OpenAPIStore:
+        return OpenAPIStore(base_url=server.base_url, cache_dir=Path(cache_dir), timeout_seconds=5, **kwargs)
+
+    def test_valid_ttl_cold_start_loads_snapshot_without_fetch_or_index(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            first = self._store(server, tmp, cache_ttl_seconds=3600)
+            spec1, meta1 = first.load()
+            first.flush_disk_snapshot()
+            self.assertTrue(snapshot_path(Path(tmp)).exists())
+
+            with mock.patch.object(store_mod, "build_index") as build:
+                spec2, meta2 = self._store(server, tmp, cache_ttl_seconds=3600).load()
+
+            build.assert_not_called()
+            self.assertEqual(len(server.requests), 1)
+            self.assertEqual(meta2["sha256"], meta1["sha256"])
+            self.assertEqual(spec2, spec1)
+
+    def test_not_modified_cold_start_loads_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY, etag='"v1"') as server:
+            first = self._store(server, tmp, cache_ttl_seconds=0)
+            first.load()
+            first.flush_disk_snapshot()
+
+            store = self._store(server, tmp, cache_ttl_seconds=0)
+            with mock.patch.object(store_mod, "build_index") as build:
+                store.load_index()
+            build.assert_not_called()
+            self.assertEqual(server.statuses, [200, 304])
+            self.assertIsNotNone(store.operation_by_id("create_user_v0_8"))
+
+    def test_changed_spec_rebuilds_and_rewrites_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            first = self._store(server, tmp, cache_ttl_seconds=0)
+            first.load()
+            first.flush_disk_snapshot()
+
+            server.body = json.dumps(make_spec(3, 1)).encode("utf-8")
+            store = self._store(server, tmp, cache_ttl_seconds=0)
+            self.assertEqual(len(store.operations()), 3)
+            store.flush_disk_snapshot()
+            sha = read_json(Path(tmp) / "openapi.meta.json")["sha256"]
+            self.assertEqual(len(read_snapshot(Path(tmp), sha)[1].operations), 3)
+
+    def test_disabled_snapshot_is_neither_written_nor_read(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(self.BODY) as server:
+            self._store(server, tmp, cache_ttl_seconds=3600, disk_snapshot=False).load()
+            self.assertFalse(snapshot_path(Path(tmp)).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
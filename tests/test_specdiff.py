@@ -0,0 +1,128 @@
+import copy
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.openapi.lazy import load_lazy_spec
+from openapi_agent_mcp.openapi.specdiff import diff_components, diff_specs
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from openapi_agent_mcp.tools.get_response_schema import get_response_schema
+from openapi_agent_mcp.tools.result_cache import ResultCache
+from tests.spec_server import SpecServer
+
+
+def _edited(spec):
+    new = copy.deepcopy(spec)
+    paths = new["paths"]
+    # Model3 is referenced (via `parent`) by every ModelN with N >= 3.
+    new["components"]["schemas"]["Model3"]["properties"]["extra"] = {"type": "string"}
+    paths["/api/v0/user/{item_id}/get"]["get"]["description"] = "edited"
+    paths["/api/v0/order/{item_id}/get"]["parameters"] = [{"name": "x", "in": "header", "schema": {"type": "string"}}]
+    del paths["/api/v0/invoice/{item_id}/get"]
+    paths["/new"] = {"get": {"operationId": "brand_new", "responses": {}}}
+    return new
+
+
+class SpecDiffTests(unittest.TestCase):
+    def test_operations_changed_directly_or_through_components(self):
+        old = make_spec(16, 6)
+        new = _edited(old)
+        diff = diff_specs(old, build_index(old), new, build_index(new), previous_sha256="h0")
+
+        self.assertEqual(diff.added, ("brand_new",))
+        self.assertEqual(diff.removed, ("get_invoice_v0_2",))
+        self.assertEqual(diff.components, frozenset({("schemas", "Model3")}))
+        # i % 6 >= 3 reaches Model3; ops 0 and 1 changed inline (own op, path-level parameters).
+        ops = build_index(old).operations
+        expected = {op.operationId for i, op in enumerate(ops) if i % 6 >= 3 or i in (0, 1)}
+        self.assertEqual(set(diff.changed), expected - {"get_invoice_v0_2"})
+        summary = diff.summary()
+        self.assertEqual(summary["components"], ["schemas/Model3"])
+        self.assertEqual(summary["previous_sha256"], "h0")
+        json.dumps(summary)
+
+    def test_identical_specs_have_an_empty_diff(self):
+        old = make_spec(16, 6)
+        new = copy.deepcopy(old)
+        diff = diff_specs(old, build_index(old), new, build_index(new))
+        self.assertEqual((diff.added, diff.removed, diff.changed), ((), (), ()))
+        self.assertEqual(diff.paths | diff.components, frozenset())
+
+    def test_lazy_specs_compare_unchanged_entries_by_bytes(self):
+        old = make_spec(200, 6)
+        new = copy.deepcopy(old)
+        new["paths"]["/api/v0/user/{item_id}/get"]["get"]["summary"] = "edited"
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "a.json").write_text(json.dumps(old), encoding="utf-8")
+            (Path(tmp) / "b.json").write_text(json.dumps(new), encoding="utf-8")
+            lazy_old, lazy_new = load_lazy_spec(Path(tmp) / "a.json"), load_lazy_spec(Path(tmp) / "b.json")
+            self.assertEqual(diff_components(lazy_old, lazy_new), frozenset())
+            diff = diff_specs(lazy_old, build_index(lazy_old), lazy_new, build_index(lazy_new))
+            self.assertEqual(diff.changed, ("get_user_v0_0",))
+            self.assertEqual(lazy_new["paths"].stats()["materialized"], 1)
+
+
+class IncrementalStoreTests(unittest.TestCase):
+    def test_reindex_carries_over_unaffected_caches(self):
+        old = make_spec(16, 6)
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(json.dumps(old).encode("utf-8")) as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            results = ResultCache()
+            store.add_listener(results.invalidate)
+            budget = {"deref_max_depth": 20, "deref_max_nodes": 20000, "result_cache": results}
+            first = store.snapshot()
+            first.index.search.materialize()
+            kept = get_response_schema(store=store, operationId="create_user_v0_8", **budget)
+            get_response_schema(store=store, operationId="create_order_v0_9", **budget)
+
+            server.body = json.dumps(_edited(old)).encode("utf-8")
+            second = store.snapshot()
+            self.assertEqual(second.meta["diff"]["previous_sha256"], first.sha256)
+            self.assertIn("create_order_v0_9", second.meta["diff"]["changed"])
+            self.assertNotIn("create_user_v0_8", second.meta["diff"]["changed"])
+
+            self.assertIsNone(results.get(second.sha256, "response", "create_order_v0_9", 20, 20000))
+            self.assertIs(results.get(second.sha256, "response", "create_user_v0_8", 20, 20000), kept)
+            self.assertIsNotNone(store.deref_cache.get((second.sha256, "#/components/schemas/Model2", 20, 20000)))
+            self.assertIsNone(store.deref_cache.get((second.sha256, "#/components/schemas/Model3", 20, 20000)))
+            self.assertEqual(get_response_schema(store=store, operationId="create_user_v0_8", deref_max_depth=20, deref_max_nodes=20000), kept)
+
+    def test_unchanged_components_keep_the_ref_graph_and_results(self):
+        old = make_spec(16, 6)
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(json.dumps(old).encode("utf-8")) as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            results = ResultCache()
+            store.add_listener(results.invalidate)
+            budget = {"deref_max_depth": 20, "deref_max_nodes": 20000, "result_cache": results}
+            first = store.snapshot()
+            first.index.search.materialize()
+            cached = get_response_schema(store=store, operationId="create_user_v0_8", **budget)
+            self.assertFalse(first.index.refs.is_cyclic(("schemas", "Model5")))
+
+            new = copy.deepcopy(old)
+            new["info"]["version"] = "2"
+            new["paths"]["/api/v0/user/{item_id}/get"]["get"]["summary"] = "edited"
+            server.body = json.dumps(new).encode("utf-8")
+            second = store.snapshot()
+
+            self.assertEqual(second.meta["diff"]["changed"], ["get_user_v0_0"])
+            self.assertIs(get_response_schema(store=store, operationId="create_user_v0_8", **budget), cached)
+            self.assertEqual(second.index.refs._scc_of, first.index.refs._scc_of)
+            self.assertIs(second.index.refs._node(("schemas", "Model5")).value, new_model(second, "Model5"))
+            self.assertIsNotNone(store.deref_cache.get((second.sha256, "#/components/schemas/Model2", 20, 20000)))
+            self.assertIs(second.index.search._grams["tag"], first.index.search._grams["tag"])
+            self.assertIsNot(second.index.search._grams["summary"], first.index.search._grams["summary"])
+
+
+def new_model(snap, name):
+    return snap.spec["components"]["schemas"][name]
+
+
+if __name__ == "__main__":
+    unittest.main()
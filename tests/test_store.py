@@ -0,0 +1,163 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openapi_agent_mcp.bench.synthetic import make_spec
+from openapi_agent_mcp.errors import ToolError
+from openapi_agent_mcp.openapi import store as store_mod
+from openapi_agent_mcp.openapi.store import OpenAPIStore
+from tests.spec_server import SpecServer
+
+MINIMAL = Path("tests/fixtures/openapi_minimal.json").read_bytes()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class BackgroundRefreshTests(unittest.TestCase):
+    def test_serves_snapshot_while_revalidating_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            store = OpenAPIStore(
+                base_url=server.base_url,
+                cache_dir=Path(tmp),
+                cache_ttl_seconds=0,
+                timeout_seconds=5,
+                refresh_interval_seconds=0.05,
+            )
+            try:
+                spec1, meta1 = store.load()
+                self.assertIn("/ping", spec1["paths"])
+
+                server.delay_seconds = 0.5
+                started = time.monotonic()
+                for _ in range(20):
+                    spec, _meta = store.load()
+                    self.assertIs(spec, spec1)
+                self.assertLess(time.monotonic() - started, 0.25)
+
+                server.delay_seconds = 0.0
+                server.body = json.dumps(make_spec(3, 1)).encode("utf-8")
+                self.assertTrue(_wait_for(lambda: store.load()[1]["sha256"] != meta1["sha256"]))
+                self.assertEqual(len(store.operations()), 3)
+            finally:
+                store.stop_background_refresh()
+
+    def test_refresh_failure_keeps_last_good_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            store = OpenAPIStore(
+                base_url=server.base_url,
+                cache_dir=Path(tmp),
+                cache_ttl_seconds=0,
+                timeout_seconds=5,
+                refresh_interval_seconds=0.02,
+            )
+            try:
+                spec1, _meta = store.load()
+                server.body = b"not json"
+                self.assertTrue(_wait_for(lambda: store._refresh_error is not None))
+                self.assertIs(store.load()[0], spec1)
+            finally:
+                store.stop_background_refresh()
+
+
+class ListenerTests(unittest.TestCase):
+    def test_listener_fires_only_on_hash_change(self):
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(MINIMAL) as server:
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            calls = []
+            store.add_listener(lambda previous, meta: calls.append((previous, meta["sha256"])))
+            _spec, meta1 = store.load()
+            store.load()
+            server.body = json.dumps(make_spec(3, 1)).encode("utf-8")
+            _spec, meta2 = store.load()
+            self.assertEqual(calls, [(None, meta1["sha256"]), (meta1["sha256"], meta2["sha256"])])
+
+
+class ConcurrencyStressTests(unittest.TestCase):
+    def _assert_consistent(self, spec, meta, index):
+        # Every index entry must point into the very spec object it was returned with.
+        for op_id, entry in index.entries.items():
+            self.assertIs(spec["paths"][entry.operation.path][entry.operation.method.lower()], entry.op, op_id)
+        n_ops = sum(len(item) for item in spec["paths"].values())
+        self.assertEqual(len(index.operations), n_ops)
+        self.assertTrue(meta["sha256"])
+
+    def test_parallel_loads_share_fetches_and_never_see_mixed_snapshots(self):
+        bodies = [json.dumps(make_spec(n, 5)).encode("utf-8") for n in (40, 80, 120)]
+        with tempfile.TemporaryDirectory() as tmp, SpecServer(bodies[0]) as server:
+            server.delay_seconds = 0.02
+            store = OpenAPIStore(base_url=server.base_url, cache_dir=Path(tmp), cache_ttl_seconds=0, timeout_seconds=5)
+            stop = threading.Event()
+
+            def flip_spec():
+                i = 0
+                while not stop.is_set():
+                    i += 1
+                    server.body = bodies[i % len(bodies)]
+                    time.sleep(0.01)
+
+            def worker(n):
+                out = []
+                for _ in range(15):
+                    out.append(store.load_index())
+                    if n % 3 == 0:
+                        store.operations()
+                return out
+
+            flipper = threading.Thread(target=flip_spec)
+            flipper.start()
+            calls = 32 * 15
+            try:
+                with ThreadPoolExecutor(max_workers=32) as pool:
+                    results = [r for chunk in pool.map(worker, range(32)) for r in chunk]
+            finally:
+                stop.set()
+                flipper.join()
+
+            self.assertEqual(len(results), calls)
+            for spec, meta, index in results:
+                self._assert_consistent(spec, meta, index)
+            # Single-flight: concurrent callers piggyback on in-flight fetches.
+            self.assertLess(len(server.requests), calls / 4)
+
+    def test_followers_see_the_leaders_error(self):
+        store = OpenAPIStore(base_url="http://127.0.0.1:9", cache_dir=Path("."), cache_ttl_seconds=0, timeout_seconds=1)
+        started = threading.Event()
+        release = threading.Event()
+        fetches = []
+
+        def slow_fail(**kwargs):
+            fetches.append(1)
+            started.set()
+            release.wait(5)
+            raise OSError("backend down")
+
+        with mock.patch.object(store_mod, "fetch_openapi_spec", side_effect=slow_fail):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [pool.submit(store.load)]
+                started.wait(5)
+                futures += [pool.submit(store.load) for _ in range(7)]
+                time.sleep(0.2)
+                release.set()
+                errors = [f.exception() for f in futures]
+
+        self.assertEqual(len(fetches), 1)
+        self.assertTrue(all(isinstance(e, ToolError) and e.code == "OPENAPI_FETCH_FAILED" for e in errors))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,21 +5,29 @@ import unittest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from openapi_agent_mcp.openapi.index import build_operations
+from openapi_agent_mcp.openapi.deref import DerefCache
+from openapi_agent_mcp.openapi.index import build_index
+from openapi_agent_mcp.tools.get_request_schema import get_request_schema
 from openapi_agent_mcp.tools.get_response_schema import get_response_schema
+from openapi_agent_mcp.tools.get_schemas import get_schemas
 from openapi_agent_mcp.tools.search_operations import search_operations
 
 
 class FakeStore:
     def __init__(self, spec):
         self._spec = spec
-        self._ops, self._by_id = build_operations(spec)
+        self._index = build_index(spec)
+        self.deref_cache = DerefCache()
 
     def load(self):
         return self._spec, {"sha256": "test", "url": "http://example/openapi.json"}
 
+    def load_index(self):
+        spec, meta = self.load()
+        return spec, meta, self._index
+
     def operations(self):
-        return self._ops
+        return self._index.operations
 
 
 class ToolTests(unittest.TestCase):
@@ -39,6 +47,29 @@ class ToolTests(unittest.TestCase):
         self.assertIn("schemas", res["components"])
         self.assertIn("User", res["components"]["schemas"])
 
+    def test_get_schemas_matches_single_tools_with_one_components_section(self):
+        spec = json.loads(Path("tests/fixtures/openapi_cycle_ref.json").read_text(encoding="utf-8"))
+        spec["paths"]["/users2/{id}"] = {"get": dict(spec["paths"]["/users/{id}"]["get"], operationId="get_user2")}
+        store = FakeStore(spec)
+        budget = {"deref_max_depth": 20, "deref_max_nodes": 20000}
+        res = get_schemas(store=store, operationIds=["get_user", "missing", "get_user2", "get_user"], **budget)
+
+        self.assertEqual([e["operationId"] for e in res["operations"]], ["get_user", "missing", "get_user2"])
+        self.assertEqual(res["operations"][1]["error"]["code"], "OPERATION_NOT_FOUND")
+        first = res["operations"][0]
+        request = get_request_schema(store=store, operationId="get_user", **budget)
+        response = get_response_schema(store=store, operationId="get_user", **budget)
+        self.assertEqual((first["params"], first["body"]), (request["params"], request["body"]))
+        self.assertEqual(first["responses"], response["responses"])
+        self.assertEqual(res["components"], response["components"])
+        self.assertNotIn("components", first)
+
+    def test_get_schemas_rejects_bad_input(self):
+        store = FakeStore(json.loads(Path("tests/fixtures/openapi_minimal.json").read_text(encoding="utf-8")))
+        for bad in ([], "ping", [""], ["ping"] * 201):
+            res = get_schemas(store=store, operationIds=bad, deref_max_depth=20, deref_max_nodes=20000)
+            self.assertEqual(res["error"]["code"], "BAD_INPUT", bad)
+
 
 if __name__ == "__main__":
     unittest.main()